@@ -0,0 +1,54 @@
+"""
+Carousel PDF size: bytes per slide for the default and compact renderings.
+
+Run from the repo root:
+    python benchmarks/carousel_size.py [slides]
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from carousel_generator import create_carousel_pdf  # noqa: E402
+
+BODY = (
+    "AI-native code editor.\n\n"
+    "→ Writes 60% of my boilerplate automatically\n"
+    "→ Understands full codebase context\n"
+    "→ Suggests entire functions as you type\n\n"
+    "Time saved: ~45 min/day"
+)
+
+
+def deck(n_slides: int, output_path: Path) -> dict:
+    return {
+        "title": "5 AI Tools That Replaced 3 Hours of My Day",
+        "subtitle": "A practical guide for developers and founders",
+        "slides": [{"heading": f"Tool #{i}", "body": BODY} for i in range(1, n_slides + 1)],
+        "cta_text": "Which AI tool has saved you the most time?",
+        "hashtags": ["AI", "Tech", "SoftwareDevelopment", "Automation", "Productivity"],
+        "output_path": str(output_path),
+        "brand_name": "@YourLinkedIn",
+        "use_cache": False,
+    }
+
+
+def measure(n_slides: int = 8) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode, compact in (("default", False), ("compact", True)):
+            path = create_carousel_pdf(**deck(n_slides, Path(tmp) / f"{mode}.pdf"), compact=compact)
+            size = os.path.getsize(path)
+            results[mode] = {"bytes": size, "bytes_per_slide": size / (n_slides + 2)}
+    return results
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    r = measure(n)
+    for mode, m in r.items():
+        print(f"{mode:8s} {m['bytes']:>8,} bytes  {m['bytes_per_slide']:>8,.0f} bytes/slide")
+    print(f"compact saves {1 - r['compact']['bytes'] / r['default']['bytes']:.0%}")
@@ -0,0 +1,402 @@
+"""
+End-to-end publishing load test: synthetic approvals → real watcher → stub API.
+
+Generates N text, image and carousel post files, then moves them into
+vault/Approved/ at a set arrival rate (or all at once) while the orchestrator's
+approval watcher runs against a local LinkedIn stub server (src/linkedin_stub.py)
+over real HTTP. Nothing touches your vault or the network: everything happens
+in a throwaway vault.
+
+Reported:
+  - per post: dropped → detected → published (or failed) times, taken from the
+    watcher's own log records, as latency percentiles; posts over
+    --max-posts-per-day are counted as scheduled (for a later day)
+  - throughput (posts resolved per second from the first drop)
+  - peak RSS while the pipeline ran
+  - mean time per pipeline stage (from metrics.py) and time spent queued
+  - final vault state (files per folder), watcher queue stats, stub counters
+
+Usage (from the repo root):
+    python benchmarks/load_test.py --text 20 --image 20 --carousel 10 --rate 0     # a burst of 50 approvals
+    python benchmarks/load_test.py --text 100 --rate 2 --poisson --workers 4
+    python benchmarks/load_test.py --carousel 10 --faults "ugc_posts=429:0.1" --output load.json
+
+Exit status is 1 if some posts were not resolved before --timeout.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import shutil
+import logging
+import argparse
+import tempfile
+import statistics
+import threading
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from linkedin_stub import LinkedInStub, StubServer, parse_faults, parse_latency, parse_quota  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Roughly what the real API answers in (ms); override with --latency "" for none.
+DEFAULT_LATENCY = "default=lognormal:80,0.4;register_upload=lognormal:150,0.4;upload=lognormal:300,0.5;ugc_posts=lognormal:200,0.4"
+FOLDERS = ["Pending_Approval", "Approved", "Published", "Needs_Action", "Logs", "Analytics", "Media"]
+
+
+# ─────────────────────────────────────────────
+# Pipeline observation
+# ─────────────────────────────────────────────
+
+class PipelineEvents(logging.Handler):
+    """Detection / outcome times per file, read off the approval watcher's log records."""
+
+    PATTERNS = {
+        "detected": re.compile(r"Approved file detected: (\S+)"),
+        "published": re.compile(r"Moved to Published: (\S+)"),
+        "failed": re.compile(r"Posting failed, moved to Needs_Action: (\S+)"),
+        "scheduled": re.compile(r"Scheduled (\S+) for "),
+    }
+
+    def __init__(self):
+        super().__init__(level=logging.INFO)
+        self.times: dict[str, dict[str, float]] = {}
+        self.resolved = threading.Semaphore(0)
+        self._lock = threading.Lock()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        message = record.getMessage()
+        for kind, pattern in self.PATTERNS.items():
+            m = pattern.search(message)
+            if m:
+                with self._lock:
+                    times = self.times.setdefault(m.group(1), {})
+                    first = kind != "detected" and len(times.keys() - {"detected"}) == 0
+                    times.setdefault(kind, record.created)
+                if first:  # a throttled post is scheduled, then published; count it once
+                    self.resolved.release()
+                return
+
+
+def _rss_bytes() -> int | None:
+    """Current resident set size, where the OS makes it cheap to read."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, interval: float = 0.05):
+        super().__init__(daemon=True, name="RssSampler")
+        self.interval = interval
+        self.peak = _rss_bytes() or 0
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.peak = max(self.peak, _rss_bytes() or 0)
+
+    def stop(self) -> int | None:
+        """Peak RSS in bytes (process lifetime peak where /proc is unavailable)."""
+        self._stop_event.set()
+        self.join()
+        if self.peak:
+            return self.peak
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+# ─────────────────────────────────────────────
+# Synthetic posts
+# ─────────────────────────────────────────────
+
+WORDS = ("agents", "latency", "python", "vector", "cache", "deploy", "model", "pipeline", "queue", "schema",
+         "tokens", "observability", "retries", "throughput", "embedding", "inference", "rollout", "backlog")
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def _post_file(name: str, post_type: str, topic: str, body: str, media: Path | None) -> str:
+    lines = ["---", f"type: {post_type}", f"topic: {topic}", "hashtags: #AI, #Engineering, #LoadTest"]
+    if post_type == "image":
+        lines.append(f"image_path: {media}")
+    elif post_type == "carousel":
+        lines.append(f"pdf_path: {media}")
+    lines += ["---", "", f"# {topic}", "", "## Post Caption" if post_type == "carousel" else "## Post Content", "", body, ""]
+    return "\n".join(lines)
+
+
+def _write_image(path: Path, seed: int) -> None:
+    from PIL import Image
+
+    # Distinct pixels per post, so every image is a fresh upload rather than an asset-cache hit
+    rng = random.Random(seed)
+    img = Image.new("RGB", (1200, 627), (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    for x in range(0, 1200, 40):
+        img.putpixel((x, seed % 627), (255, 255, 255))
+    img.save(path, "PNG")
+
+
+def generate_posts(vault: Path, counts: dict[str, int], seed: int) -> list[Path]:
+    """Post files (plus their images/PDFs) in a staging folder; returned in arrival order."""
+    import carousel_generator
+
+    rng = random.Random(seed)
+    staging = vault / "Pending_Approval"
+    media = vault / "Media"
+    kinds = [k for k, n in counts.items() for _ in range(n)]
+    rng.shuffle(kinds)
+
+    carousel_specs, posts = [], []
+    for i, kind in enumerate(kinds, 1):
+        name = f"LOAD_{i:04d}_{kind}.md"
+        topic = f"Load test {kind} post {i}"
+        body = "\n\n".join(_sentence(rng, rng.randint(12, 30)) for _ in range(rng.randint(2, 5)))
+        media_path = None
+        if kind == "image":
+            media_path = media / f"load_{i:04d}.png"
+            _write_image(media_path, seed * 100_000 + i)
+        elif kind == "carousel":
+            media_path = media / f"load_{i:04d}.pdf"
+            carousel_specs.append({
+                "title": topic,
+                "subtitle": _sentence(rng, 6),
+                "slides": [{"heading": _sentence(rng, 4), "body": _sentence(rng, 40)} for _ in range(rng.randint(4, 8))],
+                "cta_text": "Follow for more",
+                "hashtags": ["AI", "LoadTest"],
+                "output_path": str(media_path),
+            })
+        (staging / name).write_text(_post_file(name, kind, topic, body, media_path), encoding="utf-8")
+        posts.append(staging / name)
+
+    failed = [r for r in carousel_generator.create_carousels(carousel_specs) if r["error"]]
+    if failed:
+        raise RuntimeError(f"Carousel generation failed: {failed[0]['error']}")
+    return posts
+
+
+# ─────────────────────────────────────────────
+# Run
+# ─────────────────────────────────────────────
+
+def _percentiles(values: list[float]) -> dict:
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pct(p: float) -> float:
+        return ordered[min(int(round(p / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+    return {
+        "count": len(ordered),
+        "min_s": round(ordered[0], 4),
+        "p50_s": round(pct(50), 4),
+        "p90_s": round(pct(90), 4),
+        "p95_s": round(pct(95), 4),
+        "p99_s": round(pct(99), 4),
+        "max_s": round(ordered[-1], 4),
+        "mean_s": round(statistics.fmean(ordered), 4),
+    }
+
+
+def _vault_state(vault: Path) -> dict:
+    return {
+        folder: sum(1 for p in (vault / folder).iterdir() if p.is_file())
+        for folder in ("Approved", "Published", "Needs_Action")
+    }
+
+
+def run(args: argparse.Namespace) -> dict:
+    vault = Path(args.vault) if args.vault else Path(tempfile.mkdtemp(prefix="fte-load-")) / "vault"
+    for folder in FOLDERS:
+        (vault / folder).mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(ROOT / "vault" / "Dashboard.md", vault / "Dashboard.md")
+
+    stub = LinkedInStub(
+        latency=parse_latency(args.latency),
+        faults=parse_faults(args.faults),
+        quota=parse_quota(args.quota),
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    server = StubServer(stub).start()
+
+    # Modules read their settings at import, so the environment must be in place first.
+    total = args.text + args.image + args.carousel
+    os.environ.update({
+        "VAULT_PATH": str(vault),
+        "LINKEDIN_API_BASE": server.base_url,
+        "LINKEDIN_ACCESS_TOKEN": "load-test-token",
+        "LINKEDIN_PERSON_URN": "",
+        "DRY_RUN": "false",
+        "MAX_POSTS_PER_DAY": str(args.max_posts_per_day or total + 1),
+        "WATCHER_WORKERS": str(args.workers),
+    })
+    if args.queue_size:
+        os.environ["WATCHER_QUEUE_SIZE"] = str(args.queue_size)
+
+    import orchestrator
+    import approval_watcher
+    import dashboard
+    import metrics
+
+    if args.quiet:
+        for handler in logging.getLogger().handlers:
+            handler.setLevel(logging.WARNING)
+    events = PipelineEvents()
+    approval_watcher.logger.addHandler(events)
+    approval_watcher.logger.setLevel(logging.INFO)
+
+    print(f"[Load] Vault: {vault}")
+    print(f"[Load] Stub API: {server.base_url}  latency={args.latency or 'none'}  faults={args.faults or 'none'}")
+    started = time.perf_counter()
+    posts = generate_posts(vault, {"text": args.text, "image": args.image, "carousel": args.carousel}, args.seed)
+    generation_s = time.perf_counter() - started
+    print(f"[Load] Generated {len(posts)} posts in {generation_s:.2f}s")
+
+    orchestrator.refresh_vault_index()
+    watcher = orchestrator.start_approval_watcher()
+    time.sleep(0.5)  # let the observer attach before the first drop
+
+    sampler = RssSampler()
+    sampler.start()
+    rng = random.Random(args.seed)
+    dropped: dict[str, float] = {}
+    first_drop = time.time()
+    for i, post in enumerate(posts):
+        if args.rate > 0 and i:
+            time.sleep(rng.expovariate(args.rate) if args.poisson else 1 / args.rate)
+        dest = vault / "Approved" / post.name
+        os.replace(post, dest)  # a move, like approving by hand
+        dropped[post.name] = time.time()
+    print(f"[Load] Dropped {len(posts)} approvals in {time.time() - first_drop:.2f}s")
+
+    deadline = time.monotonic() + args.timeout
+    resolved = 0
+    while resolved < len(posts) and events.resolved.acquire(timeout=max(deadline - time.monotonic(), 0)):
+        resolved += 1
+    finished = time.time()
+    peak_rss = sampler.stop()
+    orchestrator.request_shutdown()
+    watcher.join(timeout=orchestrator.SHUTDOWN_DEADLINE_SECONDS + 5)
+    shutdown_s = time.time() - finished
+    dashboard.flush()
+    server_stats = stub.stats()
+    server.stop()
+
+    latencies = {"drop_to_detected": [], "detected_to_published": [], "drop_to_published": [], "drop_to_failed": []}
+    outcomes = {"published": 0, "failed": 0, "scheduled": 0, "unresolved": 0}
+    for name, t_drop in dropped.items():
+        t = events.times.get(name, {})
+        if "detected" in t:
+            latencies["drop_to_detected"].append(t["detected"] - t_drop)
+        if "published" in t:
+            outcomes["published"] += 1
+            latencies["drop_to_published"].append(t["published"] - t_drop)
+            if "detected" in t:
+                latencies["detected_to_published"].append(t["published"] - t["detected"])
+        elif "failed" in t:
+            outcomes["failed"] += 1
+            latencies["drop_to_failed"].append(t["failed"] - t_drop)
+        elif "scheduled" in t:
+            outcomes["scheduled"] += 1
+        else:
+            outcomes["unresolved"] += 1
+
+    elapsed = max(finished - first_drop, 1e-9)
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "vault": str(vault),
+            "posts": {"text": args.text, "image": args.image, "carousel": args.carousel},
+            "arrival_rate": args.rate or "burst",
+            "poisson": args.poisson,
+            "workers": args.workers,
+            "latency": args.latency,
+            "faults": args.faults,
+            "quota": args.quota,
+            "seed": args.seed,
+        },
+        "generation_s": round(generation_s, 3),
+        "elapsed_s": round(elapsed, 3),
+        "shutdown_s": round(shutdown_s, 3),
+        "throughput_per_s": round((outcomes["published"] + outcomes["failed"]) / elapsed, 3),
+        "outcomes": outcomes,
+        "latency": {name: _percentiles(values) for name, values in latencies.items() if values},
+        "stages": {
+            stage: {"count": s["count"], "mean_s": round(s["sum"] / s["count"], 4)}
+            for stage, s in metrics.STAGE_SECONDS.summary().items() if s["count"]
+        },
+        "queue_wait": metrics.QUEUE_WAIT.summary(),
+        "peak_rss_mb": round(peak_rss / 1024 / 1024, 1) if peak_rss else None,
+        "vault_state": _vault_state(vault),
+        "watcher_queue": approval_watcher.get_queue_metrics(),
+        "stub": server_stats,
+    }
+
+
+def print_report(report: dict) -> None:
+    print()
+    print(f"Outcomes:    {report['outcomes']}")
+    print(f"Elapsed:     {report['elapsed_s']:.2f}s   throughput {report['throughput_per_s']:.2f} posts/s")
+    print(f"Peak RSS:    {report['peak_rss_mb']} MB")
+    print(f"Vault:       {report['vault_state']}")
+    print(f"Stub API:    {report['stub']['requests']} requests, {report['stub']['errors']} errors, {report['stub']['posts']} posts created")
+    print()
+    print(f"  {'latency (s)':<24}{'n':>5}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for name, p in report["latency"].items():
+        print(f"  {name:<24}{p['count']:>5}{p['p50_s']:>9.3f}{p['p90_s']:>9.3f}{p['p95_s']:>9.3f}{p['p99_s']:>9.3f}{p['max_s']:>9.3f}")
+    print()
+    print(f"  {'stage':<24}{'n':>5}{'mean (s)':>10}")
+    for stage, s in sorted(report["stages"].items(), key=lambda kv: -kv[1]["mean_s"] * kv[1]["count"]):
+        print(f"  {stage:<24}{s['count']:>5}{s['mean_s']:>10.4f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="End-to-end publishing load test against a local LinkedIn stub.")
+    parser.add_argument("--text", type=int, default=20, help="text posts")
+    parser.add_argument("--image", type=int, default=20, help="image posts")
+    parser.add_argument("--carousel", type=int, default=10, help="carousel posts")
+    parser.add_argument("--rate", type=float, default=0, help="approvals per second (0 = all at once)")
+    parser.add_argument("--poisson", action="store_true", help="exponential gaps between approvals instead of even spacing")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WATCHER_WORKERS", "2")), help="WATCHER_WORKERS")
+    parser.add_argument("--queue-size", type=int, default=0, help="WATCHER_QUEUE_SIZE (default: the watcher's)")
+    parser.add_argument("--max-posts-per-day", type=int, default=0, help="MAX_POSTS_PER_DAY (default: no cap)")
+    parser.add_argument("--latency", default=DEFAULT_LATENCY, help="stub latency spec (see src/linkedin_stub.py)")
+    parser.add_argument("--faults", default="", help='stub fault spec, e.g. "ugc_posts=429:0.05"')
+    parser.add_argument("--quota", default="", help='stub quota spec, e.g. "ugc_posts=20/60"')
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=300, help="seconds to wait for every post to resolve")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--vault", help="vault folder to use (default: a new temp folder)")
+    parser.add_argument("--output", help="also write the report as JSON here")
+    parser.add_argument("--quiet", action="store_true", help="hide the pipeline's own log lines")
+    args = parser.parse_args()
+
+    report = run(args)
+    print_report(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nReport written to {args.output}")
+    return 1 if report["outcomes"]["unresolved"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
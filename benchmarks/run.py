@@ -0,0 +1,404 @@
+"""
+Microbenchmarks for the hot paths: post parsing, post text and payload
+building, the action log and post counter, dashboard updates, carousel
+rendering and the weekly report (against an in-process API stub).
+
+Everything runs inside a throwaway vault, so the real vault and the LinkedIn
+API are never touched.
+
+Usage (from the repo root):
+    python benchmarks/run.py                       # full suite → benchmarks/results/latest.json
+    python benchmarks/run.py --quick               # fewer/shorter runs
+    python benchmarks/run.py --only carousel       # names containing "carousel"
+    python benchmarks/run.py --baseline old.json   # also flag >25% slowdowns vs. an earlier run
+
+Exit status is 1 if any result exceeds its limit in benchmarks/thresholds.json
+(or regresses against --baseline), so it can gate a release.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import logging
+import contextlib
+import shutil
+import random
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+THRESHOLDS_FILE = BENCH_DIR / "thresholds.json"
+DEFAULT_OUTPUT = BENCH_DIR / "results" / "latest.json"
+
+# Modules read their settings at import, so the sandbox must exist first.
+WORK_DIR = Path(tempfile.mkdtemp(prefix="linkedin-fte-bench-"))
+VAULT = WORK_DIR / "vault"
+os.environ.update({
+    "VAULT_PATH": str(VAULT),
+    "DRY_RUN": "false",
+    "LINKEDIN_ACCESS_TOKEN": "bench-token",
+    "LINKEDIN_PERSON_URN": "urn:li:person:bench",
+    "ANALYTICS_DEADLINE_SECONDS": "30",
+})
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(BENCH_DIR))
+
+import action_log  # noqa: E402
+import post_parser  # noqa: E402
+import linkedin_poster  # noqa: E402
+import analytics_watcher  # noqa: E402
+import carousel_generator  # noqa: E402
+from action_index import ActionCountIndex  # noqa: E402
+from dashboard import DashboardModel, DashboardWriter  # noqa: E402
+from http_client import LinkedInClient, set_shared_client  # noqa: E402
+from linkedin_stub import LinkedInStub, StubTransport  # noqa: E402
+from rate_limiter import RateLimited, RateLimiter  # noqa: E402
+import carousel_size  # noqa: E402
+
+# Keep the output to the numbers: module INFO logs and carousel prints are noise here.
+logging.getLogger().setLevel(logging.WARNING)
+logging.getLogger("fontTools").setLevel(logging.WARNING)
+
+SAMPLE_BODY = (
+    "Most developers spend 3+ hours daily on repetitive tasks.\n\n"
+    "→ Research. Boilerplate. Meeting notes. Follow-ups.\n"
+    "→ AI can handle all of this — if you know which tools to use.\n\n"
+    "Here's the stack I use every day, and what each tool actually saves me."
+)
+SAMPLE_POST = """---
+type: carousel
+topic: 5 AI tools that saved me 10 hours this week
+best_time: 2026-03-03 09:00
+hashtags: [AI, Tech, SoftwareDevelopment, Automation, Productivity]
+pdf_path: vault/Pending_Approval/CAROUSEL_ai-tools.pdf
+notes: |
+  Draft reviewed on Monday.
+  Swap slide 3 if Cursor ships the new agent mode.
+---
+
+## Post Caption
+
+{body}
+
+## Notes
+Internal only.
+"""
+
+
+# ─────────────────────────────────────────────
+# Timing
+# ─────────────────────────────────────────────
+
+class Suite:
+    def __init__(self, quick: bool, only: str = ""):
+        self.min_time = 0.05 if quick else 0.3
+        self.max_runs = 200 if quick else 5000
+        self.only = only
+        self.results: dict[str, dict] = {}
+
+    def wants(self, name: str) -> bool:
+        return not self.only or self.only in name
+
+    def time(self, name: str, fn, setup=None, min_runs: int = 3, max_runs: int | None = None) -> None:
+        """Call fn() repeatedly (setup() untimed before each call) and record per-call stats."""
+        if not self.wants(name):
+            return
+        max_runs = min(max_runs or self.max_runs, self.max_runs)
+        samples: list[float] = []
+        started = time.perf_counter()
+        while len(samples) < min_runs or (
+            len(samples) < max_runs and time.perf_counter() - started < self.min_time
+        ):
+            if setup:
+                setup()
+            t = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - t)
+        samples.sort()
+        self.results[name] = {
+            "runs": len(samples),
+            "median_s": statistics.median(samples),
+            "p95_s": samples[min(int(len(samples) * 0.95), len(samples) - 1)],
+            "min_s": samples[0],
+            "mean_s": statistics.fmean(samples),
+            "ops_per_s": 1 / statistics.median(samples) if samples[0] > 0 else float("inf"),
+        }
+        r = self.results[name]
+        print(f"  {name:<48} {r['median_s'] * 1000:>10.3f} ms  (p95 {r['p95_s'] * 1000:.3f} ms, {r['runs']} runs)")
+
+    def record(self, name: str, values: dict) -> None:
+        if self.wants(name):
+            self.results[name] = values
+            print(f"  {name:<48} {values}")
+
+
+# ─────────────────────────────────────────────
+# Benchmarks
+# ─────────────────────────────────────────────
+
+def bench_parsing(suite: Suite) -> None:
+    folder = VAULT / "Pending_Approval"
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / "POST_bench.md"
+    path.write_text(SAMPLE_POST.format(body=SAMPLE_BODY), encoding="utf-8")
+
+    suite.time("parse_post_file[cold]", lambda: post_parser.parse_post_file(path), setup=post_parser.clear_cache)
+    suite.time("parse_post_file[cached]", lambda: post_parser.parse_post_file(path))
+
+    for i in range(500):
+        (folder / f"POST_{i:04d}.md").write_text(SAMPLE_POST.format(body=f"{SAMPLE_BODY}\n{i}"), encoding="utf-8")
+    suite.time("parse_many[500 files, cold]", lambda: post_parser.parse_many(folder),
+               setup=post_parser.clear_cache, max_runs=20)
+
+
+def bench_payloads(suite: Suite) -> None:
+    hashtags = ["AI", "#Tech", "SoftwareDevelopment", "Automation", "Productivity"]
+    text = linkedin_poster.build_post_text(SAMPLE_BODY, hashtags)
+    urn, asset = "urn:li:person:bench", "urn:li:digitalmediaAsset:bench"
+
+    suite.time("build_post_text", lambda: linkedin_poster.build_post_text(SAMPLE_BODY, hashtags))
+    suite.time("payload[text]", lambda: json.dumps(linkedin_poster._build_text_payload(urn, text)))
+    suite.time("payload[image]", lambda: json.dumps(linkedin_poster._build_image_payload(urn, text, asset, "Title")))
+    suite.time("payload[carousel]", lambda: json.dumps(linkedin_poster._build_carousel_payload(urn, text, asset, "Title")))
+
+
+def _seed_log(logs_dir: Path, entries: int) -> None:
+    """Write `entries` lines into today's log directly (no per-line fsync)."""
+    logs_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(entries)
+    with open(action_log.log_path(logs_dir, date.today()), "w", encoding="utf-8") as f:
+        for i in range(entries):
+            f.write(json.dumps({
+                "timestamp": datetime.utcnow().isoformat() + "Z",
+                "action_type": "linkedin_post" if i % 4 else "analytics",
+                "actor": "linkedin_fte",
+                "parameters": {"source_file": f"POST_{i}.md"},
+                "post_urn": f"urn:li:share:{i}",
+                "dry_run": False,
+                "result": rng.choice(["success", "success", "rate_limited", "error: boom"]),
+            }) + "\n")
+
+
+def bench_action_log(suite: Suite) -> None:
+    for entries in (10, 1_000, 100_000):
+        label = f"{entries:,}".replace(",", "_")
+        logs_dir = WORK_DIR / f"logs_{label}"
+        _seed_log(logs_dir, entries)
+        linkedin_poster.LOGS_DIR = logs_dir
+        index = linkedin_poster._count_index = ActionCountIndex(logs_dir)
+
+        def drop_index():
+            index._local.__dict__.pop("conn", None)
+            for suffix in ("", "-wal", "-shm"):
+                Path(f"{index.db_path}{suffix}").unlink(missing_ok=True)
+
+        suite.time(f"get_todays_post_count[{label} entries, cold index]",
+                   linkedin_poster.get_todays_post_count, setup=drop_index, max_runs=20)
+        suite.time(f"get_todays_post_count[{label} entries]", linkedin_poster.get_todays_post_count)
+        suite.time(f"log_action[{label} entries]",
+                   lambda: linkedin_poster.log_action("linkedin_post", {"source_file": "bench.md"}, "success"),
+                   max_runs=2000)
+    action_log.flush()
+
+
+def bench_dashboard(suite: Suite) -> None:
+    template = (ROOT / "vault" / "Dashboard.md").read_text(encoding="utf-8")
+    header = "|------|-----------|--------|-------|----------|\n"
+    for rows in (50, 5_000):
+        row_block = "".join(
+            f"| 2026-02-22 {i % 24:02d}:00 | Post topic number {i} | ✅ Published | — | — |\n" for i in range(rows)
+        )
+        text = template.replace(header, header + row_block, 1)
+        path = WORK_DIR / f"Dashboard_{rows}.md"
+
+        suite.time(f"dashboard_model[{rows} rows]", lambda: _model_update(text))
+
+        writer = DashboardWriter(path=path, window=0, max_rows=50)
+
+        def reset(text=text, path=path, writer=writer):
+            path.write_text(text, encoding="utf-8")
+            writer._model = None
+
+        def update(writer=writer):
+            writer.add_activity("Benchmark post", "✅ Published")
+            writer.flush()
+
+        suite.time(f"update_dashboard[{rows} rows, write]", update, setup=reset, max_runs=200)
+
+
+def _model_update(text: str) -> str:
+    model = DashboardModel(text)
+    model.add_row("| 2026-02-23 09:00 | Benchmark post | ✅ Published | — | — |", 50)
+    model.set_field("Last Updated", "2026-02-23 09:00")
+    return model.render()
+
+
+def _quiet(fn):
+    """fn with its print() output swallowed."""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return run
+
+
+def bench_carousels(suite: Suite) -> None:
+    out_dir = WORK_DIR / "carousels"
+    for slides in (5, 20, 100):
+        spec = carousel_size.deck(slides, out_dir / f"deck_{slides}.pdf")
+        suite.time(f"create_carousel_pdf[{slides} slides]",
+                   _quiet(lambda spec=spec: carousel_generator.create_carousel_pdf(**spec)), max_runs=10)
+
+    if suite.wants("carousel_size"):
+        sizes = _quiet(lambda: carousel_size.measure(8))()
+        for mode, m in sizes.items():
+            suite.record(f"carousel_size[{mode}]", {"bytes": m["bytes"], "bytes_per_slide": round(m["bytes_per_slide"])})
+
+
+def bench_weekly_report(suite: Suite) -> None:
+    for posts in (10, 200):
+        logs_dir = WORK_DIR / f"report_logs_{posts}"
+        logs_dir.mkdir(parents=True, exist_ok=True)
+        with open(action_log.log_path(logs_dir, date.today()), "w", encoding="utf-8") as f:
+            for i in range(posts):
+                f.write(json.dumps({
+                    "timestamp": datetime.utcnow().isoformat() + "Z",
+                    "action_type": "linkedin_post",
+                    "parameters": {"source_file": f"POST_{i}.md"},
+                    "post_urn": f"urn:li:share:{7000000000000000000 + i}",
+                    "result": "success",
+                }) + "\n")
+        analytics_watcher.LOGS_DIR = logs_dir
+        analytics_watcher.ANALYTICS_DIR.mkdir(parents=True, exist_ok=True)
+
+        transport = StubTransport()
+        set_shared_client(LinkedInClient(transport=transport))
+        suite.time(f"generate_weekly_report[{posts} posts]", analytics_watcher.generate_weekly_report, max_runs=50)
+    set_shared_client(None)
+
+
+def bench_throttle(suite: Suite) -> None:
+    """Posts through occasional 429s with a 1s Retry-After: none should be deferred."""
+    name = "throttle[40 posts, 10% 429]"
+    if not suite.wants(name):
+        return
+    stub = LinkedInStub(faults={"ugc_posts": [(429, 0.1)]}, retry_after=1.0, seed=3)
+    limiter = RateLimiter(state_file=WORK_DIR / "throttle_rate_limits.json")
+    client = LinkedInClient(transport=StubTransport(stub), limiter=limiter)
+    headers = {"Authorization": "Bearer bench-token", "X-Restli-Protocol-Version": "2.0.0"}
+    payload = linkedin_poster._build_text_payload("urn:li:person:bench", "Throttle check")
+
+    def post(_) -> bool:
+        try:
+            resp = client.post(linkedin_poster.UGC_URL, "ugc_posts", headers=headers, json=payload)
+        except RateLimited:
+            return False
+        return resp.status_code == 201
+
+    logging.getLogger("rate_limiter").setLevel(logging.ERROR)  # the 429s are the point here
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        published = sum(pool.map(post, range(40)))
+    posting = limiter.snapshot()["posting"]
+    suite.record(name, {
+        "published": published,
+        "deferred": 40 - published,
+        "throttled": stub.stats()["errors"],
+        "rate_fraction": round(posting["rate"] / (limiter.budgets["posting"][0] / limiter.budgets["posting"][1]), 3),
+        "elapsed_s": round(time.perf_counter() - started, 2),
+    })
+    client.close()
+
+
+BENCHMARKS = [
+    bench_parsing, bench_payloads, bench_action_log, bench_dashboard, bench_carousels, bench_weekly_report,
+    bench_throttle,
+]
+
+
+# ─────────────────────────────────────────────
+# Thresholds & reporting
+# ─────────────────────────────────────────────
+
+def check(results: dict, thresholds: dict, baseline: dict | None, tolerance: float) -> list[str]:
+    problems = []
+    for name, limits in thresholds.items():
+        result = results.get(name)
+        if result is None:
+            continue
+        for metric, limit in limits.items():
+            if metric in result and result[metric] > limit:
+                problems.append(f"{name}: {metric} {result[metric]:.6g} > threshold {limit:.6g}")
+    if baseline:
+        for name, result in results.items():
+            old = baseline.get("results", {}).get(name, {})
+            for metric in ("median_s", "bytes"):
+                if metric in result and old.get(metric) and result[metric] > old[metric] * tolerance:
+                    problems.append(
+                        f"{name}: {metric} {result[metric]:.6g} vs baseline {old[metric]:.6g} (>{tolerance:.2f}x)"
+                    )
+    return problems
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--thresholds", type=Path, default=THRESHOLDS_FILE)
+    parser.add_argument("--baseline", type=Path, help="earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="allowed slowdown vs. baseline")
+    parser.add_argument("--only", default="", help="run benchmarks whose name contains this")
+    parser.add_argument("--quick", action="store_true")
+    args = parser.parse_args()
+
+    suite = Suite(quick=args.quick, only=args.only)
+    try:
+        for bench in BENCHMARKS:
+            print(f"{bench.__name__}")
+            bench(suite)
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    thresholds = json.loads(args.thresholds.read_text(encoding="utf-8")) if args.thresholds.exists() else {}
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline else None
+    problems = check(suite.results, thresholds, baseline, args.tolerance)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "quick": args.quick,
+        },
+        "results": suite.results,
+        "regressions": problems,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nResults written to {args.output}")
+
+    for p in problems:
+        print(f"REGRESSION  {p}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Action Count Index — O(1) per-day counters over the action log.
+
+A small SQLite table keyed by (day, action_type, result) that `log_action`
+bumps in the same write transaction as the log append. The rate limiter reads
+one row instead of parsing the whole day's log.
+
+Concurrency: every update runs under `BEGIN IMMEDIATE`, which takes SQLite's
+write lock, so the watcher, the orchestrator and ad-hoc scripts can all log at
+once without losing increments. Days that predate the index (or were written
+by an older version) are seeded from the log file the first time they are
+touched, inside the same lock.
+"""
+
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import Iterator
+
+import action_log
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS action_counts (
+    day         TEXT NOT NULL,
+    action_type TEXT NOT NULL,
+    result      TEXT NOT NULL,
+    count       INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, action_type, result)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS seeded_days (
+    day TEXT PRIMARY KEY
+) WITHOUT ROWID;
+"""
+
+
+def result_key(result: str) -> str:
+    """Collapse free-form results ("error: <message>") to their category."""
+    return result.split(":", 1)[0].strip()
+
+
+class ActionCountIndex:
+    """Per-day action counters stored next to the logs they summarise."""
+
+    def __init__(self, logs_dir: Path, db_name: str = "action_counts.db"):
+        self.logs_dir = logs_dir
+        self.db_path = logs_dir / db_name
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.logs_dir.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write_txn(self) -> Iterator[sqlite3.Connection]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _ensure_seeded(self, conn: sqlite3.Connection, day: date) -> None:
+        key = day.isoformat()
+        if conn.execute("SELECT 1 FROM seeded_days WHERE day = ?", (key,)).fetchone():
+            return
+        counts: dict[tuple[str, str], int] = {}
+        for entry in action_log.iter_entries(self.logs_dir, day):
+            k = (entry.get("action_type", ""), result_key(entry.get("result", "")))
+            counts[k] = counts.get(k, 0) + 1
+        conn.execute("DELETE FROM action_counts WHERE day = ?", (key,))
+        conn.executemany(
+            "INSERT INTO action_counts (day, action_type, result, count) VALUES (?, ?, ?, ?)",
+            [(key, a, r, n) for (a, r), n in counts.items()],
+        )
+        conn.execute("INSERT INTO seeded_days (day) VALUES (?)", (key,))
+
+    @contextmanager
+    def recording(self, day: date, action_type: str, result: str) -> Iterator[None]:
+        """
+        Hold the index write lock while the caller appends to the log, then
+        bump the matching counter. Nothing is counted if the append raises.
+        """
+        with self._write_txn() as conn:
+            self._ensure_seeded(conn, day)
+            yield
+            conn.execute(
+                "INSERT INTO action_counts (day, action_type, result, count) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT (day, action_type, result) DO UPDATE SET count = count + 1",
+                (day.isoformat(), action_type, result_key(result)),
+            )
+
+    def count(self, day: date, action_type: str, result: str) -> int:
+        conn = self._conn()
+        key = day.isoformat()
+        if not conn.execute("SELECT 1 FROM seeded_days WHERE day = ?", (key,)).fetchone():
+            with self._write_txn() as wconn:
+                self._ensure_seeded(wconn, day)
+        row = conn.execute(
+            "SELECT count FROM action_counts WHERE day = ? AND action_type = ? AND result = ?",
+            (key, action_type, result_key(result)),
+        ).fetchone()
+        return row[0] if row else 0
+
+    def reseed(self, day: date) -> None:
+        """Drop and rebuild a day's counters from its log file."""
+        with self._write_txn() as conn:
+            conn.execute("DELETE FROM seeded_days WHERE day = ?", (day.isoformat(),))
+            self._ensure_seeded(conn, day)
@@ -0,0 +1,141 @@
+"""
+Action Log — append-only audit trail in vault/Logs/.
+
+Each day gets a line-delimited `YYYY-MM-DD.jsonl` file; one JSON object per line.
+Appends are a single O_APPEND write, so concurrent writers never clobber each
+other and a write costs O(1) regardless of how many entries the day already has.
+fsync is batched (every LOG_FSYNC_EVERY entries or LOG_FSYNC_INTERVAL seconds).
+
+Readers stream entries and stay compatible with the older `YYYY-MM-DD.json`
+files (a single JSON array rewritten on every action).
+"""
+
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Iterator
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+LOG_FSYNC_EVERY = int(os.getenv("LOG_FSYNC_EVERY", "8"))
+LOG_FSYNC_INTERVAL = float(os.getenv("LOG_FSYNC_INTERVAL", "2.0"))
+
+
+def log_path(logs_dir: Path, day: date) -> Path:
+    """Line-delimited log file for a given day."""
+    return logs_dir / f"{day.isoformat()}.jsonl"
+
+
+def legacy_log_path(logs_dir: Path, day: date) -> Path:
+    """Pre-JSONL log file (one JSON array per day)."""
+    return logs_dir / f"{day.isoformat()}.json"
+
+
+# ─────────────────────────────────────────────
+# Writer
+# ─────────────────────────────────────────────
+
+class ActionLogWriter:
+    """Keeps one append-mode descriptor open per day file and batches fsyncs."""
+
+    def __init__(self, fsync_every: int = LOG_FSYNC_EVERY, fsync_interval: float = LOG_FSYNC_INTERVAL):
+        self.fsync_every = max(fsync_every, 1)
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._path: Path | None = None
+        self._fd: int | None = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, path: Path, entry: dict) -> None:
+        line = (json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            if path != self._path:
+                self._close_locked()
+                path.parent.mkdir(parents=True, exist_ok=True)
+                flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+                self._fd = os.open(path, flags, 0o644)
+                self._path = path
+            os.write(self._fd, line)
+            self._pending += 1
+            if (self._pending >= self.fsync_every
+                    or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._sync_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_locked()
+
+    def _sync_locked(self) -> None:
+        if self._fd is not None and self._pending:
+            try:
+                os.fsync(self._fd)
+            except OSError as e:
+                logger.warning(f"[ActionLog] fsync failed for {self._path}: {e}")
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def _close_locked(self) -> None:
+        if self._fd is None:
+            return
+        self._sync_locked()
+        os.close(self._fd)
+        self._fd = None
+        self._path = None
+
+
+_writer = ActionLogWriter()
+atexit.register(_writer.close)
+
+
+def append_entry(logs_dir: Path, entry: dict, day: date | None = None) -> None:
+    """Append one entry to the day's log (today by default)."""
+    _writer.append(log_path(logs_dir, day or date.today()), entry)
+
+
+def flush() -> None:
+    """Force pending entries to disk."""
+    _writer.flush()
+
+
+# ─────────────────────────────────────────────
+# Reader
+# ─────────────────────────────────────────────
+
+def iter_entries(logs_dir: Path, day: date) -> Iterator[dict]:
+    """
+    Stream all entries logged on `day`, legacy JSON array first, then JSONL.
+    A torn trailing line (writer crashed mid-append) is skipped.
+    """
+    legacy = legacy_log_path(logs_dir, day)
+    if legacy.exists():
+        try:
+            with open(legacy, encoding="utf-8") as f:
+                yield from json.load(f)
+        except json.JSONDecodeError as e:
+            logger.warning(f"[ActionLog] Unreadable legacy log {legacy.name}: {e}")
+
+    path = log_path(logs_dir, day)
+    if not path.exists():
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"[ActionLog] Skipping malformed line in {path.name}")
@@ -4,12 +4,16 @@ Run manually or scheduled via orchestrator every Sunday at 8 PM.
 """
 
 import os
-import json
+import time
 import logging
+from urllib.parse import quote, unquote
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
 from datetime import date, datetime, timedelta
 from pathlib import Path
-import requests
 from dotenv import load_dotenv
+import action_log
+from http_client import API_BASE, LinkedInClient, get_shared_client
+import metrics
 
 load_dotenv()
 
@@ -26,6 +30,9 @@ LOGS_DIR = VAULT_PATH / "Logs"
 ANALYTICS_DIR.mkdir(parents=True, exist_ok=True)
 
 DRY_RUN = os.getenv("DRY_RUN", "true").lower() == "true"
+ANALYTICS_MAX_WORKERS = int(os.getenv("ANALYTICS_MAX_WORKERS", "8"))
+ANALYTICS_DEADLINE_SECONDS = float(os.getenv("ANALYTICS_DEADLINE_SECONDS", "60"))
+ANALYTICS_BATCH_SIZE = int(os.getenv("ANALYTICS_BATCH_SIZE", "20"))
 
 
 def get_published_urns_from_logs() -> list[dict]:
@@ -37,11 +44,7 @@ def get_published_urns_from_logs() -> list[dict]:
     today = date.today()
     for i in range(7):
         day = today - timedelta(days=i)
-        log_file = LOGS_DIR / f"{day.isoformat()}.json"
-        if not log_file.exists():
-            continue
-        entries = json.loads(log_file.read_text(encoding="utf-8"))
-        for entry in entries:
+        for entry in action_log.iter_entries(LOGS_DIR, day):
             if entry.get("action_type") == "linkedin_post" and entry.get("result") == "success":
                 if entry.get("post_urn") and entry["post_urn"] != "dry-run-urn":
                     posts.append({
@@ -52,30 +55,152 @@ def get_published_urns_from_logs() -> list[dict]:
     return posts
 
 
-def fetch_post_metrics(auth_headers: dict, post_urn: str) -> dict:
+def _parse_social_metadata(data: dict) -> dict:
+    return {
+        "likes": data.get("likesSummary", {}).get("totalLikes", 0),
+        "comments": data.get("commentsSummary", {}).get("totalFirstLevelComments", 0),
+        "shares": data.get("sharesSummary", {}).get("totalShares", 0),
+    }
+
+
+@metrics.timed("analytics_fetch")
+def _request_post_metrics(
+    auth_headers: dict, post_urn: str, client: LinkedInClient | None = None, timeout: float | None = None
+) -> dict:
+    """Fetch likes, comments, shares for a post URN. Raises on any failure."""
+    client = client or get_shared_client()
+    url = f"{API_BASE}/socialMetadata/{quote(post_urn, safe='')}"
+    resp = client.get(url, "social_metadata", headers=auth_headers, timeout=timeout or client.timeout_for("social_metadata"))
+    resp.raise_for_status()
+    return _parse_social_metadata(resp.json())
+
+
+@metrics.timed("analytics_fetch")
+def _request_metrics_batch(
+    auth_headers: dict, post_urns: list[str], client: LinkedInClient | None = None, timeout: float | None = None
+) -> dict:
+    """
+    Rest.li batch GET: /socialMetadata?ids=List(urn1,urn2,...).
+    Returns {post_urn: metrics} for the URNs the API answered; per-URN errors are left out.
+    Raises if the batch request itself fails.
+    """
+    client = client or get_shared_client()
+    ids = ",".join(quote(urn, safe="") for urn in post_urns)
+    url = f"{API_BASE}/socialMetadata?ids=List({ids})"
+    resp = client.get(url, "social_metadata", headers=auth_headers, timeout=timeout or client.timeout_for("social_metadata"))
+    resp.raise_for_status()
+    results = resp.json().get("results", {})
+    return {unquote(urn): _parse_social_metadata(data) for urn, data in results.items()}
+
+
+def _fetch_metrics_chunk(
+    auth_headers: dict, post_urns: list[str], client: LinkedInClient | None, deadline_at: float | None = None
+) -> dict:
+    """
+    Fetch one chunk with a single batch request, falling back to per-URN calls
+    for anything the batch did not return. Returns {post_urn: metrics | Exception}.
+    No request is started after `deadline_at` (time.monotonic()), and none is
+    allowed a timeout that runs past it.
+    """
+    client = client or get_shared_client()
+
+    def timeout() -> float:
+        default = client.timeout_for("social_metadata")
+        if deadline_at is None:
+            return default
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("deadline exceeded")
+        return min(default, remaining)
+
+    found = {}
+    if len(post_urns) > 1:
+        try:
+            found = _request_metrics_batch(auth_headers, post_urns, client, timeout())
+        except Exception as e:
+            logger.warning(f"[Analytics] Batch of {len(post_urns)} failed ({e}); falling back to per-post calls.")
+
+    out: dict = {}
+    for urn in post_urns:
+        if urn in found:
+            out[urn] = found[urn]
+            continue
+        try:
+            out[urn] = _request_post_metrics(auth_headers, urn, client, timeout())
+        except Exception as e:
+            out[urn] = e
+    return out
+
+
+def fetch_post_metrics(auth_headers: dict, post_urn: str, client: LinkedInClient | None = None) -> dict:
     """Fetch likes, comments, shares for a given post URN."""
-    encoded_urn = post_urn.replace(":", "%3A").replace(",", "%2C")
-    url = f"https://api.linkedin.com/v2/socialMetadata/{encoded_urn}"
     try:
-        resp = requests.get(url, headers=auth_headers, timeout=10)
-        if resp.status_code == 200:
-            data = resp.json()
-            return {
-                "likes": data.get("likesSummary", {}).get("totalLikes", 0),
-                "comments": data.get("commentsSummary", {}).get("totalFirstLevelComments", 0),
-                "shares": data.get("sharesSummary", {}).get("totalShares", 0),
-            }
+        return _request_post_metrics(auth_headers, post_urn, client)
     except Exception as e:
         logger.warning(f"Could not fetch metrics for {post_urn}: {e}")
     return {"likes": 0, "comments": 0, "shares": 0}
 
 
-def fetch_follower_count(auth_headers: dict, person_urn: str) -> int:
+def fetch_metrics_concurrently(
+    auth_headers: dict,
+    posts: list[dict],
+    client: LinkedInClient | None = None,
+    max_workers: int = ANALYTICS_MAX_WORKERS,
+    deadline: float = ANALYTICS_DEADLINE_SECONDS,
+    batch_size: int = ANALYTICS_BATCH_SIZE,
+) -> tuple[list[dict], list[dict]]:
+    """
+    Fetch metrics for many posts. URNs are grouped into batch requests of
+    `batch_size` (1 disables batching), with at most `max_workers` requests in
+    flight. Stops waiting once `deadline` seconds have passed in total.
+
+    Requests still running then are abandoned, not interrupted: their socket
+    timeouts are capped at the time left before the deadline, so they end
+    (and their threads exit) at most about one timeout later. A request held
+    back by the rate limiter can still wait up to RATE_LIMIT_MAX_WAIT_SECONDS
+    before it gives up.
+
+    Returns (posts_data, failed):
+      posts_data — {source_file, likes, comments, shares} per post that succeeded, in input order
+      failed     — {post_urn, source_file, error} per post that errored or missed the deadline
+    """
+    if not posts:
+        return [], []
+
+    urns = list(dict.fromkeys(post["post_urn"] for post in posts))
+    size = max(batch_size, 1)
+    chunks = [urns[i:i + size] for i in range(0, len(urns), size)]
+
+    results: dict = {}
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks))))
+    deadline_at = time.monotonic() + deadline
+    futures = [executor.submit(_fetch_metrics_chunk, auth_headers, chunk, client, deadline_at) for chunk in chunks]
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            results.update(future.result())
+    except FuturesTimeout:
+        logger.warning(f"[Analytics] Metrics deadline ({deadline:.0f}s) hit; reporting partial results.")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    posts_data, failed = [], []
+    for post in posts:
+        result = results.get(post["post_urn"])
+        if isinstance(result, dict):
+            posts_data.append({"source_file": post["source_file"], **result})
+        else:
+            error = str(result) if result is not None else "deadline exceeded"
+            logger.warning(f"Could not fetch metrics for {post['post_urn']}: {error}")
+            failed.append({"post_urn": post["post_urn"], "source_file": post["source_file"], "error": error})
+    return posts_data, failed
+
+
+@metrics.timed("analytics_fetch")
+def fetch_follower_count(auth_headers: dict, person_urn: str, client: LinkedInClient | None = None) -> int:
     """Fetch current follower/connection count."""
-    encoded = person_urn.replace(":", "%3A")
-    url = f"https://api.linkedin.com/v2/networkSizes/{encoded}?edgeType=CompanyFollowedByMember"
+    url = f"{API_BASE}/networkSizes/{quote(person_urn, safe='')}?edgeType=CompanyFollowedByMember"
     try:
-        resp = requests.get(url, headers=auth_headers, timeout=10)
+        resp = (client or get_shared_client()).get(url, "network_sizes", headers=auth_headers)
         if resp.status_code == 200:
             return resp.json().get("firstDegreeSize", 0)
     except Exception as e:
@@ -83,6 +208,7 @@ def fetch_follower_count(auth_headers: dict, person_urn: str) -> int:
     return 0
 
 
+@metrics.timed("weekly_report")
 def generate_weekly_report() -> Path:
     """
     Fetch metrics for all posts from the last 7 days.
@@ -106,22 +232,18 @@ def generate_weekly_report() -> Path:
         total_shares = sum(p["shares"] for p in posts_data)
         best_post = max(posts_data, key=lambda p: p["likes"])
         follower_count = "—"
+        failed_posts = []
     else:
         auth = LinkedInAuth()
         headers = auth.get_headers()
         person_urn = auth.get_profile_urn()
-        follower_count = fetch_follower_count(headers, person_urn)
+        follower_count = fetch_follower_count(headers, person_urn, auth.client)
 
         published_posts = get_published_urns_from_logs()
-        posts_data = []
-        for post in published_posts:
-            metrics = fetch_post_metrics(headers, post["post_urn"])
-            metrics["source_file"] = post["source_file"]
-            posts_data.append(metrics)
+        posts_data, failed_posts = fetch_metrics_concurrently(headers, published_posts, auth.client)
 
-        if not posts_data:
+        if not published_posts:
             logger.info("[Analytics] No published posts found in the last 7 days.")
-            posts_data = []
 
         total_likes = sum(p["likes"] for p in posts_data)
         total_comments = sum(p["comments"] for p in posts_data)
@@ -133,6 +255,12 @@ def generate_weekly_report() -> Path:
     for p in posts_data:
         rows += f"| {p['source_file'][:45]} | {p['likes']} | {p['comments']} | {p['shares']} |\n"
 
+    empty_row = "| No posts this week | — | — | — |\n"
+    failed_section = ""
+    if failed_posts:
+        failed_section = "\n## Metrics Unavailable\n" + "".join(
+            f"- `{f['post_urn']}` ({f['source_file'] or 'unknown file'}): {f['error']}\n" for f in failed_posts
+        ) + "\n---\n"
     engagement_rate = f"{(total_likes + total_comments) / max(len(posts_data), 1):.1f}" if posts_data else "0"
 
     report = f"""# Weekly LinkedIn Analytics Report
@@ -144,7 +272,7 @@ def generate_weekly_report() -> Path:
 ## Summary
 | Metric | Value |
 |--------|-------|
-| Posts Published | {len(posts_data)} |
+| Posts Published | {len(posts_data) + len(failed_posts)} |
 | Total Likes | {total_likes} |
 | Total Comments | {total_comments} |
 | Total Shares | {total_shares} |
@@ -156,10 +284,10 @@ def generate_weekly_report() -> Path:
 ## Post Performance
 | Post | Likes | Comments | Shares |
 |------|-------|----------|--------|
-{rows if rows else "| No posts this week | — | — | — |\n"}
+{rows or empty_row}
 
 ---
-
+{failed_section}
 ## Best Performing Post
 - **File:** {best_post.get('source_file', 'N/A')}
 - **Likes:** {best_post.get('likes', 0)}
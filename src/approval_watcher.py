@@ -1,17 +1,28 @@
 """
 Approval Watcher — monitors /vault/Approved/ for post files.
-When a file appears, parses it and triggers LinkedIn posting.
+When a file appears, it is queued and a worker parses it and triggers LinkedIn posting.
+Posts with a `best_time`, or that would exceed MAX_POSTS_PER_DAY, wait in the
+publish queue (see publish_queue.py) and are handed to the workers when due.
 """
 
 import os
-import re
 import shutil
+import sqlite3
+import time
 import logging
-from datetime import datetime
+import threading
+from datetime import date, datetime, timedelta, time as dtime
 from pathlib import Path
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 from dotenv import load_dotenv
+from work_queue import WorkQueue
+from post_parser import parse_post_file
+import dashboard
+from folder_index import FolderIndex
+from publish_queue import PublishQueue, is_due, parse_best_time
+import vault_index
+import metrics
 
 load_dotenv()
 
@@ -25,72 +36,69 @@ VAULT_PATH = Path(os.getenv("VAULT_PATH", "vault"))
 APPROVED_DIR = VAULT_PATH / "Approved"
 PUBLISHED_DIR = VAULT_PATH / "Published"
 NEEDS_ACTION_DIR = VAULT_PATH / "Needs_Action"
-DASHBOARD_FILE = VAULT_PATH / "Dashboard.md"
+APPROVED_INDEX_FILE = VAULT_PATH / ".cache" / "approved_index.json"
+PUBLISH_QUEUE_FILE = VAULT_PATH / ".cache" / "publish_queue.db"
 
+WATCHER_WORKERS = int(os.getenv("WATCHER_WORKERS", "2"))
+WATCHER_QUEUE_SIZE = int(os.getenv("WATCHER_QUEUE_SIZE", "100"))
+WATCHER_DEBOUNCE_SECONDS = float(os.getenv("WATCHER_DEBOUNCE_SECONDS", "0.5"))
+WATCHER_DRAIN_SECONDS = float(os.getenv("SHUTDOWN_DEADLINE_SECONDS", "30"))
+PUBLISH_MIN_GAP_MINUTES = float(os.getenv("PUBLISH_MIN_GAP_MINUTES", "0"))
+PUBLISH_OVERFLOW_TIME = dtime.fromisoformat(os.getenv("PUBLISH_OVERFLOW_TIME", "09:00"))
 
-def parse_post_file(filepath: Path) -> dict:
-    """
-    Parse a markdown post file with YAML frontmatter.
-    Returns dict with keys: type, topic, content, hashtags, pdf_path, image_path
-    """
-    text = filepath.read_text(encoding="utf-8")
-
-    # Extract frontmatter between --- delimiters
-    fm_match = re.match(r"^---\n(.*?)\n---\n", text, re.DOTALL)
-    frontmatter = {}
-    if fm_match:
-        for line in fm_match.group(1).splitlines():
-            if ":" in line:
-                key, _, val = line.partition(":")
-                frontmatter[key.strip()] = val.strip()
-
-    # Post type: text | image | carousel
-    post_type = frontmatter.get("type", "text")
-
-    # Extract caption/content
-    # For carousels it's under "## Post Caption", for others "## Post Content"
-    content_match = re.search(
-        r"## Post (?:Content|Caption)\n\n(.*?)(?=\n## |\Z)", text, re.DOTALL
-    )
-    content = content_match.group(1).strip() if content_match else ""
 
-    # Extract hashtags from frontmatter or from post
-    raw_hashtags = frontmatter.get("hashtags", "")
-    hashtags = [h.strip().lstrip("#") for h in raw_hashtags.split(",") if h.strip()]
-
-    return {
-        "type": post_type,
-        "topic": frontmatter.get("topic", "Unknown"),
-        "content": content,
-        "hashtags": hashtags,
-        "pdf_path": frontmatter.get("pdf_path", ""),
-        "image_path": frontmatter.get("image_path", ""),
-        "best_time": frontmatter.get("best_time", ""),
-    }
+def update_dashboard(topic: str, status: str, post_urn: str = "") -> None:
+    """Append a row to the Dashboard's activity table (written asynchronously)."""
+    dashboard.record_activity(topic, status, post_urn)
 
 
-def update_dashboard(topic: str, status: str, post_urn: str = "") -> None:
-    """Append a row to the Dashboard's activity table."""
-    if not DASHBOARD_FILE.exists():
-        return
-
-    text = DASHBOARD_FILE.read_text(encoding="utf-8")
-    today = datetime.now().strftime("%Y-%m-%d %H:%M")
-    new_row = f"| {today} | {topic[:40]} | {status} | — | — |"
-
-    # Insert after the table header separator line
-    text = re.sub(
-        r"(\| Date \| Post Topic \| Status \| Likes \| Comments \|\n\|[-| ]+\|)\n",
-        rf"\1\n{new_row}\n",
-        text,
+@metrics.timed("index_update")
+def _index_move(src: Path, dest: Path, post_urn: str = "") -> None:
+    """Keep the vault index, and the Dashboard queue counts it feeds, in step with a file move."""
+    try:
+        index = vault_index.get_index()
+        index.forget_file(src)
+        index.record_file(dest, post_urn=post_urn)
+        for key, value in index.queue_summary().items():
+            dashboard.set_status(key, value)
+    except sqlite3.Error as e:
+        logger.warning(f"[Watcher] Vault index not updated: {e}")
+
+
+def _published_on(day: date) -> int:
+    from linkedin_poster import get_todays_post_count
+    return get_todays_post_count() if day == date.today() else 0
+
+
+def default_publish_queue() -> PublishQueue:
+    from linkedin_poster import MAX_POSTS_PER_DAY
+    return PublishQueue(
+        PUBLISH_QUEUE_FILE,
+        max_per_day=MAX_POSTS_PER_DAY,
+        published_on=_published_on,
+        min_gap=timedelta(minutes=PUBLISH_MIN_GAP_MINUTES),
+        overflow_time=PUBLISH_OVERFLOW_TIME,
     )
-    # Update "Last Updated"
-    text = re.sub(r"- \*\*Last Updated:\*\* .*", f"- **Last Updated:** {today}", text)
-
-    DASHBOARD_FILE.write_text(text, encoding="utf-8")
 
 
 class ApprovalHandler(FileSystemEventHandler):
+    def __init__(
+        self,
+        work_queue: WorkQueue | None = None,
+        index: FolderIndex | None = None,
+        publish_queue: PublishQueue | None = None,
+    ):
+        super().__init__()
+        self.index = index or FolderIndex(APPROVED_DIR, APPROVED_INDEX_FILE)
+        self.publish_queue = publish_queue or default_publish_queue()
+        self.queue = work_queue or WorkQueue(
+            self._handle,
+            workers=WATCHER_WORKERS,
+            max_size=WATCHER_QUEUE_SIZE,
+            debounce=WATCHER_DEBOUNCE_SECONDS,
+            name="PostWorker",
+        )
+
     def on_created(self, event):
         if event.is_directory:
             return
@@ -98,10 +106,75 @@ class ApprovalHandler(FileSystemEventHandler):
         if filepath.suffix != ".md":
             return
 
-        logger.info(f"[Watcher] Approved file detected: {filepath.name}")
-        self._process_post(filepath)
-
-    def _process_post(self, filepath: Path) -> None:
+        if self.queue.submit(filepath):
+            logger.info(f"[Watcher] Approved file detected: {filepath.name} (queue depth {self.queue.metrics()['depth']})")
+
+    def catch_up(self) -> int:
+        """Queue files that landed in /Approved/ while the watcher was not running."""
+        missed = self.index.changed_files()
+        queued = sum(1 for path in missed if self.queue.submit(path))
+        if queued:
+            logger.info(f"[Watcher] Catch-up: queued {queued} file(s) approved while offline.")
+        return queued
+
+    def dispatch_due(self) -> int:
+        """Hand scheduled posts whose time has come to the workers."""
+        queued = 0
+        for path in self.publish_queue.pop_due():
+            if not path.exists():
+                logger.warning(f"[Watcher] Scheduled file no longer in /Approved/, dropping: {path.name}")
+                self.publish_queue.remove(path)
+            elif self.queue.submit(path, timeout=1.0):
+                logger.info(f"[Watcher] Scheduled post due: {path.name}")
+                queued += 1
+            elif not self.queue.is_pending(path):
+                self.publish_queue.release(path)  # queue full; try again on the next pass
+        return queued
+
+    def _handle(self, filepath: Path) -> None:
+        deferred = False
+        try:
+            with metrics.timed("process_post"):
+                deferred = self._process_post(filepath)
+        finally:
+            if not deferred:
+                try:
+                    self.publish_queue.remove(filepath)
+                    dashboard.set_status("Scheduled", f"{len(self.publish_queue)} posts")
+                except sqlite3.Error as e:
+                    logger.warning(f"[Watcher] Publish queue not updated: {e}")
+            # Still here means it was skipped or could not be posted; don't retry it on every restart.
+            self.index.mark_handled(filepath)
+
+    def _schedule(self, filepath: Path, parsed: dict) -> datetime | None:
+        """The time to post `filepath` if that is later than now, else None (post now)."""
+        now = datetime.now()
+        desired = parse_best_time(parsed["best_time"], now, PUBLISH_OVERFLOW_TIME)
+        if desired is None and parsed["best_time"]:
+            logger.warning(f"[Watcher] Could not read best_time {parsed['best_time']!r} in {filepath.name}; posting when possible.")
+        overflow_time = desired.time() if desired else None
+        try:
+            due = self.publish_queue.schedule(filepath, max(desired or now, now), parsed["topic"], overflow_time, now)
+        except sqlite3.Error as e:
+            logger.warning(f"[Watcher] Publish queue unavailable ({e}); posting {filepath.name} now.")
+            return None
+        return None if is_due(due, now) else due
+
+    def _defer(self, filepath: Path, parsed: dict, retry_at: float) -> bool:
+        """Reschedule a post LinkedIn throttled for when the throttle lifts. False if that failed."""
+        due = datetime.fromtimestamp(retry_at)
+        try:
+            self.publish_queue.defer(filepath, due, parsed["topic"])
+        except sqlite3.Error as e:
+            logger.warning(f"[Watcher] Publish queue not updated: {e}")
+            return False
+        logger.warning(f"[Watcher] LinkedIn is throttling posts. Scheduled {filepath.name} for {due:%Y-%m-%d %H:%M:%S}")
+        update_dashboard(parsed["topic"], f"⏳ Throttled, retrying {due:%a %d %b %H:%M}")
+        dashboard.set_status("Scheduled", f"{len(self.publish_queue)} posts")
+        return True
+
+    def _process_post(self, filepath: Path) -> bool:
+        """Post `filepath`. True if it was scheduled for later instead."""
         from linkedin_poster import (
             post_to_linkedin,
             post_image_to_linkedin,
@@ -109,12 +182,20 @@ class ApprovalHandler(FileSystemEventHandler):
         )
 
         try:
-            parsed = parse_post_file(filepath)
+            with metrics.timed("parse"):
+                parsed = parse_post_file(filepath)
             post_type = parsed.get("type", "text")
 
             if not parsed["content"]:
                 logger.warning(f"[Watcher] No content found in {filepath.name}, skipping.")
-                return
+                return False
+
+            due = self._schedule(filepath, parsed)
+            if due is not None:
+                logger.info(f"[Watcher] Scheduled {filepath.name} for {due:%Y-%m-%d %H:%M}")
+                update_dashboard(parsed["topic"], f"🕒 Scheduled for {due:%a %d %b %H:%M}")
+                dashboard.set_status("Scheduled", f"{len(self.publish_queue)} posts")
+                return True
 
             # Route to correct poster based on type
             if post_type == "image":
@@ -122,7 +203,7 @@ class ApprovalHandler(FileSystemEventHandler):
                 if not image_path or not Path(image_path).exists():
                     logger.error(f"[Watcher] Image not found: {image_path}")
                     update_dashboard(parsed["topic"], "❌ Image not found")
-                    return
+                    return False
                 result = post_image_to_linkedin(
                     content=parsed["content"],
                     hashtags=parsed["hashtags"],
@@ -136,7 +217,7 @@ class ApprovalHandler(FileSystemEventHandler):
                 if not pdf_path or not Path(pdf_path).exists():
                     logger.error(f"[Watcher] PDF not found: {pdf_path}")
                     update_dashboard(parsed["topic"], "❌ PDF not found")
-                    return
+                    return False
                 result = post_carousel_to_linkedin(
                     content=parsed["content"],
                     hashtags=parsed["hashtags"],
@@ -148,7 +229,8 @@ class ApprovalHandler(FileSystemEventHandler):
                 if result["success"]:
                     pdf_src = Path(pdf_path)
                     if pdf_src.exists():
-                        shutil.move(str(pdf_src), str(PUBLISHED_DIR / pdf_src.name))
+                        with metrics.timed("file_move"):
+                            shutil.move(str(pdf_src), str(PUBLISHED_DIR / pdf_src.name))
 
             else:
                 result = post_to_linkedin(
@@ -159,47 +241,104 @@ class ApprovalHandler(FileSystemEventHandler):
 
             type_label = {"image": "🖼️ Image", "carousel": "📊 Carousel"}.get(post_type, "📝 Text")
 
+            if not result["success"] and result.get("retry_at") and self._defer(filepath, parsed, result["retry_at"]):
+                return True
+
             if result["success"]:
                 dest = PUBLISHED_DIR / filepath.name
-                shutil.move(str(filepath), str(dest))
+                with metrics.timed("file_move"):
+                    shutil.move(str(filepath), str(dest))
                 logger.info(f"[Watcher] Moved to Published: {filepath.name}")
                 update_dashboard(parsed["topic"], f"✅ {type_label} Published", result["post_urn"])
+                _index_move(filepath, dest, result["post_urn"])
             else:
                 error_note = NEEDS_ACTION_DIR / f"ERROR_{filepath.name}"
-                filepath.rename(error_note)
-                error_note.write_text(
-                    error_note.read_text(encoding="utf-8")
-                    + f"\n\n## Error\n{result['message']}\n",
-                    encoding="utf-8",
-                )
+                with metrics.timed("file_move"):
+                    filepath.rename(error_note)
+                    error_note.write_text(
+                        error_note.read_text(encoding="utf-8")
+                        + f"\n\n## Error\n{result['message']}\n",
+                        encoding="utf-8",
+                    )
                 logger.error(f"[Watcher] Posting failed, moved to Needs_Action: {filepath.name}")
                 update_dashboard(parsed["topic"], "❌ Failed")
+                _index_move(filepath, error_note)
 
         except Exception as e:
             logger.error(f"[Watcher] Error processing {filepath.name}: {e}")
+        return False
+
 
+_active_handler: ApprovalHandler | None = None
 
-def run():
+
+def get_queue_metrics() -> dict:
+    """Depth, counters and latencies of the running watcher's work queue ({} if not running)."""
+    return _active_handler.queue.metrics() if _active_handler else {}
+
+
+def run(stop_event: threading.Event | None = None, drain_timeout: float = WATCHER_DRAIN_SECONDS) -> None:
+    """
+    Watch /Approved/ until `stop_event` is set (or Ctrl+C when run directly).
+    On stop, posts already being published get `drain_timeout` seconds to
+    finish; files still waiting in the queue are left in /Approved/ and picked
+    up by catch-up on the next start.
+    """
+    global _active_handler
+    stop_event = stop_event or threading.Event()
     APPROVED_DIR.mkdir(parents=True, exist_ok=True)
     PUBLISHED_DIR.mkdir(parents=True, exist_ok=True)
     NEEDS_ACTION_DIR.mkdir(parents=True, exist_ok=True)
 
     observer = Observer()
     handler = ApprovalHandler()
+    handler.queue.start()
+    _active_handler = handler
     observer.schedule(handler, str(APPROVED_DIR), recursive=False)
     observer.start()
+    handler.publish_queue.release_all()
+    handler.catch_up()
 
     logger.info(f"[Watcher] Watching: {APPROVED_DIR}")
     logger.info("[Watcher] Move .md files to /Approved/ to trigger posting.")
 
     try:
-        import time
+        next_report = time.monotonic() + 60
         while True:
-            time.sleep(5)
+            handler.dispatch_due()
+            # Sleep until the next scheduled post is due (posts scheduled meanwhile are seen within 5s)
+            wait = 5.0
+            next_due = handler.publish_queue.next_due()
+            if next_due is not None:
+                wait = min(wait, max(next_due - time.time(), 0.0))
+            if stop_event.wait(wait):
+                break
+            if time.monotonic() >= next_report:
+                next_report += 60
+                m = handler.queue.metrics()
+                if m["depth"] or m["in_flight"]:
+                    logger.info(
+                        f"[Watcher] Queue depth {m['depth']}, in flight {m['in_flight']}, "
+                        f"avg wait {m['wait_seconds_avg']:.1f}s, avg run {m['run_seconds_avg']:.1f}s"
+                    )
     except KeyboardInterrupt:
+        pass
+    finally:
         observer.stop()
-        logger.info("[Watcher] Stopped.")
-    observer.join()
+        in_flight = handler.queue.metrics()["in_flight"]
+        drained = handler.queue.stop(timeout=drain_timeout, discard_pending=True)
+        observer.join(timeout=5)
+        m = handler.queue.metrics()
+        if drained:
+            logger.info(
+                f"[Watcher] Stopped after finishing {in_flight} in-flight post(s); "
+                f"{m['discarded']} queued file(s) left for the next start."
+            )
+        else:
+            logger.warning(
+                f"[Watcher] {m['in_flight']} post(s) still running after {drain_timeout:.0f}s; "
+                "they are abandoned and will be retried on the next start."
+            )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,90 @@
+"""
+Asset Cache — content-hash → LinkedIn asset URN, so identical media is uploaded once.
+
+Keyed by (SHA-256 of the file, upload recipe, owner URN). A retry after a
+failed ugcPosts call, or re-posting the same image, reuses the registered asset
+and skips both the registerUpload and the binary PUT. Entries expire after
+ASSET_CACHE_TTL_HOURS, since LinkedIn eventually discards unused assets.
+
+Stored as JSON in vault/.cache/assets.json; writes merge with what is on disk
+and replace the file atomically.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ASSET_CACHE_TTL = float(os.getenv("ASSET_CACHE_TTL_HOURS", "24")) * 3600
+
+
+def file_digest(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class AssetCache:
+    def __init__(self, path: Path, ttl: float = ASSET_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(digest: str, recipe: str, owner: str) -> str:
+        return f"{digest}:{recipe}:{owner}"
+
+    def _read(self) -> dict:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, entries: dict) -> None:
+        now = time.time()
+        live = {k: v for k, v in entries.items() if v.get("expires_at", 0) > now}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(live, indent=2), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"[AssetCache] Could not write {self.path}: {e}")
+
+    def get(self, digest: str, recipe: str, owner: str) -> str:
+        """Cached asset URN, or "" if missing/expired."""
+        with self._lock:
+            entry = self._read().get(self._key(digest, recipe, owner))
+        if entry and entry.get("expires_at", 0) > time.time():
+            return entry["asset_urn"]
+        return ""
+
+    def put(self, digest: str, recipe: str, owner: str, asset_urn: str) -> None:
+        with self._lock:
+            entries = self._read()
+            entries[self._key(digest, recipe, owner)] = {
+                "asset_urn": asset_urn,
+                "expires_at": time.time() + self.ttl,
+            }
+            self._write(entries)
+
+    def evict_asset(self, asset_urn: str) -> None:
+        """Forget an asset LinkedIn rejected, so the next attempt re-uploads."""
+        with self._lock:
+            entries = self._read()
+            stale = [k for k, v in entries.items() if v.get("asset_urn") == asset_urn]
+            if stale:
+                for k in stale:
+                    del entries[k]
+                self._write(entries)
@@ -13,11 +13,45 @@ Usage:
         ],
         output_path="vault/Pending_Approval/CAROUSEL_my-topic.pdf"
     )
+
+Smallest file (hint-stripped fonts, capped size): create_carousel_pdf(..., compact=True,
+max_bytes=300_000). CAROUSEL_COMPACT / CAROUSEL_MAX_BYTES set the defaults.
+
+Many decks at once (rendered across a process pool, yielded as they finish):
+    from carousel_generator import create_carousels
+    for result in create_carousels([spec1, spec2, ...]):
+        print(result["path"], result["seconds"])
 """
 
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from typing import Iterable, Iterator
+import fpdf
 from fpdf import FPDF
+from fpdf.errors import FPDFUnicodeEncodingException
 import os
+import time
+import hashlib
+from font_cache import add_cached_font, compact_font, find_font_pair, font_metrics
+from render_cache import RenderCache
+import slide_layout
+from slide_layout import GlyphWidths
+from fpdf.fonts import CORE_FONTS_CHARWIDTHS
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CAROUSEL_MAX_WORKERS = int(os.getenv("CAROUSEL_MAX_WORKERS", "0")) or None  # None = one per core
+
+# Rendered decks are cached by content; bump RENDER_VERSION after a styling change
+# that lives outside this file (edits to this file invalidate the cache on their own).
+RENDER_VERSION = "1"
+VAULT_PATH = Path(os.getenv("VAULT_PATH", "vault"))
+CAROUSEL_CACHE_DIR = VAULT_PATH / ".cache" / "carousels"
+CAROUSEL_CACHE_MAX_MB = float(os.getenv("CAROUSEL_CACHE_MAX_MB", "200"))  # 0 disables the cache
+
+CAROUSEL_COMPACT = os.getenv("CAROUSEL_COMPACT", "false").lower() == "true"
+CAROUSEL_MAX_BYTES = int(os.getenv("CAROUSEL_MAX_BYTES", "0"))  # 0 = no budget
 
 
 # ─── Color Palette ───────────────────────────────────────────────
@@ -29,42 +63,65 @@ TEXT_MUTED      = (148, 163, 184)
 SLIDE_NUMBER_BG = (30, 41, 59)
 
 
-WINDOWS_FONTS = [
-    r"C:\Windows\Fonts\arial.ttf",
-    r"C:\Windows\Fonts\calibri.ttf",
-    r"C:\Windows\Fonts\segoeui.ttf",
-]
-WINDOWS_FONTS_BOLD = [
-    r"C:\Windows\Fonts\arialbd.ttf",
-    r"C:\Windows\Fonts\calibrib.ttf",
-    r"C:\Windows\Fonts\segoeuib.ttf",
-]
+_font_files: tuple[str | None, str | None] | None = None
+
+
+def _unicode_fonts() -> tuple[str | None, str | None]:
+    """(regular, bold) font files, looked up once per process."""
+    global _font_files
+    if _font_files is None:
+        _font_files = find_font_pair()
+    return _font_files
+
+
+def _clean_body(body: str) -> str:
+    """Body text as drawn: unicode arrows replaced with ASCII."""
+    return body.replace("\u2192", "->").replace("\u2190", "<-")
+
 
+_widths: dict[str, GlyphWidths] = {}
 
-def _find_font(paths: list) -> str | None:
-    for p in paths:
-        if Path(p).exists():
-            return p
-    return None
+
+def _ttf_widths(font_path: str) -> GlyphWidths:
+    if font_path not in _widths:
+        metrics = font_metrics(font_path)
+        if metrics is None:
+            # Font outside the metrics fast path: measure it the slow way, once
+            scratch = FPDF()
+            scratch.add_font("scratch", "", font_path)
+            font = scratch.fonts["scratch"]
+            metrics = {"cw": dict(font.cw), "desc": {"missing_width": font.desc.missing_width}}
+        _widths[font_path] = GlyphWidths(metrics["cw"], metrics["desc"]["missing_width"])
+    return _widths[font_path]
+
+
+def _core_widths(fontkey: str) -> GlyphWidths:
+    if fontkey not in _widths:
+        table = {ord(c): w for c, w in CORE_FONTS_CHARWIDTHS[fontkey].items()}
+        _widths[fontkey] = GlyphWidths(table, 0)
+    return _widths[fontkey]
 
 
 class CarouselPDF(FPDF):
     """Custom PDF with LinkedIn carousel styling."""
 
-    def __init__(self, brand_name: str = ""):
+    def __init__(self, brand_name: str = "", fonts: str = "unicode"):
+        """fonts: "unicode" (system TTFs), "compact" (hint-stripped TTFs) or "core" (Helvetica)."""
         super().__init__(orientation="L", unit="mm", format=(200, 200))  # Square format
         self.brand_name = brand_name
         self.set_auto_page_break(auto=False)
 
         # Load Unicode font if available (for special chars)
-        regular = _find_font(WINDOWS_FONTS)
-        bold = _find_font(WINDOWS_FONTS_BOLD)
+        regular, bold = _unicode_fonts() if fonts != "core" else (None, None)
+        if regular and bold and fonts == "compact":
+            regular, bold = compact_font(regular), compact_font(bold)
         if regular and bold:
-            self.add_font("UniFont", "", regular)
-            self.add_font("UniFont", "B", bold)
+            add_cached_font(self, "UniFont", "", regular)
+            add_cached_font(self, "UniFont", "B", bold)
             self._uni = True
         else:
             self._uni = False
+        self._font_paths = (regular, bold) if self._uni else None
 
     def _font(self, style: str = "", size: int = 12):
         if self._uni:
@@ -73,6 +130,12 @@ class CarouselPDF(FPDF):
             # Fallback: strip non-latin chars handled by fpdf
             self.set_font("Helvetica", style, size)
 
+    def glyph_widths(self) -> tuple[GlyphWidths, GlyphWidths]:
+        """(regular, bold) width tables for the fonts this PDF draws with, for slide_layout."""
+        if self._font_paths:
+            return _ttf_widths(self._font_paths[0]), _ttf_widths(self._font_paths[1])
+        return _core_widths("helvetica"), _core_widths("helveticaB")
+
     def _set_bg(self):
         """Fill page with dark background."""
         self.set_fill_color(*BG_COLOR)
@@ -101,8 +164,11 @@ class CarouselPDF(FPDF):
         self.set_xy(10, 185)
         self.cell(80, 10, self.brand_name.upper())
 
-    def cover_slide(self, title: str, subtitle: str, slide_num: int, total: int):
-        """First slide — big title."""
+    def cover_slide(
+        self, title: str, subtitle: str, slide_num: int, total: int,
+        title_size: float = 28, subtitle_size: float = 14,
+    ):
+        """First slide — big title. Line heights scale with the font sizes."""
         self.add_page()
         self._set_bg()
 
@@ -110,17 +176,17 @@ class CarouselPDF(FPDF):
         self._accent_bar(10, 40, 8, 120)
 
         # Title
-        self._font("B", 28)
+        self._font("B", title_size)
         self.set_text_color(*TEXT_WHITE)
         self.set_xy(28, 45)
-        self.multi_cell(160, 16, title, align="L")
+        self.multi_cell(160, 16 * title_size / 28, title, align="L")
 
         # Subtitle
-        self._font("", 14)
+        self._font("", subtitle_size)
         self.set_text_color(*TEXT_LIGHT)
         y = self.get_y() + 8
         self.set_xy(28, y)
-        self.multi_cell(160, 9, subtitle, align="L")
+        self.multi_cell(160, 9 * subtitle_size / 14, subtitle, align="L")
 
         # CTA at bottom
         self._font("", 10)
@@ -131,8 +197,11 @@ class CarouselPDF(FPDF):
         self._slide_number(slide_num, total)
         self._brand_tag()
 
-    def content_slide(self, heading: str, body: str, slide_num: int, total: int, number_label: str = ""):
-        """Content slide with heading and body text."""
+    def content_slide(
+        self, heading: str, body: str, slide_num: int, total: int, number_label: str = "",
+        heading_size: float = 22, body_size: float = 13,
+    ):
+        """Content slide with heading and body text. Line heights scale with the font sizes."""
         self.add_page()
         self._set_bg()
 
@@ -148,10 +217,10 @@ class CarouselPDF(FPDF):
             self.cell(50, 40, number_label, align="R")
 
         # Heading
-        self._font("B", 22)
+        self._font("B", heading_size)
         self.set_text_color(*TEXT_WHITE)
         self.set_xy(15, 22)
-        self.multi_cell(140, 13, heading, align="L")
+        self.multi_cell(140, 13 * heading_size / 22, heading, align="L")
 
         # Divider
         y_after_heading = self.get_y() + 5
@@ -159,11 +228,11 @@ class CarouselPDF(FPDF):
         self.rect(15, y_after_heading, 40, 1.5, "F")
 
         # Body text — replace unicode arrows with ASCII
-        body_clean = body.replace("\u2192", "->").replace("\u2190", "<-")
-        self._font("", 13)
+        body_clean = _clean_body(body)
+        self._font("", body_size)
         self.set_text_color(*TEXT_LIGHT)
         self.set_xy(15, y_after_heading + 10)
-        self.multi_cell(170, 8, body_clean, align="L")
+        self.multi_cell(170, 8 * body_size / 13, body_clean, align="L")
 
         self._slide_number(slide_num, total)
         self._brand_tag()
@@ -215,6 +284,9 @@ def create_carousel_pdf(
     hashtags: list[str],
     output_path: str,
     brand_name: str = "",
+    use_cache: bool = True,
+    compact: bool = CAROUSEL_COMPACT,
+    max_bytes: int = CAROUSEL_MAX_BYTES,
 ) -> Path:
     """
     Create a styled carousel PDF.
@@ -227,37 +299,204 @@ def create_carousel_pdf(
         hashtags:    List of hashtag strings (without #)
         output_path: Where to save the PDF
         brand_name:  Optional brand/author name shown on each slide
+        use_cache:   Reuse an identical deck rendered earlier (see RenderCache)
+        compact:     Embed hint-stripped font copies for a smaller file
+        max_bytes:   Size budget; an over-budget deck is re-rendered with the
+                     built-in Helvetica (no embedded fonts) if its text allows
 
     Returns:
         Path to the generated PDF
+
+    Raises:
+        ValueError: the deck cannot be brought under max_bytes (the file is removed),
+                    or its text needs a Unicode font and none is available
     """
     output = Path(output_path)
     output.parent.mkdir(parents=True, exist_ok=True)
 
-    total_slides = 2 + len(slides)  # cover + content slides + CTA
-    pdf = CarouselPDF(brand_name=brand_name)
+    tags_str = "  ".join(f"#{h.lstrip('#')}" for h in hashtags)
+
+    # Key on exactly what gets drawn, so unused slide keys or "#"-prefixed tags don't miss
+    cache_key = RenderCache.key(
+        {
+            "title": title,
+            "subtitle": subtitle,
+            "slides": [[s.get("heading", ""), s.get("body", "")] for s in slides],
+            "cta_text": cta_text,
+            "hashtags": tags_str,
+            "brand_name": brand_name,
+            "compact": compact,
+            "max_bytes": max_bytes,
+        },
+        theme_version(),
+    )
+    if use_cache and _render_cache.get(cache_key, output):
+        print(f"[Carousel] PDF reused from cache: {output}")
+        return output
+
+    attempts = ["compact" if compact else "unicode"]
+    if max_bytes and _unicode_fonts()[0]:
+        attempts.append("core")
+    data = None
+    for fonts in attempts:
+        try:
+            pdf = _build_deck(title, subtitle, slides, cta_text, tags_str, brand_name, fonts)
+        except FPDFUnicodeEncodingException:
+            if data is None:
+                raise ValueError(
+                    f"Carousel text for '{title}' needs a Unicode font and none was found "
+                    "(set CAROUSEL_FONT_REGULAR / CAROUSEL_FONT_BOLD or CAROUSEL_FONT_DIRS)"
+                ) from None
+            break  # text Helvetica can't encode; keep the over-budget verdict
+        data = pdf.output()
+        if not max_bytes or len(data) <= max_bytes:
+            break
+        print(f"[Carousel] {len(data):,} bytes with {fonts} fonts, over the {max_bytes:,}-byte budget")
+    else:
+        data = None
+
+    if data is None or (max_bytes and len(data) > max_bytes):
+        output.unlink(missing_ok=True)
+        raise ValueError(f"Carousel PDF for '{title}' does not fit in {max_bytes:,} bytes")
+
+    tmp = output.with_name(f".{output.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, output)
+    if use_cache:
+        _render_cache.put(cache_key, output)
+    print(f"[Carousel] PDF created: {output}  ({pdf.pages_count} slides, {len(data):,} bytes)")
+    return output
+
+
+def _build_deck(
+    title: str,
+    subtitle: str,
+    slides: list[dict],
+    cta_text: str,
+    tags_str: str,
+    brand_name: str,
+    fonts: str,
+) -> CarouselPDF:
+    pdf = CarouselPDF(brand_name=brand_name, fonts=fonts)
+    regular, bold = pdf.glyph_widths()
+
+    # Lay out every slide first: sizes that fit, and continuation slides for long bodies
+    cover = slide_layout.fit_cover(title, subtitle, regular, bold)
+    if not cover["fits"]:
+        print(f"[Carousel] Cover text for '{title[:40]}' overflows even at the smallest size")
+    pages = []
+    for i, slide in enumerate(slides, start=1):
+        for page in slide_layout.fit_content(slide.get("heading", ""), _clean_body(slide.get("body", "")), regular, bold):
+            pages.append((f"{i:02d}", page))
+    total_slides = 2 + len(pages)  # cover + content slides + CTA
 
     # Cover slide
-    pdf.cover_slide(title, subtitle, slide_num=1, total=total_slides)
+    pdf.cover_slide(
+        title, subtitle, slide_num=1, total=total_slides,
+        title_size=cover["title_size"], subtitle_size=cover["subtitle_size"],
+    )
 
     # Content slides
-    for i, slide in enumerate(slides, start=1):
-        number_label = f"{i:02d}"
+    for n, (number_label, page) in enumerate(pages, start=2):
         pdf.content_slide(
-            heading=slide.get("heading", ""),
-            body=slide.get("body", ""),
-            slide_num=i + 1,
+            heading=page["heading"],
+            body=page["body"],
+            slide_num=n,
             total=total_slides,
             number_label=number_label,
+            heading_size=page["heading_size"],
+            body_size=page["body_size"],
         )
 
     # CTA slide
-    tags_str = "  ".join(f"#{h.lstrip('#')}" for h in hashtags)
     pdf.cta_slide(cta_text, tags_str, slide_num=total_slides, total=total_slides)
+    return pdf
 
-    pdf.output(str(output))
-    print(f"[Carousel] PDF created: {output}  ({total_slides} slides)")
-    return output
+
+# ─── Render cache ────────────────────────────────────────────────
+
+_render_cache = RenderCache(CAROUSEL_CACHE_DIR, int(CAROUSEL_CACHE_MAX_MB * 1024 * 1024))
+_theme_version: str | None = None
+
+
+def theme_version() -> str:
+    """
+    Everything besides the deck content that changes the rendered PDF:
+    RENDER_VERSION, this module's source (palette and CarouselPDF layout),
+    the fpdf2 version and the fonts this process renders with.
+    """
+    global _theme_version
+    if _theme_version is None:
+        h = hashlib.sha256(RENDER_VERSION.encode())
+        h.update(Path(__file__).read_bytes())
+        h.update(Path(slide_layout.__file__).read_bytes())
+        h.update(fpdf.FPDF_VERSION.encode())
+        for font in _unicode_fonts():
+            h.update(f"\n{font}".encode())
+        _theme_version = h.hexdigest()[:16]
+    return _theme_version
+
+
+def clear_render_cache() -> int:
+    """Throw away every cached deck, e.g. after changing fonts. Returns files removed."""
+    return _render_cache.clear()
+
+
+# ─── Batch rendering ─────────────────────────────────────────────
+
+def _init_worker():
+    """Runs once per pool process: font lookup and parsing are shared by every deck it renders."""
+    # An exception here would break the whole pool; decks still render (and report errors) without the warm-up.
+    try:
+        for font in _unicode_fonts():
+            if font:
+                font_metrics(compact_font(font) if CAROUSEL_COMPACT else font)
+    except Exception as e:
+        print(f"[Carousel] Font warm-up failed in worker, continuing without it: {e}")
+
+
+def _render_spec(index: int, spec: dict) -> dict:
+    started = time.perf_counter()
+    try:
+        path = create_carousel_pdf(**spec)
+        error = ""
+    except Exception as e:
+        path, error = None, f"{type(e).__name__}: {e}"
+    return {
+        "index": index,
+        "path": path,
+        "slides": 2 + len(spec.get("slides", [])),
+        "seconds": time.perf_counter() - started,
+        "error": error,
+    }
+
+
+def create_carousels(specs: Iterable[dict], max_workers: int | None = CAROUSEL_MAX_WORKERS) -> Iterator[dict]:
+    """
+    Render many carousel PDFs across a process pool.
+
+    Args:
+        specs:       Dicts of create_carousel_pdf() keyword arguments, one per deck
+        max_workers: Pool size (default: CAROUSEL_MAX_WORKERS, or one per core)
+
+    Yields (in completion order, not input order):
+        {"index": position in specs, "path": Path or None, "slides": int,
+         "seconds": render time, "error": "" or the failure message}
+
+    A failing deck is reported through "error" and does not stop the others.
+    With a single deck or a single worker, decks are rendered in this process.
+    """
+    specs = list(specs)
+    workers = min(max_workers or os.cpu_count() or 1, len(specs))
+    if workers <= 1:
+        for i, spec in enumerate(specs):
+            yield _render_spec(i, spec)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(_render_spec, i, spec) for i, spec in enumerate(specs)]
+        for future in as_completed(futures):
+            yield future.result()
 
 
 # ─── Quick test ───────────────────────────────────────────────────
@@ -0,0 +1,192 @@
+"""
+Dashboard Writer — the only code that writes vault/Dashboard.md.
+
+Callers post small update messages (an activity row, a status field) and
+return immediately. One background thread collects everything that arrives
+within DASHBOARD_FLUSH_WINDOW seconds, applies it to an in-memory model of the
+file, and writes the result once via a temp file + atomic rename. A burst of
+ten posts becomes one rewrite, and two threads can no longer overwrite each
+other's changes.
+
+The activity table keeps the newest DASHBOARD_MAX_ROWS rows so the file stays
+small. If someone edits the dashboard by hand (e.g. in Obsidian), the model is
+reloaded from disk before the next write.
+"""
+
+import os
+import re
+import time
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+import metrics
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+VAULT_PATH = Path(os.getenv("VAULT_PATH", "vault"))
+DASHBOARD_FILE = VAULT_PATH / "Dashboard.md"
+DASHBOARD_FLUSH_WINDOW = float(os.getenv("DASHBOARD_FLUSH_WINDOW", "0.5"))
+DASHBOARD_MAX_ROWS = int(os.getenv("DASHBOARD_MAX_ROWS", "50"))
+
+_TABLE_HEADER_RE = re.compile(r"^\| Date \| Post Topic \| Status \| Likes \| Comments \|\n\|[-| ]+\|\n", re.M)
+_PLACEHOLDER_ROW = "| —    | —         | —      | —     | —        |"
+
+
+class DashboardModel:
+    """Dashboard.md split into the activity rows and everything around them."""
+
+    def __init__(self, text: str):
+        self.head, self.rows, self.tail = text, [], ""
+        self.has_table = False
+        m = _TABLE_HEADER_RE.search(text)
+        if not m:
+            return
+        self.head = text[:m.end()]
+        rest = text[m.end():]
+        lines = rest.split("\n")
+        n = 0
+        while n < len(lines) and lines[n].startswith("|"):
+            n += 1
+        self.rows = [line for line in lines[:n] if not _is_placeholder(line)]
+        self.tail = "\n".join(lines[n:])
+        self.has_table = True
+
+    def add_row(self, row: str, max_rows: int) -> None:
+        self.rows.insert(0, row)
+        del self.rows[max_rows:]
+
+    def set_field(self, key: str, value: str) -> None:
+        pattern = re.compile(rf"^- \*\*{re.escape(key)}:\*\* .*$", re.M)
+        replacement = f"- **{key}:** {value}"
+        self.head = pattern.sub(lambda _: replacement, self.head)
+        self.tail = pattern.sub(lambda _: replacement, self.tail)
+
+    def render(self) -> str:
+        if not self.has_table:
+            return self.head
+        rows = self.rows or [_PLACEHOLDER_ROW]
+        return self.head + "\n".join(rows) + "\n" + self.tail
+
+
+def _is_placeholder(row: str) -> bool:
+    cells = [c.strip() for c in row.strip().strip("|").split("|")]
+    return all(c in ("—", "") for c in cells)
+
+
+class DashboardWriter:
+    def __init__(
+        self,
+        path: Path = DASHBOARD_FILE,
+        window: float = DASHBOARD_FLUSH_WINDOW,
+        max_rows: int = DASHBOARD_MAX_ROWS,
+    ):
+        self.path = path
+        self.window = window
+        self.max_rows = max_rows
+        self.writes = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._model: DashboardModel | None = None
+        self._written_mtime_ns = 0
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+    # ── producer side ─────────────────────────
+
+    def add_activity(self, topic: str, status: str, post_urn: str = "") -> None:
+        self._send(("row", topic, status, datetime.now().strftime("%Y-%m-%d %H:%M")))
+
+    def set_field(self, key: str, value: str) -> None:
+        self._send(("field", key, value))
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything sent so far is on disk."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._send(("flush", done))
+        return done.wait(timeout)
+
+    def _send(self, msg: tuple) -> None:
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True, name="DashboardWriter")
+                self._thread.start()
+        self._queue.put(msg)
+
+    # ── writer thread ─────────────────────────
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            # Coalesce whatever arrives within the window, unless someone is waiting on a flush.
+            deadline = time.monotonic() + self.window
+            while batch[-1][0] != "flush":
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._apply(batch)
+            except Exception as e:
+                logger.error(f"[Dashboard] Update failed: {e}")
+            for msg in batch:
+                if msg[0] == "flush":
+                    msg[1].set()
+
+    def _load(self) -> DashboardModel | None:
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if self._model is None or mtime != self._written_mtime_ns:
+            self._model = DashboardModel(self.path.read_text(encoding="utf-8"))
+        return self._model
+
+    def _apply(self, batch: list[tuple]) -> None:
+        updates = [m for m in batch if m[0] != "flush"]
+        if not updates:
+            return
+        model = self._load()
+        if model is None:
+            return
+        for msg in updates:
+            if msg[0] == "row":
+                _, topic, status, when = msg
+                model.add_row(f"| {when} | {topic[:40]} | {status} | — | — |", self.max_rows)
+            elif msg[0] == "field":
+                model.set_field(msg[1], msg[2])
+        model.set_field("Last Updated", datetime.now().strftime("%Y-%m-%d %H:%M"))
+
+        with metrics.timed("dashboard_write"):
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(model.render(), encoding="utf-8")
+            os.replace(tmp, self.path)
+            self._written_mtime_ns = self.path.stat().st_mtime_ns
+        self.writes += 1
+
+
+_writer = DashboardWriter()
+atexit.register(_writer.flush, 2.0)
+
+
+def record_activity(topic: str, status: str, post_urn: str = "") -> None:
+    """Queue a row for the Dashboard's activity table."""
+    _writer.add_activity(topic, status, post_urn)
+
+
+def set_status(key: str, value: str) -> None:
+    """Queue an update to a `- **Key:** value` line."""
+    _writer.set_field(key, value)
+
+
+def flush(timeout: float = 5.0) -> bool:
+    return _writer.flush(timeout)
@@ -0,0 +1,88 @@
+"""
+Folder Index — persisted (mtime, size) snapshot of a watched folder.
+
+Watchdog only reports files created while the observer is running. On startup
+the watcher asks this index which files in /Approved/ are new or changed since
+they were last handled, and queues just those.
+
+Files are recorded after they have been handled and are still in the folder
+(skipped or failed posts). Anything else present is, by definition, work that
+was never done. If the folder's own mtime matches the one recorded at the last
+full scan, nothing was added, removed or renamed and the scan is skipped.
+"""
+
+import os
+import json
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class FolderIndex:
+    def __init__(self, folder: Path, index_file: Path, suffix: str = ".md"):
+        self.folder = folder
+        self.index_file = index_file
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._files: dict[str, list[int]] = {}
+        self._dir_mtime_ns = 0
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.index_file.read_text(encoding="utf-8"))
+            self._files = data.get("files", {})
+            self._dir_mtime_ns = data.get("dir_mtime_ns", 0)
+        except (OSError, ValueError):
+            pass
+
+    def _save(self) -> None:
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.index_file.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(
+                json.dumps({"dir_mtime_ns": self._dir_mtime_ns, "files": self._files}),
+                encoding="utf-8",
+            )
+            os.replace(tmp, self.index_file)
+        except OSError as e:
+            logger.warning(f"[FolderIndex] Could not write {self.index_file}: {e}")
+
+    def changed_files(self) -> list[Path]:
+        """Files that are new or whose mtime/size changed since they were recorded."""
+        with self._lock:
+            try:
+                dir_mtime = self.folder.stat().st_mtime_ns
+            except FileNotFoundError:
+                return []
+            if dir_mtime == self._dir_mtime_ns:
+                return []
+
+            changed, present = [], set()
+            with os.scandir(self.folder) as it:
+                for entry in it:
+                    if not entry.is_file() or not entry.name.endswith(self.suffix):
+                        continue
+                    present.add(entry.name)
+                    st = entry.stat()
+                    if self._files.get(entry.name) != [st.st_mtime_ns, st.st_size]:
+                        changed.append(Path(entry.path))
+
+            self._files = {k: v for k, v in self._files.items() if k in present}
+            # Only trust the fast path next time if nothing here is still outstanding;
+            # otherwise a crash before these are handled would hide them for good.
+            self._dir_mtime_ns = 0 if changed else dir_mtime
+            self._save()
+            return sorted(changed, key=lambda p: p.name)
+
+    def mark_handled(self, path: Path) -> None:
+        """Record a handled file that stayed in the folder, so restarts skip it."""
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self._files[path.name] = [st.st_mtime_ns, st.st_size]
+            self._save()
@@ -0,0 +1,290 @@
+"""
+Font Cache — finds a Unicode font pair on any OS and skips re-parsing it per PDF.
+
+Discovery: CAROUSEL_FONT_REGULAR / CAROUSEL_FONT_BOLD win if set. Otherwise the
+directories in CAROUSEL_FONT_DIRS (os.pathsep-separated) and then the usual
+Windows, macOS and Linux font folders are searched (recursively, file names
+matched case-insensitively) for the first complete pair in FONT_PAIRS.
+
+Caching: fpdf2's add_font() parses the whole TTF (cmap, hmtx, OS/2, ...) for
+every document, ~30 ms per face. The metrics it derives are stored once as
+JSON under vault/.cache/fonts (keyed by font file, mtime, size and fpdf2
+version) and kept in memory, and `add_cached_font()` builds each document's
+TTFFont from them. The font file itself is opened lazily, so only the glyphs a
+deck uses are read when the PDF is written. Fonts the fast path does not
+cover (symbol/colour fonts, missing .notdef) fall back to add_font().
+
+Compact fonts: `compact_font()` writes a copy of a font with TrueType hinting,
+kerning/layout tables and most name records removed, keeping every glyph.
+fpdf2 still subsets it per document; the embedded subsets are roughly a third
+smaller, and hinting has no visible effect on PDF slides.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from pathlib import Path
+
+import fpdf
+from fpdf import FPDF
+from fpdf.enums import FontDescriptorFlags, TextEmphasis
+from fpdf.fonts import PDFFontDescriptor, SubsetMap, TTFFont
+from fontTools import subset as ftsubset, ttLib
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+VAULT_PATH = Path(os.getenv("VAULT_PATH", "vault"))
+FONT_CACHE_DIR = VAULT_PATH / ".cache" / "fonts"
+# add_cached_font() builds TTFFont objects from fpdf2 2.8 internals; other versions take pdf.add_font()
+_FAST_ADD_FONT = fpdf.FPDF_VERSION.startswith("2.8.")
+
+# (regular, bold) file names, in order of preference
+FONT_PAIRS = [
+    ("arial.ttf", "arialbd.ttf"),
+    ("Arial.ttf", "Arial Bold.ttf"),
+    ("calibri.ttf", "calibrib.ttf"),
+    ("segoeui.ttf", "segoeuib.ttf"),
+    ("LiberationSans-Regular.ttf", "LiberationSans-Bold.ttf"),
+    ("NotoSans-Regular.ttf", "NotoSans-Bold.ttf"),
+    ("DejaVuSans.ttf", "DejaVuSans-Bold.ttf"),
+    ("OpenSans-Regular.ttf", "OpenSans-Bold.ttf"),
+]
+
+
+def _system_font_dirs() -> list[Path]:
+    home = Path.home()
+    if sys.platform == "win32":
+        windir = Path(os.getenv("WINDIR", r"C:\Windows"))
+        local = Path(os.getenv("LOCALAPPDATA", home / "AppData" / "Local"))
+        return [windir / "Fonts", local / "Microsoft" / "Windows" / "Fonts"]
+    if sys.platform == "darwin":
+        return [
+            home / "Library" / "Fonts",
+            Path("/Library/Fonts"),
+            Path("/System/Library/Fonts/Supplemental"),
+            Path("/System/Library/Fonts"),
+        ]
+    data_home = Path(os.getenv("XDG_DATA_HOME", home / ".local" / "share"))
+    return [
+        data_home / "fonts",
+        home / ".fonts",
+        Path("/usr/local/share/fonts"),
+        Path("/usr/share/fonts"),
+    ]
+
+
+def font_dirs() -> list[Path]:
+    configured = [Path(p).expanduser() for p in os.getenv("CAROUSEL_FONT_DIRS", "").split(os.pathsep) if p]
+    return configured + _system_font_dirs()
+
+
+def _index_dir(directory: Path) -> dict[str, str]:
+    """Lower-cased file name → path for every .ttf/.otf under `directory`."""
+    found: dict[str, str] = {}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith((".ttf", ".otf")):
+                found.setdefault(name.lower(), os.path.join(root, name))
+    return found
+
+
+def find_font_pair() -> tuple[str | None, str | None]:
+    """(regular, bold) font files, or (None, None) if no complete pair exists."""
+    regular, bold = os.getenv("CAROUSEL_FONT_REGULAR"), os.getenv("CAROUSEL_FONT_BOLD")
+    if regular and bold:
+        if Path(regular).is_file() and Path(bold).is_file():
+            return regular, bold
+        logger.warning("[Fonts] CAROUSEL_FONT_REGULAR/BOLD not found, searching font folders")
+
+    # Earlier directories win, so configured folders override system ones
+    available: dict[str, str] = {}
+    for directory in font_dirs():
+        if directory.is_dir():
+            for name, path in _index_dir(directory).items():
+                available.setdefault(name, path)
+    for reg_name, bold_name in FONT_PAIRS:
+        reg, bld = available.get(reg_name.lower()), available.get(bold_name.lower())
+        if reg and bld:
+            return reg, bld
+    return None, None
+
+
+# ─────────────────────────────────────────────
+# Parsed metrics
+# ─────────────────────────────────────────────
+
+_memory: dict[str, dict | None] = {}
+_memory_lock = threading.Lock()
+
+
+def _cache_file(font_path: Path, st: os.stat_result, suffix: str = ".json") -> Path:
+    ident = f"{font_path.resolve()}|{st.st_mtime_ns}|{st.st_size}|{fpdf.FPDF_VERSION}"
+    return FONT_CACHE_DIR / f"{font_path.stem}-{hashlib.sha256(ident.encode()).hexdigest()[:16]}{suffix}"
+
+
+def _extract(font: TTFFont) -> dict | None:
+    """The parsed, document-independent part of a TTFFont (None if unsupported)."""
+    if font.is_symbol or font.is_compressed or font.color_font is not None:
+        return None
+    if "glyf" in font.ttfont and ".notdef" not in font.ttfont["glyf"]:
+        return None
+    desc = font.desc
+    return {
+        "scale": font.scale,
+        "name": font.name,
+        "up": font.up,
+        "ut": font.ut,
+        "sp": font.sp,
+        "ss": font.ss,
+        "is_cff": font.is_cff,
+        "is_cid_keyed": font.is_cid_keyed,
+        "cff_ros": font.cff_ros,
+        "desc": {
+            "ascent": desc.ascent,
+            "descent": desc.descent,
+            "cap_height": desc.cap_height,
+            "flags": desc.flags.value,
+            "font_b_box": desc.font_b_box,
+            "italic_angle": desc.italic_angle,
+            "stem_v": desc.stem_v,
+            "missing_width": desc.missing_width,
+        },
+        "cmap": font.cmap,
+        "cw": dict(font.cw),
+        "glyph_ids": font.glyph_ids,
+    }
+
+
+def _decode(data: dict | None) -> dict | None:
+    """JSON object keys come back as strings; restore the int code points."""
+    if data is None:
+        return None
+    for table in ("cmap", "cw", "glyph_ids"):
+        data[table] = {int(k): v for k, v in data[table].items()}
+    if data["cff_ros"]:
+        data["cff_ros"] = tuple(data["cff_ros"])
+    return data
+
+
+def font_metrics(font_path: str | Path) -> dict | None:
+    """Parsed metrics for a font file: from memory, then disk, then a real parse."""
+    font_path = Path(font_path)
+    st = font_path.stat()
+    cache_file = _cache_file(font_path, st)
+    key = str(cache_file)
+    with _memory_lock:
+        if key in _memory:
+            return _memory[key]
+
+    metrics = None
+    try:
+        metrics = _decode(json.loads(cache_file.read_text(encoding="utf-8")))
+    except (OSError, ValueError, KeyError):
+        scratch = FPDF()
+        scratch.add_font("scratch", "", str(font_path))
+        metrics = _extract(scratch.fonts["scratch"])
+        scratch.fonts["scratch"].close()
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(metrics), encoding="utf-8")
+            os.replace(tmp, cache_file)
+        except OSError as e:
+            logger.warning(f"[Fonts] Could not write {cache_file}: {e}")
+
+    with _memory_lock:
+        _memory[key] = metrics
+    return metrics
+
+
+_COMPACT_DROP_TABLES = ["kern", "GPOS", "GSUB", "GDEF", "hdmx", "VDMX", "LTSH", "gasp", "FFTM", "DSIG"]
+
+
+def compact_font(font_path: str | Path) -> Path:
+    """
+    Path to a hint-stripped copy of `font_path`, built once and kept next to the
+    metrics cache. Falls back to the original file if the copy can't be made.
+    """
+    font_path = Path(font_path)
+    if font_path.suffix.lower() != ".ttf":
+        return font_path
+    target = _cache_file(font_path, font_path.stat(), ".compact.ttf")
+    if target.exists():
+        return target
+    try:
+        font = ttLib.TTFont(str(font_path), recalcTimestamp=False)
+        options = ftsubset.Options(
+            hinting=False,
+            notdef_outline=True,
+            recommended_glyphs=True,
+            layout_features=[],
+            name_IDs=[1, 2, 3, 4, 6],
+        )
+        options.drop_tables += _COMPACT_DROP_TABLES
+        subsetter = ftsubset.Subsetter(options)
+        subsetter.populate(unicodes=font.getBestCmap().keys())
+        subsetter.subset(font)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(f".{os.getpid()}.tmp")
+        font.save(str(tmp))
+        os.replace(tmp, target)
+        return target
+    except Exception as e:
+        logger.warning(f"[Fonts] Could not build compact copy of {font_path.name}: {e}")
+        return font_path
+
+
+def add_cached_font(pdf: FPDF, family: str, style: str, font_path: str | Path) -> None:
+    """Drop-in for pdf.add_font(family, style, font_path) that reuses parsed metrics."""
+    if not _FAST_ADD_FONT:
+        pdf.add_font(family, style, str(font_path))
+        return
+    try:
+        metrics = font_metrics(font_path)
+    except Exception as e:
+        logger.warning(f"[Fonts] Metrics cache unavailable for {font_path}: {e}")
+        metrics = None
+    fontkey = f"{family.lower()}{style}"
+    if metrics is None or fontkey in pdf.fonts:
+        pdf.add_font(family, style, str(font_path))
+        return
+
+    # Mirrors TTFFont.__init__ / __deepcopy__: shared read-only tables, per-document state.
+    font = TTFFont.__new__(TTFFont)
+    font.i = len(pdf.fonts) + 1
+    font.type = "TTF"
+    font.ttffile = Path(font_path)
+    font.is_compressed = False
+    font._hbfont = None
+    font.fontkey = fontkey
+    font.biggest_size_pt = 0
+    font.collection_font_number = 0
+    font.ttfont = ttLib.TTFont(str(font_path), recalcTimestamp=False, lazy=True)
+    font.is_cff = metrics["is_cff"]
+    font.is_cid_keyed = metrics["is_cid_keyed"]
+    font.is_symbol = False
+    font.cff_ros = metrics["cff_ros"]
+    font.scale = metrics["scale"]
+    font.desc = PDFFontDescriptor(**dict(metrics["desc"], flags=FontDescriptorFlags(metrics["desc"]["flags"])))
+    missing_width = metrics["desc"]["missing_width"]
+    font.cw = defaultdict(lambda: missing_width, metrics["cw"])
+    font.cmap = metrics["cmap"]
+    font.glyph_ids = dict(metrics["glyph_ids"])
+    font.missing_glyphs = []
+    font.name = metrics["name"]
+    font.up, font.ut = metrics["up"], metrics["ut"]
+    font.sp, font.ss = metrics["sp"], metrics["ss"]
+    font.emphasis = TextEmphasis.coerce(style)
+    font.subset = SubsetMap(font)
+    font.palette_index = 0
+    font.color_font = None
+    pdf.fonts[fontkey] = font
+    if font.is_cff and font.is_cid_keyed:
+        pdf._set_min_pdf_version("1.6")
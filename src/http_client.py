@@ -0,0 +1,160 @@
+"""
+HTTP Client — one pooled, keep-alive session for every LinkedIn API call.
+
+A bare `requests.get/post/put` opens a fresh TLS connection each time; an image
+post used to pay 3–5 handshakes. `LinkedInClient` wraps a `requests.Session`
+with a sized connection pool and per-endpoint timeouts. `LinkedInAuth` hands
+out the process-wide instance, so every module shares the same connections.
+
+Every call also passes through the shared rate limiter (rate_limiter.py): it
+waits for its endpoint family's token first, and the response's 429 /
+Retry-After / rate-limit headers are fed back. A 429 is retried, up to
+RATE_LIMIT_RETRIES times, once the limiter lets calls through again — unless the
+request body is a stream that can't be sent twice.
+
+Tests (or the benchmark/stub tooling) can inject a transport — any
+`requests.adapters.BaseAdapter` — instead of the real HTTPS adapter, or point
+LINKEDIN_API_BASE at a local server.
+"""
+
+import os
+import time
+import threading
+from typing import Callable
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from dotenv import load_dotenv
+import metrics
+from rate_limiter import RateLimiter, get_limiter
+
+load_dotenv()
+
+API_BASE = os.getenv("LINKEDIN_API_BASE", "https://api.linkedin.com/v2").rstrip("/")
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+RATE_LIMIT_RETRIES = int(os.getenv("RATE_LIMIT_RETRIES", "2"))
+
+# Seconds per endpoint; override any of them with HTTP_TIMEOUT_<NAME> (e.g. HTTP_TIMEOUT_UPLOAD=120).
+DEFAULT_TIMEOUTS = {
+    "default": 15.0,
+    "userinfo": 10.0,
+    "me": 10.0,
+    "register_upload": 15.0,
+    "upload": 60.0,
+    "ugc_posts": 15.0,
+    "social_metadata": 10.0,
+    "network_sizes": 10.0,
+}
+
+
+_unauthorized_hooks: list[Callable[[requests.Response], None]] = []
+
+
+def register_unauthorized_hook(hook: Callable[[requests.Response], None]) -> None:
+    """Call `hook(response)` whenever any client receives HTTP 401."""
+    if hook not in _unauthorized_hooks:
+        _unauthorized_hooks.append(hook)
+
+
+def _replayable(kwargs: dict) -> bool:
+    """False if the request body is a stream (file, generator) that is consumed by sending it."""
+    if kwargs.get("files"):
+        return False
+    data = kwargs.get("data")
+    return data is None or isinstance(data, (bytes, str, dict, list, tuple))
+
+
+def _timeouts_from_env() -> dict[str, float]:
+    timeouts = dict(DEFAULT_TIMEOUTS)
+    for name in timeouts:
+        value = os.getenv(f"HTTP_TIMEOUT_{name.upper()}")
+        if value:
+            timeouts[name] = float(value)
+    return timeouts
+
+
+class LinkedInClient:
+    """Pooled HTTP session with per-endpoint timeouts and rate limiting."""
+
+    def __init__(
+        self,
+        pool_size: int = HTTP_POOL_SIZE,
+        timeouts: dict[str, float] | None = None,
+        transport: BaseAdapter | None = None,
+        limiter: RateLimiter | None = None,
+        retries: int = RATE_LIMIT_RETRIES,
+    ):
+        self.timeouts = _timeouts_from_env()
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.limiter = limiter or get_limiter()
+        self.retries = retries
+
+        self.session = requests.Session()
+        adapter = transport or HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def timeout_for(self, endpoint: str) -> float:
+        return self.timeouts.get(endpoint, self.timeouts["default"])
+
+    def request(self, method: str, url: str, endpoint: str = "default", **kwargs) -> requests.Response:
+        """Send once the rate limiter allows it; raises rate_limiter.RateLimited if that is too far off."""
+        kwargs.setdefault("timeout", self.timeout_for(endpoint))
+        attempts = 1 + (self.retries if _replayable(kwargs) else 0)
+        for attempt in range(1, attempts + 1):
+            self.limiter.acquire(endpoint)
+            resp = self._send(method, url, endpoint, **kwargs)
+            retry_after = self.limiter.observe(endpoint, resp.status_code, resp.headers)
+            if retry_after is None or attempt == attempts or retry_after > self.limiter.max_wait:
+                return resp
+            resp.close()
+        return resp
+
+    def _send(self, method: str, url: str, endpoint: str, **kwargs) -> requests.Response:
+        started = time.perf_counter()
+        try:
+            resp = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            metrics.HTTP_RESPONSES.inc(endpoint=endpoint, status="error")
+            raise
+        finally:
+            metrics.HTTP_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+        metrics.HTTP_RESPONSES.inc(endpoint=endpoint, status=resp.status_code)
+        if resp.status_code == 401:
+            for hook in _unauthorized_hooks:
+                hook(resp)
+        return resp
+
+    def get(self, url: str, endpoint: str = "default", **kwargs) -> requests.Response:
+        return self.request("GET", url, endpoint, **kwargs)
+
+    def post(self, url: str, endpoint: str = "default", **kwargs) -> requests.Response:
+        return self.request("POST", url, endpoint, **kwargs)
+
+    def put(self, url: str, endpoint: str = "default", **kwargs) -> requests.Response:
+        return self.request("PUT", url, endpoint, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_shared_client: LinkedInClient | None = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_client() -> LinkedInClient:
+    """Process-wide client, created on first use."""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = LinkedInClient()
+        return _shared_client
+
+
+def set_shared_client(client: LinkedInClient | None) -> None:
+    """Replace the process-wide client (e.g. with one using a stub transport)."""
+    global _shared_client
+    with _shared_lock:
+        old, _shared_client = _shared_client, client
+    if old is not None and old is not client:
+        old.close()
@@ -1,19 +1,117 @@
 """
 LinkedIn OAuth 2.0 Authentication Manager
 Handles token loading and profile URN fetching.
+
+A resolved person URN is cached in-process and on disk, keyed by a hash of the
+access token, so it is looked up once per token rather than once per post.
+Entries expire after IDENTITY_CACHE_TTL_HOURS and are dropped on any HTTP 401.
 """
 
 import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
 import requests
 from dotenv import load_dotenv
+from http_client import API_BASE, LinkedInClient, get_shared_client, register_unauthorized_hook
 
 load_dotenv()
 
+IDENTITY_CACHE_TTL = float(os.getenv("IDENTITY_CACHE_TTL_HOURS", "168")) * 3600
+IDENTITY_CACHE_FILE = Path(os.getenv(
+    "IDENTITY_CACHE_FILE",
+    str(Path(os.getenv("VAULT_PATH", "vault")) / ".cache" / "identity.json"),
+))
+
+
+# ─────────────────────────────────────────────
+# Identity cache
+# ─────────────────────────────────────────────
+
+_identity_cache: dict[str, dict] = {}
+_identity_lock = threading.Lock()
+_identity_loaded = False
+_fetch_locks: dict[str, threading.Lock] = {}  # token key → held while that token's URN is fetched
+
+
+def _token_key(access_token: str) -> str:
+    return hashlib.sha256(access_token.encode("utf-8")).hexdigest()[:32]
+
+
+def _load_identity_file() -> None:
+    global _identity_loaded
+    if _identity_loaded:
+        return
+    _identity_loaded = True
+    try:
+        _identity_cache.update(json.loads(IDENTITY_CACHE_FILE.read_text(encoding="utf-8")))
+    except (OSError, ValueError):
+        pass
+
+
+def _save_identity_file() -> None:
+    now = time.time()
+    live = {k: v for k, v in _identity_cache.items() if v.get("expires_at", 0) > now}
+    try:
+        IDENTITY_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = IDENTITY_CACHE_FILE.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(live, indent=2), encoding="utf-8")
+        os.replace(tmp, IDENTITY_CACHE_FILE)
+    except OSError as e:
+        print(f"[Auth] Could not write identity cache: {e}")
+
+
+def get_cached_urn(access_token: str) -> str:
+    """Cached person URN for this token, or "" if missing/expired."""
+    key = _token_key(access_token)
+    with _identity_lock:
+        _load_identity_file()
+        entry = _identity_cache.get(key)
+        if entry and entry.get("expires_at", 0) > time.time():
+            return entry["urn"]
+    return ""
+
+
+def _fetch_lock(access_token: str) -> threading.Lock:
+    with _identity_lock:
+        return _fetch_locks.setdefault(_token_key(access_token), threading.Lock())
+
+
+def cache_urn(access_token: str, urn: str) -> None:
+    with _identity_lock:
+        _load_identity_file()
+        _identity_cache[_token_key(access_token)] = {"urn": urn, "expires_at": time.time() + IDENTITY_CACHE_TTL}
+        _save_identity_file()
+
+
+def invalidate_urn(access_token: str) -> None:
+    with _identity_lock:
+        _load_identity_file()
+        if _identity_cache.pop(_token_key(access_token), None) is not None:
+            _save_identity_file()
+
+
+def _on_unauthorized(resp: requests.Response) -> None:
+    auth_header = resp.request.headers.get("Authorization", "") if resp.request else ""
+    if auth_header.startswith("Bearer "):
+        invalidate_urn(auth_header[len("Bearer "):])
+
+
+register_unauthorized_hook(_on_unauthorized)
+
+
+# ─────────────────────────────────────────────
+# Auth manager
+# ─────────────────────────────────────────────
+
 
 class LinkedInAuth:
-    BASE_URL = "https://api.linkedin.com/v2"
+    BASE_URL = API_BASE
 
-    def __init__(self):
+    def __init__(self, client: LinkedInClient | None = None):
+        self.client = client or get_shared_client()
         self.access_token = os.getenv("LINKEDIN_ACCESS_TOKEN", "")
         self.person_urn = os.getenv("LINKEDIN_PERSON_URN", "")
 
@@ -34,7 +132,8 @@ class LinkedInAuth:
         """
         Returns the person URN from .env if set correctly,
         otherwise auto-fetches from LinkedIn API.
-        Tries /v2/userinfo (openid scope) then /v2/me (r_liteprofile scope).
+        Tries /v2/userinfo (openid scope) then /v2/me (r_liteprofile scope),
+        caching the result per token.
         """
         # If already set correctly in .env, use it directly
         if (self.person_urn
@@ -44,22 +143,34 @@ class LinkedInAuth:
                 and self.person_urn.strip()):
             return self.person_urn
 
+        if cached := get_cached_urn(self.access_token):
+            return cached
+
+        # One lookup per token: threads that missed the cache together wait for it, then read the cache
+        with _fetch_lock(self.access_token):
+            if cached := get_cached_urn(self.access_token):
+                return cached
+            return self._fetch_profile_urn()
+
+    def _fetch_profile_urn(self) -> str:
         # Try 1: /v2/userinfo — needs openid + profile scope
-        resp = requests.get(f"{self.BASE_URL}/userinfo", headers=self.get_headers(), timeout=10)
+        resp = self.client.get(f"{self.BASE_URL}/userinfo", "userinfo", headers=self.get_headers())
         if resp.status_code == 200:
             sub = resp.json().get("sub", "")
             urn = f"urn:li:person:{sub}"
             print(f"[Auth] Fetched Person URN (via userinfo): {urn}")
             print(f"[Auth] >>> Add to .env: LINKEDIN_PERSON_URN={urn}")
+            cache_urn(self.access_token, urn)
             return urn
 
         # Try 2: /v2/me — needs r_liteprofile scope
-        resp2 = requests.get(f"{self.BASE_URL}/me", headers=self.get_headers(), timeout=10)
+        resp2 = self.client.get(f"{self.BASE_URL}/me", "me", headers=self.get_headers())
         if resp2.status_code == 200:
             person_id = resp2.json().get("id", "")
             urn = f"urn:li:person:{person_id}"
             print(f"[Auth] Fetched Person URN (via me): {urn}")
             print(f"[Auth] >>> Add to .env: LINKEDIN_PERSON_URN={urn}")
+            cache_urn(self.access_token, urn)
             return urn
 
         raise RuntimeError(
@@ -74,7 +185,7 @@ class LinkedInAuth:
         """Check token validity — tries both userinfo and me endpoints."""
         try:
             # Try openid endpoint first
-            resp = requests.get(f"{self.BASE_URL}/userinfo", headers=self.get_headers(), timeout=10)
+            resp = self.client.get(f"{self.BASE_URL}/userinfo", "userinfo", headers=self.get_headers())
             if resp.status_code == 200:
                 data = resp.json()
                 print(f"[Auth] ✅ Token valid. Logged in as: {data.get('name', 'Unknown')}")
@@ -82,7 +193,7 @@ class LinkedInAuth:
                 return True
 
             # Fallback to /v2/me
-            resp2 = requests.get(f"{self.BASE_URL}/me", headers=self.get_headers(), timeout=10)
+            resp2 = self.client.get(f"{self.BASE_URL}/me", "me", headers=self.get_headers())
             if resp2.status_code == 200:
                 data = resp2.json()
                 name = f"{data.get('localizedFirstName','')} {data.get('localizedLastName','')}".strip()
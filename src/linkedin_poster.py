@@ -3,14 +3,22 @@ LinkedIn UGC Posts API — Supports text, image, and carousel/document posts.
 """
 
 import os
-import json
+import time
+import sqlite3
 import logging
 import mimetypes
 from datetime import date, datetime
 from pathlib import Path
-import requests
+from typing import BinaryIO, Callable
 from dotenv import load_dotenv
+from requests import HTTPError
 from linkedin_auth import LinkedInAuth
+from http_client import API_BASE, LinkedInClient
+import action_log
+from action_index import ActionCountIndex
+from asset_cache import AssetCache, file_digest
+from rate_limiter import RateLimited, retry_after_seconds
+import metrics
 
 load_dotenv()
 
@@ -25,29 +33,35 @@ MAX_POSTS_PER_DAY = int(os.getenv("MAX_POSTS_PER_DAY", "3"))
 VAULT_PATH = Path(os.getenv("VAULT_PATH", "vault"))
 LOGS_DIR = VAULT_PATH / "Logs"
 LOGS_DIR.mkdir(parents=True, exist_ok=True)
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(256 * 1024)))
+ASSET_CACHE_FILE = VAULT_PATH / ".cache" / "assets.json"
 
-UPLOAD_URL = "https://api.linkedin.com/v2/assets?action=registerUpload"
-UGC_URL = "https://api.linkedin.com/v2/ugcPosts"
+UPLOAD_URL = f"{API_BASE}/assets?action=registerUpload"
+UGC_URL = f"{API_BASE}/ugcPosts"
 
 
 # ─────────────────────────────────────────────
 # Helpers
 # ─────────────────────────────────────────────
 
+_count_index = ActionCountIndex(LOGS_DIR)
+_asset_cache = AssetCache(ASSET_CACHE_FILE)
+
+
 def get_todays_post_count() -> int:
-    log_file = LOGS_DIR / f"{date.today().isoformat()}.json"
-    if not log_file.exists():
-        return 0
-    entries = json.loads(log_file.read_text(encoding="utf-8"))
-    return sum(1 for e in entries if e.get("action_type") == "linkedin_post" and e.get("result") == "success")
+    try:
+        return _count_index.count(date.today(), "linkedin_post", "success")
+    except sqlite3.Error as e:
+        logger.warning(f"[Poster] Count index unavailable ({e}), scanning log instead.")
+        return sum(
+            1 for e in action_log.iter_entries(LOGS_DIR, date.today())
+            if e.get("action_type") == "linkedin_post" and e.get("result") == "success"
+        )
 
 
 def log_action(action_type: str, parameters: dict, result: str, post_urn: str = "") -> None:
-    log_file = LOGS_DIR / f"{date.today().isoformat()}.json"
-    entries = []
-    if log_file.exists():
-        entries = json.loads(log_file.read_text(encoding="utf-8"))
-    entries.append({
+    today = date.today()
+    entry = {
         "timestamp": datetime.utcnow().isoformat() + "Z",
         "action_type": action_type,
         "actor": "linkedin_fte",
@@ -55,8 +69,22 @@ def log_action(action_type: str, parameters: dict, result: str, post_urn: str =
         "post_urn": post_urn,
         "dry_run": DRY_RUN,
         "result": result,
-    })
-    log_file.write_text(json.dumps(entries, indent=2, ensure_ascii=False), encoding="utf-8")
+    }
+    if action_type == "linkedin_post":
+        metrics.POSTS.inc(type=parameters.get("type", "text"), result=result.split(":", 1)[0])
+    appended = False
+    try:
+        with _count_index.recording(today, action_type, result):
+            action_log.append_entry(LOGS_DIR, entry, day=today)
+            appended = True
+    except sqlite3.Error as e:
+        logger.warning(f"[Poster] Count index unavailable ({e}), logging without it.")
+        if not appended:
+            action_log.append_entry(LOGS_DIR, entry, day=today)
+        try:
+            _count_index.reseed(today)
+        except sqlite3.Error:
+            pass
 
 
 def build_post_text(content: str, hashtags: list[str]) -> str:
@@ -64,6 +92,7 @@ def build_post_text(content: str, hashtags: list[str]) -> str:
     return f"{content.strip()}\n\n{tags_str}"
 
 
+@metrics.timed("rate_limit_check")
 def _rate_limit_check(params: dict) -> dict | None:
     """Returns error dict if rate limit hit, else None."""
     count = get_todays_post_count()
@@ -75,10 +104,32 @@ def _rate_limit_check(params: dict) -> dict | None:
     return None
 
 
+def _throttled_until(e: Exception) -> float | None:
+    """Epoch seconds after which LinkedIn should accept the post again, if `e` is a throttle."""
+    if isinstance(e, RateLimited):
+        return e.retry_at
+    if isinstance(e, HTTPError) and e.response is not None and e.response.status_code == 429:
+        return time.time() + (retry_after_seconds(e.response.headers) or 60.0)
+    return None
+
+
+def _post_failed(params: dict, e: Exception) -> dict:
+    """Error dict for a post that raised; a throttled one also carries `retry_at` (epoch seconds)."""
+    msg = str(e)
+    if (retry_at := _throttled_until(e)) is not None:
+        logger.warning(f"[Poster] Throttled: {msg}")
+        log_action("linkedin_post", params, f"throttled: {msg}")
+        return {"success": False, "post_urn": "", "message": msg, "retry_at": retry_at}
+    logger.error(f"[Poster] Error: {msg}")
+    log_action("linkedin_post", params, f"error: {msg}")
+    return {"success": False, "post_urn": "", "message": msg}
+
+
 # ─────────────────────────────────────────────
 # Asset Upload (used for both image and document)
 # ─────────────────────────────────────────────
 
+@metrics.timed("register_upload")
 def _register_upload(auth: LinkedInAuth, person_urn: str, recipe: str) -> tuple[str, str]:
     """
     Register an asset upload with LinkedIn.
@@ -95,7 +146,7 @@ def _register_upload(auth: LinkedInAuth, person_urn: str, recipe: str) -> tuple[
             }]
         }
     }
-    resp = requests.post(UPLOAD_URL, headers=auth.get_headers(), json=payload, timeout=15)
+    resp = auth.client.post(UPLOAD_URL, "register_upload", headers=auth.get_headers(), json=payload)
     resp.raise_for_status()
     data = resp.json()
     asset_urn = data["value"]["asset"]
@@ -105,22 +156,69 @@ def _register_upload(auth: LinkedInAuth, person_urn: str, recipe: str) -> tuple[
     return asset_urn, upload_url
 
 
-def _upload_binary(upload_url: str, file_path: Path, content_type: str) -> None:
-    """PUT the binary file to LinkedIn's upload URL."""
+# on_progress(bytes_sent, total_bytes, elapsed_seconds)
+ProgressCallback = Callable[[int, int, float], None]
+
+
+class _UploadStream:
+    """
+    Read-only view of an open file that hands the HTTP layer one fixed-size
+    chunk at a time, so only `chunk_size` bytes are ever held in memory.
+    `__len__` lets requests send a Content-Length instead of chunked encoding.
+    """
+
+    def __init__(self, f: BinaryIO, total: int, chunk_size: int, on_progress: ProgressCallback | None = None):
+        self._f = f
+        self.total = total
+        self.chunk_size = chunk_size
+        self.sent = 0
+        self.started = time.monotonic()
+        self._on_progress = on_progress
+
+    def __len__(self) -> int:
+        return self.total - self.sent
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._f.read(self.chunk_size)
+        self.sent += len(data)
+        if self._on_progress and data:
+            self._on_progress(self.sent, self.total, time.monotonic() - self.started)
+        return data
+
+
+@metrics.timed("upload_binary")
+def _upload_binary(
+    client: LinkedInClient,
+    upload_url: str,
+    file_path: Path,
+    content_type: str,
+    on_progress: ProgressCallback | None = None,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> None:
+    """PUT the binary file to LinkedIn's upload URL, streamed in `chunk_size` pieces."""
+    total = file_path.stat().st_size
     with open(file_path, "rb") as f:
-        data = f.read()
-    resp = requests.put(
-        upload_url,
-        data=data,
-        headers={"Content-Type": content_type},
-        timeout=60,
-    )
+        stream = _UploadStream(f, total, chunk_size, on_progress)
+        resp = client.put(
+            upload_url,
+            "upload",
+            data=stream,
+            headers={"Content-Type": content_type},
+        )
     resp.raise_for_status()
+    elapsed = max(time.monotonic() - stream.started, 1e-6)
+    logger.info(f"[Poster] Sent {total / 1024:.0f} KB in {elapsed:.2f}s ({total / 1024 / 1024 / elapsed:.2f} MB/s)")
 
 
-def upload_media(auth: LinkedInAuth, person_urn: str, file_path: Path) -> str:
+def upload_media(
+    auth: LinkedInAuth,
+    person_urn: str,
+    file_path: Path,
+    on_progress: ProgressCallback | None = None,
+) -> str:
     """
-    Upload an image or PDF to LinkedIn.
+    Upload an image or PDF to LinkedIn, or reuse the asset from an earlier
+    upload of the same bytes (see asset_cache).
     Returns the asset URN to embed in ugcPost.
     """
     suffix = file_path.suffix.lower()
@@ -133,12 +231,18 @@ def upload_media(auth: LinkedInAuth, person_urn: str, file_path: Path) -> str:
     else:
         raise ValueError(f"Unsupported file type: {suffix}. Use .jpg .png .gif or .pdf")
 
+    digest = file_digest(file_path)
+    if asset_urn := _asset_cache.get(digest, recipe, person_urn):
+        logger.info(f"[Poster] Reusing uploaded asset for {file_path.name}: {asset_urn}")
+        return asset_urn
+
     logger.info(f"[Poster] Registering upload: {file_path.name} ({recipe})")
     asset_urn, upload_url = _register_upload(auth, person_urn, recipe)
 
     logger.info(f"[Poster] Uploading binary...")
-    _upload_binary(upload_url, file_path, content_type)
+    _upload_binary(auth.client, upload_url, file_path, content_type, on_progress)
 
+    _asset_cache.put(digest, recipe, person_urn, asset_urn)
     logger.info(f"[Poster] Upload complete. Asset URN: {asset_urn}")
     return asset_urn
 
@@ -223,17 +327,15 @@ def post_to_linkedin(content: str, hashtags: list[str], source_file: str = "") -
         auth = LinkedInAuth()
         person_urn = auth.get_profile_urn()
         payload = _build_text_payload(person_urn, post_text)
-        resp = requests.post(UGC_URL, headers=auth.get_headers(), json=payload, timeout=15)
+        with metrics.timed("ugc_post"):
+            resp = auth.client.post(UGC_URL, "ugc_posts", headers=auth.get_headers(), json=payload)
         resp.raise_for_status()
         post_urn = resp.headers.get("x-restli-id", "")
         logger.info(f"[Poster] Text post published! URN: {post_urn}")
         log_action("linkedin_post", params, "success", post_urn)
         return {"success": True, "post_urn": post_urn, "message": "Text post published!"}
     except Exception as e:
-        msg = str(e)
-        logger.error(f"[Poster] Error: {msg}")
-        log_action("linkedin_post", params, f"error: {msg}")
-        return {"success": False, "post_urn": "", "message": msg}
+        return _post_failed(params, e)
 
 
 def post_image_to_linkedin(
@@ -264,17 +366,17 @@ def post_image_to_linkedin(
         person_urn = auth.get_profile_urn()
         asset_urn = upload_media(auth, person_urn, Path(image_path))
         payload = _build_image_payload(person_urn, post_text, asset_urn, image_title)
-        resp = requests.post(UGC_URL, headers=auth.get_headers(), json=payload, timeout=15)
+        with metrics.timed("ugc_post"):
+            resp = auth.client.post(UGC_URL, "ugc_posts", headers=auth.get_headers(), json=payload)
+        if resp.status_code in (400, 404, 422):
+            _asset_cache.evict_asset(asset_urn)  # cached asset may have expired on LinkedIn's side
         resp.raise_for_status()
         post_urn = resp.headers.get("x-restli-id", "")
         logger.info(f"[Poster] Image post published! URN: {post_urn}")
         log_action("linkedin_post", params, "success", post_urn)
         return {"success": True, "post_urn": post_urn, "message": "Image post published!"}
     except Exception as e:
-        msg = str(e)
-        logger.error(f"[Poster] Error: {msg}")
-        log_action("linkedin_post", params, f"error: {msg}")
-        return {"success": False, "post_urn": "", "message": msg}
+        return _post_failed(params, e)
 
 
 def post_carousel_to_linkedin(
@@ -305,14 +407,14 @@ def post_carousel_to_linkedin(
         person_urn = auth.get_profile_urn()
         asset_urn = upload_media(auth, person_urn, Path(pdf_path))
         payload = _build_carousel_payload(person_urn, post_text, asset_urn, carousel_title)
-        resp = requests.post(UGC_URL, headers=auth.get_headers(), json=payload, timeout=15)
+        with metrics.timed("ugc_post"):
+            resp = auth.client.post(UGC_URL, "ugc_posts", headers=auth.get_headers(), json=payload)
+        if resp.status_code in (400, 404, 422):
+            _asset_cache.evict_asset(asset_urn)  # cached asset may have expired on LinkedIn's side
         resp.raise_for_status()
         post_urn = resp.headers.get("x-restli-id", "")
         logger.info(f"[Poster] Carousel post published! URN: {post_urn}")
         log_action("linkedin_post", params, "success", post_urn)
         return {"success": True, "post_urn": post_urn, "message": "Carousel post published!"}
     except Exception as e:
-        msg = str(e)
-        logger.error(f"[Poster] Error: {msg}")
-        log_action("linkedin_post", params, f"error: {msg}")
-        return {"success": False, "post_urn": "", "message": msg}
+        return _post_failed(params, e)
@@ -0,0 +1,569 @@
+"""
+LinkedIn Stub — a local stand-in for the parts of the LinkedIn API this project
+calls, so posting, uploads and analytics can run (and be load-tested) offline.
+
+Endpoints (under any prefix, e.g. /v2):
+    GET  /userinfo, /me                       identity
+    POST /assets?action=registerUpload        → asset URN + upload URL on this server
+    PUT  /upload/<id>                         binary upload (body is counted, not kept)
+    POST /ugcPosts                            → 201 + x-restli-id share URN
+    GET  /socialMetadata/<urn>                per-post metrics (deterministic per URN)
+    GET  /socialMetadata?ids=List(...)        Rest.li batch form
+    GET  /networkSizes/<urn>                  follower count
+    GET  /__stub/stats, /__stub/posts         counters and created posts (JSON)
+    POST /__stub/reset                        zero the counters
+
+Behaviour is configured per endpoint name — the same names http_client uses
+for timeouts (userinfo, me, register_upload, upload, ugc_posts,
+social_metadata, network_sizes) plus `default`, which applies to the rest.
+Entries are separated by `;`:
+
+    latency   "default=fixed:5;upload=uniform:50,400;ugc_posts=lognormal:150,0.5"
+              fixed:MS  uniform:LO,HI  normal:MEAN,SD  lognormal:MEDIAN,SIGMA  exp:MEAN
+    faults    "ugc_posts=429:0.05,503:0.02;default=500:0.01"  (status:probability)
+    quota     "ugc_posts=100/86400;register_upload=20/60"     (requests/window seconds)
+
+Injected 429s and quota overruns carry a Retry-After header, and every answer
+from an endpoint with a quota reports X-RateLimit-Limit / -Remaining / -Reset
+(seconds until a call is freed up). Both transports
+share the same routing: `StubServer` (a threaded HTTP server, point
+LINKEDIN_API_BASE at `server.base_url`) and `StubTransport` (mounted straight
+on a LinkedInClient, no sockets at all).
+
+Run standalone:
+    python src/linkedin_stub.py --port 8765 --latency "default=lognormal:80,0.4" --faults "ugc_posts=429:0.05"
+    LINKEDIN_API_BASE=http://127.0.0.1:8765/v2 DRY_RUN=false python src/orchestrator.py
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import zlib
+import random
+import logging
+import argparse
+import threading
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+STUB_FOLLOWERS = 1234
+
+
+# ─────────────────────────────────────────────
+# Configuration
+# ─────────────────────────────────────────────
+
+class Latency:
+    """A delay distribution in milliseconds, parsed from e.g. "uniform:50,400"."""
+
+    KINDS = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exp": 1}
+
+    def __init__(self, spec: str):
+        kind, _, args = spec.strip().partition(":")
+        params = [float(a) for a in args.split(",") if a.strip()]
+        if kind not in self.KINDS or len(params) != self.KINDS[kind]:
+            raise ValueError(f"Bad latency spec {spec!r} (expected one of {', '.join(self.KINDS)} with its parameters)")
+        self.kind, self.params = kind, params
+
+    def sample(self, rng: random.Random) -> float:
+        """Seconds to wait."""
+        p = self.params
+        if self.kind == "fixed":
+            ms = p[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(p[0], p[1])
+        elif self.kind == "normal":
+            ms = rng.gauss(p[0], p[1])
+        elif self.kind == "lognormal":
+            ms = rng.lognormvariate(math.log(max(p[0], 1e-3)), p[1])
+        else:
+            ms = rng.expovariate(1 / p[0]) if p[0] > 0 else 0.0
+        return max(ms, 0.0) / 1000
+
+    def __repr__(self) -> str:
+        return f"{self.kind}:{','.join(f'{v:g}' for v in self.params)}"
+
+
+def _entries(spec: str) -> dict[str, str]:
+    """ "a=x;b=y" → {"a": "x", "b": "y"}"""
+    out = {}
+    for part in (spec or "").split(";"):
+        if part.strip():
+            name, sep, value = part.partition("=")
+            if not sep:
+                raise ValueError(f"Bad entry {part!r} (expected name=value)")
+            out[name.strip()] = value.strip()
+    return out
+
+
+def parse_latency(spec: str) -> dict[str, Latency]:
+    return {name: Latency(value) for name, value in _entries(spec).items()}
+
+
+def parse_faults(spec: str) -> dict[str, list[tuple[int, float]]]:
+    faults = {}
+    for name, value in _entries(spec).items():
+        rules = []
+        for item in value.split(","):
+            status, _, prob = item.partition(":")
+            rules.append((int(status), float(prob)))
+        faults[name] = rules
+    return faults
+
+
+def parse_quota(spec: str) -> dict[str, tuple[int, float]]:
+    quota = {}
+    for name, value in _entries(spec).items():
+        limit, _, window = value.partition("/")
+        quota[name] = (int(limit), float(window or 60))
+    return quota
+
+
+# ─────────────────────────────────────────────
+# Shared routing and state
+# ─────────────────────────────────────────────
+
+def _metrics(urn: str) -> dict:
+    n = zlib.crc32(urn.encode())
+    return {
+        "likesSummary": {"totalLikes": n % 200},
+        "commentsSummary": {"totalFirstLevelComments": n % 40},
+        "sharesSummary": {"totalShares": n % 15},
+    }
+
+
+def _json(status: int, body, headers: dict | None = None) -> tuple[int, dict, bytes]:
+    return status, dict({"Content-Type": "application/json"}, **(headers or {})), json.dumps(body).encode()
+
+
+def _error(status: int, message: str, headers: dict | None = None) -> tuple[int, dict, bytes]:
+    return _json(status, {"status": status, "message": message}, headers)
+
+
+class _EndpointStats:
+    __slots__ = ("requests", "statuses", "bytes_in", "bytes_out", "delay")
+
+    def __init__(self):
+        self.requests = 0
+        self.statuses: Counter = Counter()
+        self.bytes_in = self.bytes_out = 0
+        self.delay = 0.0
+
+
+class LinkedInStub:
+    """Endpoint logic, fault/latency injection and counters; no I/O of its own."""
+
+    def __init__(
+        self,
+        latency: dict[str, Latency] | None = None,
+        faults: dict[str, list[tuple[int, float]]] | None = None,
+        quota: dict[str, tuple[int, float]] | None = None,
+        retry_after: float = 1.0,
+        token: str = "",
+        seed: int | None = None,
+    ):
+        self.latency = latency or {}
+        self.faults = faults or {}
+        self.quota = quota or {}
+        self.retry_after = retry_after
+        self.token = token
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset()
+
+    @classmethod
+    def from_env(cls) -> "LinkedInStub":
+        """Configured from LINKEDIN_STUB_LATENCY / _FAULTS / _QUOTA / _RETRY_AFTER / _TOKEN / _SEED."""
+        seed = os.getenv("LINKEDIN_STUB_SEED")
+        return cls(
+            latency=parse_latency(os.getenv("LINKEDIN_STUB_LATENCY", "")),
+            faults=parse_faults(os.getenv("LINKEDIN_STUB_FAULTS", "")),
+            quota=parse_quota(os.getenv("LINKEDIN_STUB_QUOTA", "")),
+            retry_after=float(os.getenv("LINKEDIN_STUB_RETRY_AFTER", "1")),
+            token=os.getenv("LINKEDIN_STUB_TOKEN", ""),
+            seed=int(seed) if seed else None,
+        )
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started = time.monotonic()
+            self._stats: dict[str, _EndpointStats] = {}
+            self._windows: dict[str, deque] = {}
+            self._assets: dict[str, bool] = {}  # asset id → uploaded
+            self.posts: list[dict] = []
+
+    # ── routing ──────────────────────────────
+
+    @staticmethod
+    def endpoint_for(method: str, path: str, query: str) -> str:
+        """The http_client endpoint name for a request (or "unknown")."""
+        segments = [s for s in path.split("/") if s]
+        last = segments[-1] if segments else ""
+        parent = segments[-2] if len(segments) > 1 else ""
+        if method == "GET" and last == "userinfo":
+            return "userinfo"
+        if method == "GET" and last == "me":
+            return "me"
+        if method == "POST" and last == "assets" and "action=registerUpload" in query:
+            return "register_upload"
+        if method == "PUT" and parent == "upload":
+            return "upload"
+        if method == "POST" and last == "ugcPosts":
+            return "ugc_posts"
+        if method == "GET" and "socialMetadata" in (last, parent):
+            return "social_metadata"
+        if method == "GET" and parent == "networkSizes":
+            return "network_sizes"
+        if parent == "__stub":
+            return "admin"
+        return "unknown"
+
+    def handle(self, method: str, url: str, headers: dict, body: bytes) -> tuple[int, dict, bytes]:
+        """Answer one request: (status, headers, body). Sleeps for any injected latency."""
+        parts = urlsplit(url)
+        endpoint = self.endpoint_for(method, parts.path, parts.query)
+        if endpoint == "admin":
+            return self._admin(method, parts.path.rstrip("/").rsplit("/", 1)[-1])
+
+        config_key = lambda table: endpoint if endpoint in table else "default"  # noqa: E731
+        delay = 0.0
+        with self._lock:
+            stats = self._stats.setdefault(endpoint, _EndpointStats())
+            latency = self.latency.get(config_key(self.latency))
+            if latency:
+                delay = latency.sample(self._rng)
+            injected, limit_headers = self._take_quota(endpoint)
+            if injected is None:
+                injected = self._injected_fault(self.faults.get(config_key(self.faults), []))
+        if delay:
+            time.sleep(delay)
+
+        if injected:
+            status, resp_headers, resp_body = injected
+        else:
+            status, resp_headers, resp_body = self._route(endpoint, method, parts, headers, body)
+        resp_headers = dict(resp_headers, **limit_headers)
+
+        with self._lock:
+            stats.requests += 1
+            stats.statuses[status] += 1
+            stats.bytes_in += len(body)
+            stats.bytes_out += len(resp_body)
+            stats.delay += delay
+        return status, resp_headers, resp_body
+
+    def _take_quota(self, endpoint: str) -> tuple[tuple | None, dict]:
+        """Count this request against the endpoint's quota: (429 if over it, rate-limit headers)."""
+        if endpoint not in self.quota:
+            return None, {}
+        limit, window = self.quota[endpoint]
+        now = time.monotonic()
+        hits = self._windows.setdefault(endpoint, deque())
+        while hits and hits[0] <= now - window:
+            hits.popleft()
+        over = len(hits) >= limit
+        if not over:
+            hits.append(now)
+        reset = max(math.ceil(hits[0] + window - now), 1)
+        headers = {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(limit - len(hits)),
+            "X-RateLimit-Reset": str(reset),
+        }
+        if over:
+            return _error(429, "Resource level throttle limit reached", dict(headers, **{"Retry-After": str(reset)})), {}
+        return None, headers
+
+    def _injected_fault(self, rules: list[tuple[int, float]]) -> tuple | None:
+        """Random fault for this request (caller holds the lock)."""
+        roll = self._rng.random()
+        for status, probability in rules:
+            if roll < probability:
+                if status == 429:
+                    return _error(429, "Too many requests", {"Retry-After": f"{self.retry_after:g}"})
+                return _error(status, "Injected failure")
+            roll -= probability
+        return None
+
+    def _route(self, endpoint: str, method: str, parts, headers: dict, body: bytes) -> tuple[int, dict, bytes]:
+        if endpoint == "unknown":
+            return _error(404, f"No stub for {method} {parts.path}")
+
+        # Uploads go to a pre-signed URL and carry no bearer token
+        if endpoint != "upload":
+            auth = next((v for k, v in headers.items() if k.lower() == "authorization"), "")
+            token = auth[len("Bearer "):] if auth.startswith("Bearer ") else ""
+            if not token or (self.token and token != self.token):
+                return _error(401, "Invalid access token")
+
+        path = parts.path.rstrip("/")
+        if endpoint == "userinfo":
+            return _json(200, {"sub": "stub-member", "name": "Stub Member"})
+        if endpoint == "me":
+            return _json(200, {"id": "stub-member"})
+        if endpoint == "network_sizes":
+            return _json(200, {"firstDegreeSize": STUB_FOLLOWERS})
+        if endpoint == "social_metadata":
+            if parts.query.startswith("ids=List("):
+                ids = parts.query[len("ids=List("):].rstrip(")").split(",")
+                return _json(200, {"results": {i: _metrics(unquote(i)) for i in ids}, "errors": {}})
+            return _json(200, _metrics(unquote(path.rsplit("/", 1)[1])))
+        if endpoint == "register_upload":
+            return self._register_upload(parts, body)
+        if endpoint == "upload":
+            return self._upload(path.rsplit("/", 1)[1], body)
+        return self._ugc_post(body)
+
+    def _register_upload(self, parts, body: bytes) -> tuple[int, dict, bytes]:
+        try:
+            request = json.loads(body)["registerUploadRequest"]
+            recipe = request["recipes"][0]
+            owner = request["owner"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            return _error(422, "registerUploadRequest with recipes and owner is required")
+        with self._lock:
+            asset_id = f"C5{len(self._assets) + 1:014d}"
+            self._assets[asset_id] = False
+        # Served from the first path segment on, like LinkedIn's own upload host
+        upload_url = f"{parts.scheme}://{parts.netloc}/upload/{asset_id}"
+        return _json(200, {"value": {
+            "asset": f"urn:li:digitalmediaAsset:{asset_id}",
+            "mediaArtifact": f"urn:li:digitalmediaMediaArtifact:(urn:li:digitalmediaAsset:{asset_id},{recipe})",
+            "owner": owner,
+            "uploadMechanism": {
+                "com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest": {
+                    "uploadUrl": upload_url,
+                    "headers": {},
+                },
+            },
+        }})
+
+    def _upload(self, asset_id: str, body: bytes) -> tuple[int, dict, bytes]:
+        with self._lock:
+            if asset_id not in self._assets:
+                return _error(404, f"Unknown upload {asset_id}")
+            if not body:
+                return _error(400, "Empty upload")
+            self._assets[asset_id] = True
+        return 201, {}, b""
+
+    def _ugc_post(self, body: bytes) -> tuple[int, dict, bytes]:
+        try:
+            payload = json.loads(body)
+            author = payload["author"]
+            share = payload["specificContent"]["com.linkedin.ugc.ShareContent"]
+            text = share["shareCommentary"]["text"]
+        except (ValueError, KeyError, TypeError):
+            return _error(422, "author and specificContent.com.linkedin.ugc.ShareContent are required")
+
+        assets = [m.get("media", "") for m in share.get("media", [])]
+        with self._lock:
+            # Assets registered here must have been uploaded before they are shared
+            pending = [a for a in assets if self._assets.get(a.rsplit(":", 1)[-1]) is False]
+            if pending:
+                return _error(400, f"Asset not uploaded: {pending[0]}")
+            urn = f"urn:li:share:7{len(self.posts) + 1:018d}"
+            self.posts.append({
+                "urn": urn,
+                "author": author,
+                "category": share.get("shareMediaCategory", "NONE"),
+                "assets": assets,
+                "chars": len(text),
+                "created": time.time(),
+            })
+        return _json(201, {"id": urn}, {"x-restli-id": urn})
+
+    # ── counters ─────────────────────────────
+
+    def stats(self) -> dict:
+        """Requests, statuses, bytes, injected delay and throughput per endpoint."""
+        with self._lock:
+            uptime = max(time.monotonic() - self.started, 1e-9)
+            endpoints = {
+                name: {
+                    "requests": s.requests,
+                    "per_second": round(s.requests / uptime, 3),
+                    "statuses": {str(k): v for k, v in sorted(s.statuses.items())},
+                    "bytes_in": s.bytes_in,
+                    "bytes_out": s.bytes_out,
+                    "mean_injected_ms": round(s.delay / s.requests * 1000, 3) if s.requests else 0.0,
+                }
+                for name, s in sorted(self._stats.items())
+            }
+            total = sum(s.requests for s in self._stats.values())
+            errors = sum(n for s in self._stats.values() for code, n in s.statuses.items() if code >= 400)
+            return {
+                "uptime_s": round(uptime, 3),
+                "requests": total,
+                "errors": errors,
+                "per_second": round(total / uptime, 3),
+                "posts": len(self.posts),
+                "assets": len(self._assets),
+                "uploads": sum(self._assets.values()),
+                "endpoints": endpoints,
+            }
+
+    def _admin(self, method: str, action: str) -> tuple[int, dict, bytes]:
+        if method == "GET" and action == "stats":
+            return _json(200, self.stats())
+        if method == "GET" and action == "posts":
+            with self._lock:
+                return _json(200, list(self.posts))
+        if method == "POST" and action == "reset":
+            self.reset()
+            return _json(200, {"reset": True})
+        return _error(404, f"No stub admin action {method} {action}")
+
+
+# ─────────────────────────────────────────────
+# Transports
+# ─────────────────────────────────────────────
+
+class StubTransport(BaseAdapter):
+    """requests adapter answering from a LinkedInStub: LinkedInClient(transport=StubTransport())."""
+
+    def __init__(self, stub: LinkedInStub | None = None):
+        super().__init__()
+        self.stub = stub or LinkedInStub()
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        body = request.body or b""
+        if hasattr(body, "read"):
+            body = b"".join(iter(lambda: body.read(1 << 16), b""))
+        elif isinstance(body, str):
+            body = body.encode("utf-8")
+        elif not isinstance(body, bytes):
+            body = b"".join(body)
+
+        status, headers, content = self.stub.handle(request.method, request.url, dict(request.headers), body)
+        resp = Response()
+        resp.status_code = status
+        resp.headers = CaseInsensitiveDict(headers)
+        resp._content = content
+        resp.url = request.url
+        resp.request = request
+        resp.encoding = "utf-8"
+        return resp
+
+    def close(self) -> None:
+        pass
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    server: "StubServer"
+
+    def _serve(self) -> None:
+        body = self._read_body()
+        host = self.headers.get("Host") or "%s:%s" % self.server.server_address[:2]
+        status, headers, content = self.server.stub.handle(
+            self.command, f"http://{host}{self.path}", dict(self.headers), body
+        )
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return b"".join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    do_GET = do_POST = do_PUT = do_DELETE = _serve
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(f"[Stub] {self.address_string()} {format % args}")
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded local HTTP server for a LinkedInStub. Port 0 picks a free port."""
+
+    daemon_threads = True
+
+    def __init__(self, stub: LinkedInStub | None = None, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.stub = stub or LinkedInStub()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        """Value for LINKEDIN_API_BASE."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v2"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="linkedin-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Local LinkedIn API stand-in with latency and fault injection.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default=os.getenv("LINKEDIN_STUB_LATENCY", ""), help='e.g. "default=fixed:5;upload=uniform:50,400"')
+    parser.add_argument("--faults", default=os.getenv("LINKEDIN_STUB_FAULTS", ""), help='e.g. "ugc_posts=429:0.05,503:0.02"')
+    parser.add_argument("--quota", default=os.getenv("LINKEDIN_STUB_QUOTA", ""), help='e.g. "ugc_posts=100/86400"')
+    parser.add_argument("--retry-after", type=float, default=float(os.getenv("LINKEDIN_STUB_RETRY_AFTER", "1")))
+    parser.add_argument("--token", default=os.getenv("LINKEDIN_STUB_TOKEN", ""), help="only accept this bearer token")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    try:
+        stub = LinkedInStub(
+            latency=parse_latency(args.latency),
+            faults=parse_faults(args.faults),
+            quota=parse_quota(args.quota),
+            retry_after=args.retry_after,
+            token=args.token,
+            seed=args.seed,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    server = StubServer(stub, args.host, args.port)
+    print(f"[Stub] LinkedIn stub listening — set LINKEDIN_API_BASE={server.base_url}")
+    print(f"[Stub] Counters: {server.base_url.rsplit('/', 1)[0]}/__stub/stats")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(stub.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+    main()
@@ -0,0 +1,269 @@
+"""
+Metrics — in-process latency histograms and counters, served in Prometheus
+text format.
+
+Each stage of the posting pipeline is timed with `timed(stage)`, as a context
+manager or a decorator:
+
+    with metrics.timed("parse"):
+        parsed = parse_post_file(path)
+
+    @metrics.timed("register_upload")
+    def _register_upload(...): ...
+
+Stages: parse, rate_limit_check, register_upload, upload_binary, ugc_post,
+file_move, index_update, process_post (the whole watcher job), dashboard_write,
+analytics_fetch, weekly_report. A stage that raises is also counted in
+fte_stage_errors_total. LinkedInClient records every API call per endpoint and
+status, and the work queue records how long files waited for a worker.
+
+`start_server()` (called by orchestrator.main) serves GET /metrics on
+METRICS_HOST:METRICS_PORT; METRICS_PORT=0 turns it off. No dependency on
+prometheus_client: the text format is simple enough to write directly.
+"""
+
+import os
+import time
+import logging
+import functools
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...], extra: tuple[tuple[str, str], ...] = ()) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in pairs) + "}"
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines += self._samples()
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{self._labels(k)} {_format(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """A value that is set, or read from `fn()` at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn: Callable[[], float] | None = None):
+        super().__init__(name, help)
+        self.fn = fn
+        self._value = 0.0
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+    def _samples(self) -> list[str]:
+        if self.fn is None:
+            value = self._value
+        else:
+            try:
+                value = self.fn()
+            except Exception as e:
+                logger.debug(f"[Metrics] {self.name} unavailable: {e}")
+                return []
+        return [f"{self.name} {_format(value)}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: dict[tuple, list] = {}  # key → [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def summary(self) -> dict[str, dict]:
+        """{"label,values": {"count", "sum"}} for every series observed so far."""
+        with self._lock:
+            return {",".join(k): {"count": v[-1], "sum": v[-2]} for k, v in sorted(self._series.items())}
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, series):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{self._labels(key, (('le', _format(bound)),))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format(series[-2])}")
+            lines.append(f"{self.name}_count{self._labels(key)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add `metric`; registering a name again returns the existing one."""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "fte_stage_seconds", "Time spent in each stage of the posting and analytics pipeline.", ("stage",)))
+STAGE_ERRORS = REGISTRY.register(Counter(
+    "fte_stage_errors_total", "Stages that ended with an exception.", ("stage",)))
+POSTS = REGISTRY.register(Counter(
+    "fte_posts_total", "Post attempts by type and result (success, dry_run, rate_limited, error).", ("type", "result")))
+HTTP_SECONDS = REGISTRY.register(Histogram(
+    "fte_http_request_seconds", "LinkedIn API call latency by endpoint.", ("endpoint",)))
+HTTP_RESPONSES = REGISTRY.register(Counter(
+    "fte_http_responses_total", "LinkedIn API responses by endpoint and status (\"error\" if no response).", ("endpoint", "status")))
+QUEUE_WAIT = REGISTRY.register(Histogram(
+    "fte_queue_wait_seconds", "Time a job waited in a work queue before a worker picked it up.", ("queue",)))
+
+
+def gauge(name: str, help: str, fn: Callable[[], float]) -> Gauge:
+    """Register a gauge read from `fn()` on every scrape."""
+    return REGISTRY.register(Gauge(name, help, fn))
+
+
+class timed:
+    """Observe the wall time of a block (or of every call to a function) in STAGE_SECONDS."""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._started = 0.0
+
+    def __enter__(self) -> "timed":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        STAGE_SECONDS.observe(time.perf_counter() - self._started, stage=self.stage)
+        if exc_type is not None:
+            STAGE_ERRORS.inc(stage=self.stage)
+
+    def __call__(self, fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(self.stage):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+def render() -> str:
+    """Every registered metric in Prometheus text exposition format."""
+    return REGISTRY.render()
+
+
+# ─────────────────────────────────────────────
+# HTTP endpoint
+# ─────────────────────────────────────────────
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(f"[Metrics] {self.address_string()} {format % args}")
+
+
+def start_server(port: int = METRICS_PORT, host: str = METRICS_HOST) -> ThreadingHTTPServer | None:
+    """Serve /metrics on a daemon thread. Returns None if disabled or the port is taken."""
+    if port <= 0:
+        return None
+    try:
+        server = ThreadingHTTPServer((host, port), _Handler)
+    except OSError as e:
+        logger.warning(f"[Metrics] Could not listen on {host}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="MetricsServer").start()
+    logger.info(f"[Metrics] Serving http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -2,17 +2,28 @@
 Orchestrator — Master process for LinkedIn FTE.
 Starts the approval watcher and schedules weekly analytics.
 Run this to start your AI Employee.
+
+The main loop sleeps until the next scheduled job is due, or until it is woken
+by the watcher thread exiting or a shutdown request (Ctrl+C / SIGTERM).
+Scheduled jobs run on their own threads so a long analytics run never delays
+noticing a dead watcher. On shutdown, posts already being published get
+SHUTDOWN_DEADLINE_SECONDS to finish; a second Ctrl+C stops immediately.
 """
 
 import os
 import sys
+import signal
+import sqlite3
 import logging
+import functools
 import threading
 from pathlib import Path
-from datetime import datetime
 import schedule
 import time
 from dotenv import load_dotenv
+import dashboard
+import vault_index
+import metrics
 
 load_dotenv()
 
@@ -24,6 +35,14 @@ logger = logging.getLogger(__name__)
 
 VAULT_PATH = Path(os.getenv("VAULT_PATH", "vault"))
 DRY_RUN = os.getenv("DRY_RUN", "true").lower() == "true"
+SHUTDOWN_DEADLINE_SECONDS = float(os.getenv("SHUTDOWN_DEADLINE_SECONDS", "30"))
+WATCHER_RESTART_MAX_BACKOFF = 60.0
+
+# A blocking wait can't be interrupted by Ctrl+C on Windows, so wake up regularly there.
+_MAX_WAIT = 1.0 if sys.platform == "win32" else None
+
+_stop = threading.Event()
+_wake = threading.Event()
 
 
 def print_banner():
@@ -39,14 +58,65 @@ def print_banner():
 
 
 def start_approval_watcher():
-    """Run approval watcher in a background thread."""
+    """Run approval watcher in a background thread that wakes the main loop when it exits."""
     from approval_watcher import run as run_watcher
-    thread = threading.Thread(target=run_watcher, daemon=True, name="ApprovalWatcher")
+
+    def watch():
+        try:
+            run_watcher(stop_event=_stop, drain_timeout=SHUTDOWN_DEADLINE_SECONDS)
+        except Exception as e:
+            logger.error(f"[Orchestrator] Approval watcher crashed: {e}")
+        finally:
+            _wake.set()
+
+    thread = threading.Thread(target=watch, daemon=True, name="ApprovalWatcher")
     thread.start()
     logger.info("[Orchestrator] Approval watcher started.")
     return thread
 
 
+def request_shutdown(signum=None, frame=None):
+    """Signal handler: first call starts a graceful shutdown, a second one forces it."""
+    if _stop.is_set():
+        raise KeyboardInterrupt
+    logger.info("[Orchestrator] Shutdown requested; finishing in-flight posts (Ctrl+C again to force).")
+    _stop.set()
+    _wake.set()
+
+
+def in_background(job):
+    """Scheduled-job wrapper: run `job` on its own thread, skipping a run if the last one is still going."""
+    busy = threading.Lock()
+
+    def run():
+        try:
+            job()
+        finally:
+            busy.release()
+
+    @functools.wraps(job)
+    def launch():
+        if not busy.acquire(blocking=False):
+            logger.warning(f"[Orchestrator] {job.__name__} is still running; skipping this run.")
+            return
+        threading.Thread(target=run, daemon=True, name=job.__name__).start()
+
+    return launch
+
+
+def _next_wait(restart_at: float | None) -> float | None:
+    """Seconds until something is due: the next scheduled job or a pending watcher restart."""
+    waits = []
+    idle = schedule.idle_seconds()
+    if idle is not None:
+        waits.append(max(idle, 0.0))
+    if restart_at is not None:
+        waits.append(max(restart_at - time.monotonic(), 0.0))
+    if _MAX_WAIT is not None:
+        waits.append(_MAX_WAIT)
+    return min(waits) if waits else None
+
+
 def run_weekly_analytics():
     """Triggered every Sunday at 20:00."""
     logger.info("[Orchestrator] Running weekly analytics report...")
@@ -60,15 +130,30 @@ def run_weekly_analytics():
 
 def update_dashboard_status(status: str):
     """Update system status in Dashboard.md."""
-    import re
-    dashboard = VAULT_PATH / "Dashboard.md"
-    if not dashboard.exists():
-        return
-    text = dashboard.read_text(encoding="utf-8")
-    now = datetime.now().strftime("%Y-%m-%d %H:%M")
-    text = re.sub(r"- \*\*System:\*\* .*", f"- **System:** {status}", text)
-    text = re.sub(r"- \*\*Last Updated:\*\* .*", f"- **Last Updated:** {now}", text)
-    dashboard.write_text(text, encoding="utf-8")
+    dashboard.set_status("System", status)
+
+
+def refresh_vault_index():
+    """Re-stat the workflow folders, re-index changed files, refresh Dashboard queue counts."""
+    try:
+        index = vault_index.get_index()
+        changes = index.scan()
+        for key, value in index.queue_summary().items():
+            dashboard.set_status(key, value)
+        if changes["added"] or changes["updated"] or changes["removed"]:
+            logger.info(f"[Orchestrator] Vault index refreshed: {changes}")
+    except sqlite3.Error as e:
+        logger.error(f"[Orchestrator] Vault index refresh failed: {e}")
+
+
+def start_metrics_endpoint():
+    """Serve /metrics (Prometheus text format), including the watcher's live queue depth."""
+    from approval_watcher import get_queue_metrics
+    metrics.gauge("fte_watcher_queue_depth", "Approved files waiting for a post worker.",
+                  lambda: get_queue_metrics().get("depth", 0))
+    metrics.gauge("fte_watcher_in_flight", "Approved files being posted right now.",
+                  lambda: get_queue_metrics().get("in_flight", 0))
+    return metrics.start_server()
 
 
 def main():
@@ -80,14 +165,22 @@ def main():
         logger.error("Make sure VAULT_PATH in .env points to the correct location.")
         sys.exit(1)
 
+    metrics_server = start_metrics_endpoint()
     update_dashboard_status("🟢 Running" + (" (Dry Run)" if DRY_RUN else " (Live)"))
+    refresh_vault_index()
+
+    signal.signal(signal.SIGINT, request_shutdown)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, request_shutdown)
 
     # Start approval watcher in background
     watcher_thread = start_approval_watcher()
+    watcher_started = time.monotonic()
 
     # Schedule weekly analytics every Sunday at 20:00
-    schedule.every().sunday.at("20:00").do(run_weekly_analytics)
+    schedule.every().sunday.at("20:00").do(in_background(run_weekly_analytics))
     logger.info("[Orchestrator] Weekly analytics scheduled: every Sunday at 20:00")
+    schedule.every(5).minutes.do(in_background(refresh_vault_index))
 
     logger.info("[Orchestrator] All systems running. Press Ctrl+C to stop.\n")
     logger.info("NEXT STEPS:")
@@ -96,16 +189,39 @@ def main():
     logger.info(f"  3. Move the file to vault/Approved/ to {'simulate' if DRY_RUN else 'trigger'} posting")
     logger.info("  4. Check vault/Dashboard.md for status updates\n")
 
+    restart_at, backoff = None, 0.0
     try:
-        while True:
+        while not _stop.is_set():
+            # Clear before checking, so a wakeup that lands after the checks ends the next wait at once
+            _wake.clear()
             schedule.run_pending()
-            # Check watcher thread health
-            if not watcher_thread.is_alive():
-                logger.warning("[Orchestrator] Approval watcher died. Restarting...")
+
+            if restart_at is None and not watcher_thread.is_alive():
+                # Restart at once, unless it keeps dying right after starting
+                lived = time.monotonic() - watcher_started
+                backoff = 0.0 if lived >= WATCHER_RESTART_MAX_BACKOFF else min(max(backoff * 2, 1.0), WATCHER_RESTART_MAX_BACKOFF)
+                logger.warning(f"[Orchestrator] Approval watcher died. Restarting{f' in {backoff:.0f}s' if backoff else ''}...")
+                restart_at = time.monotonic() + backoff
+            if restart_at is not None and time.monotonic() >= restart_at:
                 watcher_thread = start_approval_watcher()
-            time.sleep(30)
+                watcher_started, restart_at = time.monotonic(), None
+
+            _wake.wait(_next_wait(restart_at))
+
+        # Graceful shutdown: the watcher drains its in-flight posts, then exits
+        deadline = time.monotonic() + SHUTDOWN_DEADLINE_SECONDS + 5
+        while watcher_thread.is_alive() and time.monotonic() < deadline:
+            watcher_thread.join(min(deadline - time.monotonic(), 1.0))
+        if watcher_thread.is_alive():
+            logger.warning("[Orchestrator] Watcher did not stop in time; exiting anyway.")
     except KeyboardInterrupt:
+        _stop.set()
+        logger.warning("[Orchestrator] Forced shutdown; posts in flight may be retried on the next start.")
+    finally:
         update_dashboard_status("🔴 Stopped")
+        dashboard.flush()
+        if metrics_server is not None:
+            metrics_server.shutdown()
         logger.info("[Orchestrator] Shutting down. Goodbye!")
 
 
@@ -0,0 +1,296 @@
+"""
+Post Parser — reads vault post files (markdown with YAML-style frontmatter).
+
+- Patterns are compiled once at import.
+- Parsed files are cached by (path, mtime, size), so re-reading an unchanged
+  file costs one stat().
+- Frontmatter supports what post files actually use: `key: value`, quoted
+  strings, inline lists `[a, b]`, block lists (`- item` lines), block scalars
+  (`|` / `>`) and plain values continued on indented lines. Values are strings
+  (or lists of strings) and are kept verbatim (no `#` comment stripping, so `hashtags: #AI, #Tech`
+  still works).
+- `parse_many()` parses a whole folder, fanning cache misses out to a process
+  pool when there are enough of them to be worth it.
+
+A "document" is a dict: {path, mtime_ns, size, content_hash, frontmatter, post},
+where `post` is what `parse_post_file()` returns.
+"""
+
+import os
+import re
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+POST_PARSER_CACHE_SIZE = int(os.getenv("POST_PARSER_CACHE_SIZE", "4096"))
+PARSE_MANY_MIN_PARALLEL = int(os.getenv("PARSE_MANY_MIN_PARALLEL", "256"))
+
+_FRONTMATTER_RE = re.compile(r"\A---\n(.*?)\n---\n", re.DOTALL)
+_CONTENT_RE = re.compile(r"## Post (?:Content|Caption)\n\n(.*?)(?=\n## |\Z)", re.DOTALL)
+_KEY_RE = re.compile(r"^([^\s:#\-][^:]*?)\s*:(.*)$")
+_LIST_ITEM_RE = re.compile(r"^\s*-(?:[ \t]+(.*))?$")
+_BLOCK_SCALAR_RE = re.compile(r"^[|>][+-]?$")
+_DQ_ESCAPES = {"n": "\n", "t": "\t", '"': '"', "\\": "\\", "/": "/"}
+
+
+# ─────────────────────────────────────────────
+# Frontmatter
+# ─────────────────────────────────────────────
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return re.sub(r"\\(.)", lambda m: _DQ_ESCAPES.get(m.group(1), m.group(0)), value[1:-1])
+    if len(value) >= 2 and value[0] == value[-1] == "'":
+        return value[1:-1].replace("''", "'")
+    return value
+
+
+def _split_inline_list(body: str) -> list[str]:
+    """Split `a, "b, c", 'd'` on commas that are not inside quotes."""
+    items, buf, quote = [], [], ""
+    for ch in body:
+        if quote:
+            buf.append(ch)
+            if ch == quote:
+                quote = ""
+        elif ch in "\"'":
+            quote = ch
+            buf.append(ch)
+        elif ch == ",":
+            items.append("".join(buf).strip())
+            buf = []
+        else:
+            buf.append(ch)
+    items.append("".join(buf).strip())
+    return [_unquote(i) for i in items if i]
+
+
+def _block_scalar(indicator: str, lines: list[str]) -> str:
+    indents = [len(l) - len(l.lstrip()) for l in lines if l.strip()]
+    cut = min(indents) if indents else 0
+    body = [l[cut:] for l in lines]
+    if indicator.startswith("|"):
+        return "\n".join(body).rstrip("\n")
+    # Folded: single newlines become spaces, blank lines separate paragraphs.
+    paras, para = [], []
+    for line in body:
+        if line.strip():
+            para.append(line.strip())
+        elif para:
+            paras.append(" ".join(para))
+            para = []
+    if para:
+        paras.append(" ".join(para))
+    return "\n".join(paras)
+
+
+def _value(raw: str, cont: list[str]) -> str | list[str]:
+    if _BLOCK_SCALAR_RE.match(raw):
+        return _block_scalar(raw, cont)
+
+    if not raw and cont and all(_LIST_ITEM_RE.match(l) for l in cont if l.strip()):
+        return [_unquote((_LIST_ITEM_RE.match(l).group(1) or "").strip()) for l in cont if l.strip()]
+
+    joined = " ".join([raw] + [l.strip() for l in cont if l.strip()]).strip()
+    if joined.startswith("[") and joined.endswith("]"):
+        return _split_inline_list(joined[1:-1])
+    return _unquote(joined)
+
+
+def parse_frontmatter(text: str) -> dict:
+    """Structured frontmatter between the leading --- delimiters ({} if there is none)."""
+    m = _FRONTMATTER_RE.match(text.replace("\r\n", "\n"))
+    if not m:
+        return {}
+
+    lines = m.group(1).split("\n")
+    out: dict = {}
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        i += 1
+        if not line.strip() or line.lstrip().startswith("#") or line[0] in " \t":
+            continue
+        km = _KEY_RE.match(line)
+        if not km:
+            continue
+        cont = []
+        while i < len(lines) and (
+            not lines[i].strip() or lines[i][0] in " \t" or _LIST_ITEM_RE.match(lines[i])
+        ):
+            cont.append(lines[i])
+            i += 1
+        while cont and not cont[-1].strip():
+            cont.pop()
+        out[km.group(1).strip()] = _value((km.group(2) or "").strip(), cont)
+    return out
+
+
+# ─────────────────────────────────────────────
+# Post files
+# ─────────────────────────────────────────────
+
+def _as_str(value) -> str:
+    if isinstance(value, list):
+        return ", ".join(value)
+    return value or ""
+
+
+def parse_post_text(text: str) -> dict:
+    """
+    Parse the contents of a post file.
+    Returns dict with keys: type, topic, content, hashtags, pdf_path, image_path, best_time
+    """
+    text = text.replace("\r\n", "\n")
+    return _post_fields(text, parse_frontmatter(text))
+
+
+def _post_fields(text: str, frontmatter: dict) -> dict:
+    # For carousels the body is under "## Post Caption", for others "## Post Content"
+    content_match = _CONTENT_RE.search(text)
+    content = content_match.group(1).strip() if content_match else ""
+
+    raw_hashtags = frontmatter.get("hashtags", "")
+    if isinstance(raw_hashtags, str):
+        raw_hashtags = raw_hashtags.split(",")
+    hashtags = [h.strip().lstrip("#") for h in raw_hashtags if h.strip().lstrip("#")]
+
+    return {
+        "type": _as_str(frontmatter.get("type")) or "text",
+        "topic": _as_str(frontmatter.get("topic")) or "Unknown",
+        "content": content,
+        "hashtags": hashtags,
+        "pdf_path": _as_str(frontmatter.get("pdf_path")),
+        "image_path": _as_str(frontmatter.get("image_path")),
+        "best_time": _as_str(frontmatter.get("best_time")),
+    }
+
+
+def _read_document(path: Path, st: os.stat_result) -> dict:
+    data = path.read_bytes()
+    text = data.decode("utf-8", errors="replace").replace("\r\n", "\n")
+    frontmatter = parse_frontmatter(text)
+    return {
+        "path": str(path),
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "content_hash": hashlib.sha256(data).hexdigest(),
+        "frontmatter": frontmatter,
+        "post": _post_fields(text, frontmatter),
+    }
+
+
+# ─────────────────────────────────────────────
+# Cache
+# ─────────────────────────────────────────────
+
+_cache: OrderedDict = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_get(key: tuple) -> dict | None:
+    with _cache_lock:
+        doc = _cache.get(key)
+        if doc is not None:
+            _cache.move_to_end(key)
+        return doc
+
+
+def _cache_put(key: tuple, doc: dict) -> None:
+    with _cache_lock:
+        _cache[key] = doc
+        _cache.move_to_end(key)
+        while len(_cache) > POST_PARSER_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def _copy(doc: dict) -> dict:
+    """Callers get their own copies of the mutable parts."""
+    post = dict(doc["post"], hashtags=list(doc["post"]["hashtags"]))
+    return dict(doc, frontmatter=dict(doc["frontmatter"]), post=post)
+
+
+def parse_document(path: Path) -> dict:
+    """Parse one file into a document dict, served from cache if unchanged."""
+    path = Path(path)
+    st = path.stat()
+    key = (str(path.resolve()), st.st_mtime_ns, st.st_size)
+    doc = _cache_get(key)
+    if doc is None:
+        doc = _read_document(path, st)
+        _cache_put(key, doc)
+    return _copy(doc)
+
+
+def parse_post_file(filepath: Path) -> dict:
+    """
+    Parse a markdown post file with YAML frontmatter.
+    Returns dict with keys: type, topic, content, hashtags, pdf_path, image_path, best_time
+    """
+    return parse_document(filepath)["post"]
+
+
+def _parse_in_worker(path_str: str) -> dict | None:
+    try:
+        path = Path(path_str)
+        return _read_document(path, path.stat())
+    except (OSError, ValueError) as e:
+        logger.warning(f"[Parser] Could not parse {path_str}: {e}")
+        return None
+
+
+def parse_many(paths: Iterable[Path] | Path, max_workers: int | None = None) -> dict[Path, dict]:
+    """
+    Parse many post files (or every .md file in a folder) into document dicts.
+    Cache hits are served directly; misses are parsed in a process pool when
+    there are at least PARSE_MANY_MIN_PARALLEL of them. Unreadable files are
+    logged and left out.
+    """
+    if isinstance(paths, (str, Path)) and Path(paths).is_dir():
+        with os.scandir(paths) as it:
+            paths = [Path(e.path) for e in it if e.is_file() and e.name.endswith(".md")]
+
+    results: dict[Path, dict] = {}
+    misses: list[tuple[Path, tuple]] = []
+    for path in map(Path, paths):
+        try:
+            st = path.stat()
+        except OSError as e:
+            logger.warning(f"[Parser] Could not stat {path}: {e}")
+            continue
+        key = (str(path.resolve()), st.st_mtime_ns, st.st_size)
+        doc = _cache_get(key)
+        if doc is None:
+            misses.append((path, key))
+        else:
+            results[path] = _copy(doc)
+
+    if len(misses) >= PARSE_MANY_MIN_PARALLEL:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            chunk = max(1, len(misses) // ((max_workers or os.cpu_count() or 1) * 4))
+            docs = pool.map(_parse_in_worker, [str(p) for p, _ in misses], chunksize=chunk)
+            parsed = list(zip(misses, docs))
+    else:
+        parsed = [((p, k), _parse_in_worker(str(p))) for p, k in misses]
+
+    for (path, _), doc in parsed:
+        if doc is None:
+            continue
+        # Key on the stat the worker actually read, in case the file changed in between.
+        _cache_put((str(path.resolve()), doc["mtime_ns"], doc["size"]), doc)
+        results[path] = _copy(doc)
+    return results
@@ -0,0 +1,298 @@
+"""
+Publish Queue — holds approved posts until their `best_time`, persisted in SQLite.
+
+Each approved file gets a due time: its frontmatter `best_time` (the next
+occurrence of it), or now. Before a due time is accepted it is checked against
+MAX_POSTS_PER_DAY — posts already published that day plus posts already
+scheduled for it — and, if PUBLISH_MIN_GAP_MINUTES is set, against the posts
+around it. A full day pushes the post to the next day with room, at the same
+time of day (PUBLISH_OVERFLOW_TIME for posts without a best_time). So a burst
+of approvals is spread over the following days instead of being rejected.
+
+The queue is a table with an index on due_at, so scheduling and taking the
+next due post are O(log n). It lives in vault/.cache/publish_queue.db and
+survives restarts; slot decisions run under `BEGIN IMMEDIATE`, so concurrent
+workers (or processes) never both take a day's last slot. A post taken for
+publishing is leased rather than deleted, and is only removed once it has been
+handled; a crash leaves it to be picked up again. A post LinkedIn throttles
+goes back in with `defer()`, due when the throttle lifts.
+
+`best_time` formats understood (local time):
+    2026-03-10 09:00      2026-03-10T09:00      2026-03-10 9:00 AM
+    2026-03-10T09:00+02:00 (converted to local time)
+    09:00    9 AM    12:30 pm    8:00–10:00 AM (start of the range)
+    Tuesday 9:00 AM    Tue 17:30    Wednesdays at 12 PM
+"""
+
+import re
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, time as dtime, timedelta
+from pathlib import Path
+from typing import Callable, Iterator
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scheduled_posts (
+    path          TEXT PRIMARY KEY,
+    due_at        REAL NOT NULL,
+    requested_at  REAL NOT NULL,
+    queued_at     REAL NOT NULL,
+    topic         TEXT NOT NULL DEFAULT '',
+    leased_until  REAL
+);
+CREATE INDEX IF NOT EXISTS scheduled_posts_due ON scheduled_posts (due_at);
+"""
+
+# A best_time that passed less than this long ago still means "today's slot"
+LATE_GRACE = timedelta(minutes=15)
+# A slot this close to now (seconds) is due now rather than scheduled
+DUE_TOLERANCE = 1.0
+_MAX_SLOT_TRIES = 10_000
+
+_WEEKDAYS = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+_WEEKDAY_RE = re.compile(r"\b(mon|tue|wed|thu|fri|sat|sun)[a-z]*\b", re.I)
+_DATE_RE = re.compile(r"^\s*(\d{4})-(\d{2})-(\d{2})(?:[T ]\s*|\s*$)")
+_TIME_RE = re.compile(r"(?<![\d:])(\d{1,2})(?::(\d{2}))?(?:\s*([ap])\.?m\b\.?)?", re.I)
+_MERIDIEM_RE = re.compile(r"\b([ap])\.?m\b", re.I)
+
+
+def _parse_clock(text: str) -> dtime | None:
+    """First time of day in `text` ("9", "9:30", "9 AM", "12:00 pm"); a trailing AM/PM applies to a range start."""
+    m = _TIME_RE.search(text)
+    if not m:
+        return None
+    hour, minute = int(m.group(1)), int(m.group(2) or 0)
+    meridiem = m.group(3)
+    if meridiem is None and (later := _MERIDIEM_RE.search(text, m.end())):
+        meridiem = later.group(1)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem.lower() == "p" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return dtime(hour, minute)
+
+
+def parse_best_time(value: str, now: datetime, default_time: dtime = dtime(9, 0)) -> datetime | None:
+    """
+    When a post with this `best_time` should go out: the next occurrence at or
+    after `now` (or within LATE_GRACE before it). None if `value` can't be read.
+    """
+    text = (value or "").strip()
+    if not text:
+        return None
+
+    if m := _DATE_RE.match(text):
+        try:
+            day = date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+        except ValueError:
+            return None
+        rest = text[m.end():]
+        if not rest.strip():
+            return datetime.combine(day, default_time)
+        # Full ISO datetimes first, so an offset ("...T09:00+02:00", "...Z") is converted rather than dropped
+        try:
+            parsed = datetime.fromisoformat(text.replace("Z", "+00:00") if text.endswith("Z") else text)
+        except ValueError:
+            clock = _parse_clock(rest)
+            return datetime.combine(day, clock) if clock else None
+        return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+
+    weekday = _WEEKDAY_RE.search(text)
+    clock = _parse_clock(_WEEKDAY_RE.sub(" ", text))
+    if clock is None:
+        if not weekday:
+            return None
+        clock = default_time
+
+    candidate = datetime.combine(now.date(), clock)
+    if weekday:
+        candidate += timedelta(days=(_WEEKDAYS[weekday.group(1).lower()] - now.weekday()) % 7)
+        if candidate < now - LATE_GRACE:
+            candidate += timedelta(days=7)
+    elif candidate < now - LATE_GRACE:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+def is_due(slot: datetime, now: datetime) -> bool:
+    return slot.timestamp() <= now.timestamp() + DUE_TOLERANCE
+
+
+def _day_bounds(day: date) -> tuple[float, float]:
+    start = datetime.combine(day, dtime())
+    return start.timestamp(), (start + timedelta(days=1)).timestamp()
+
+
+class PublishQueue:
+    def __init__(
+        self,
+        db_path: Path,
+        max_per_day: int,
+        published_on: Callable[[date], int] = lambda day: 0,
+        min_gap: timedelta = timedelta(0),
+        overflow_time: dtime = dtime(9, 0),
+        lease: float = 600.0,
+    ):
+        self.db_path = db_path
+        self.max_per_day = max(max_per_day, 1)
+        self.published_on = published_on
+        self.min_gap = min_gap
+        self.overflow_time = overflow_time
+        self.lease = lease
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write_txn(self) -> Iterator[sqlite3.Connection]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        return str(Path(path).resolve())
+
+    # ── scheduling ────────────────────────────
+
+    def schedule(
+        self,
+        path: Path,
+        desired: datetime,
+        topic: str = "",
+        overflow_time: dtime | None = None,
+        now: datetime | None = None,
+    ) -> datetime:
+        """
+        Due time for `path`: `desired`, or the next free slot after it. A post
+        that is already scheduled keeps its slot unless `desired` changed, and
+        one that is already due stays due. A due post (see `is_due`) is leased
+        to the caller, who is expected to publish it and then `remove()` it.
+        """
+        key = self._key(path)
+        now = (now or datetime.now()).timestamp()
+        with self._write_txn() as conn:
+            row = conn.execute(
+                "SELECT due_at, requested_at FROM scheduled_posts WHERE path = ?", (key,)
+            ).fetchone()
+            if row and (row[0] <= now or row[1] == desired.timestamp()):
+                slot = datetime.fromtimestamp(row[0])
+            else:
+                slot = self._find_slot(conn, desired, key, overflow_time or self.overflow_time)
+            # A post that is due now is being published by the caller: lease it so pop_due() skips it
+            leased_until = now + self.lease if slot.timestamp() <= now + DUE_TOLERANCE else None
+            conn.execute(
+                "INSERT INTO scheduled_posts (path, due_at, requested_at, queued_at, topic, leased_until) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (path) DO UPDATE SET due_at = excluded.due_at, requested_at = excluded.requested_at, "
+                "topic = excluded.topic, leased_until = excluded.leased_until",
+                (key, slot.timestamp(), desired.timestamp(), now, topic, leased_until),
+            )
+        return slot
+
+    def _find_slot(self, conn: sqlite3.Connection, desired: datetime, key: str, overflow_time: dtime) -> datetime:
+        candidate = desired
+        gap = self.min_gap.total_seconds()
+        for _ in range(_MAX_SLOT_TRIES):
+            day = candidate.date()
+            start, end = _day_bounds(day)
+            scheduled = conn.execute(
+                "SELECT COUNT(*) FROM scheduled_posts WHERE due_at >= ? AND due_at < ? AND path != ?",
+                (start, end, key),
+            ).fetchone()[0]
+            if scheduled + self.published_on(day) >= self.max_per_day:
+                candidate = datetime.combine(day + timedelta(days=1), overflow_time)
+                continue
+            if gap > 0:
+                ts = candidate.timestamp()
+                (clash,) = conn.execute(
+                    "SELECT MAX(due_at) FROM scheduled_posts WHERE due_at > ? AND due_at < ? AND path != ?",
+                    (ts - gap, ts + gap, key),
+                ).fetchone()
+                if clash is not None:
+                    candidate = datetime.fromtimestamp(clash + gap)
+                    if candidate.date() != day:
+                        candidate = datetime.combine(day + timedelta(days=1), overflow_time)
+                    continue
+            return candidate
+        logger.warning(f"[PublishQueue] No free slot found after {desired:%Y-%m-%d %H:%M}; using it anyway.")
+        return desired
+
+    def defer(self, path: Path, until: datetime, topic: str = "") -> None:
+        """Put `path` back in the queue, due at `until` (e.g. after LinkedIn throttled it)."""
+        with self._write_txn() as conn:
+            conn.execute(
+                "INSERT INTO scheduled_posts (path, due_at, requested_at, queued_at, topic, leased_until) "
+                "VALUES (?, ?, ?, ?, ?, NULL) "
+                "ON CONFLICT (path) DO UPDATE SET due_at = excluded.due_at, requested_at = excluded.requested_at, "
+                "leased_until = NULL",
+                (self._key(path), until.timestamp(), until.timestamp(), time.time(), topic),
+            )
+
+    # ── dispatch ──────────────────────────────
+
+    def pop_due(self, now: float | None = None, limit: int = 50) -> list[Path]:
+        """Due posts, oldest first, leased for `lease` seconds so no one else takes them."""
+        now = time.time() if now is None else now
+        with self._write_txn() as conn:
+            rows = conn.execute(
+                "SELECT path FROM scheduled_posts WHERE due_at <= ? AND (leased_until IS NULL OR leased_until < ?) "
+                "ORDER BY due_at LIMIT ?",
+                (now, now, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE scheduled_posts SET leased_until = ? WHERE path = ?",
+                [(now + self.lease, path) for (path,) in rows],
+            )
+        return [Path(path) for (path,) in rows]
+
+    def next_due(self) -> float | None:
+        """Epoch seconds of the earliest post not currently leased, or None if there is none."""
+        row = self._conn().execute(
+            "SELECT due_at FROM scheduled_posts WHERE leased_until IS NULL OR leased_until < ? ORDER BY due_at LIMIT 1",
+            (time.time(),),
+        ).fetchone()
+        return row[0] if row else None
+
+    def release(self, path: Path) -> None:
+        """Make a leased post available to pop_due() again."""
+        with self._write_txn() as conn:
+            conn.execute("UPDATE scheduled_posts SET leased_until = NULL WHERE path = ?", (self._key(path),))
+
+    def release_all(self) -> None:
+        """Drop every lease (on startup, nothing is in flight yet)."""
+        with self._write_txn() as conn:
+            conn.execute("UPDATE scheduled_posts SET leased_until = NULL WHERE leased_until IS NOT NULL")
+
+    def remove(self, path: Path) -> None:
+        with self._write_txn() as conn:
+            conn.execute("DELETE FROM scheduled_posts WHERE path = ?", (self._key(path),))
+
+    def pending(self) -> list[dict]:
+        """Every scheduled post, soonest first: {path, topic, due_at (datetime)}."""
+        rows = self._conn().execute("SELECT path, topic, due_at FROM scheduled_posts ORDER BY due_at").fetchall()
+        return [{"path": path, "topic": topic, "due_at": datetime.fromtimestamp(due)} for path, topic, due in rows]
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM scheduled_posts").fetchone()[0]
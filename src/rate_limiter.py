@@ -0,0 +1,361 @@
+"""
+Rate Limiter — token buckets per LinkedIn endpoint family, shared by every
+thread and process that posts from this vault.
+
+Families (endpoint names as used by http_client):
+    posting   ugc_posts
+    assets    register_upload, upload
+    metrics   social_metadata, network_sizes
+Identity calls (userinfo, me) are rare and cached, so they are not limited.
+
+Each family starts from a configured budget, RATE_LIMIT_<FAMILY>="limit/window
+seconds" (a full bucket allows `limit` calls at once, then it refills at
+limit/window per second; "0" turns the family's bucket off). LinkedIn's answers
+then adjust it:
+  - 429: nobody in the family sends again until Retry-After has passed (an
+    exponential backoff if the header is missing). The refill rate is halved
+    once per throttle: not again for 429s that arrive while the family is
+    already blocked, nor within THROTTLE_WINDOW of the last cut. Tokens
+    already in the bucket are kept, so a short throttle only costs its pause.
+  - X-RateLimit-Remaining / -Reset (or the unprefixed RateLimit-*): the rest of
+    the window is paced evenly over the calls still allowed, keeping
+    RATE_LIMIT_HEADROOM in reserve; Remaining 0 blocks until the reset.
+  - Over time (half-life RECOVERY_HALF_LIFE) an adjusted rate returns to the
+    configured one — once the window a rate-limit header described is over.
+
+Bucket state is a small JSON file (vault/.cache/rate_limits.json) read and
+written under an exclusive lock on the file itself — fcntl.flock on POSIX,
+msvcrt.locking on Windows — so the orchestrator, a manual `linkedin_poster.py`
+run and the analytics job all draw from the same buckets, and a Retry-After
+still holds after a restart.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Mapping
+from dotenv import load_dotenv
+import requests
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+VAULT_PATH = Path(os.getenv("VAULT_PATH", "vault"))
+RATE_LIMIT_STATE_FILE = VAULT_PATH / ".cache" / "rate_limits.json"
+
+ENDPOINT_FAMILIES = {
+    "ugc_posts": "posting",
+    "register_upload": "assets",
+    "upload": "assets",
+    "social_metadata": "metrics",
+    "network_sizes": "metrics",
+}
+
+# calls / window seconds; override with RATE_LIMIT_<FAMILY> (e.g. RATE_LIMIT_METRICS=100/60)
+DEFAULT_BUDGETS = {
+    "posting": "150/86400",
+    "assets": "300/86400",
+    "metrics": "500/60",
+}
+
+RATE_LIMIT_HEADROOM = float(os.getenv("RATE_LIMIT_HEADROOM", "0.1"))
+RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("RATE_LIMIT_MAX_WAIT_SECONDS", "120"))
+# Backoff after a 429 without Retry-After: doubles per consecutive 429, capped
+BACKOFF_INITIAL = 5.0
+BACKOFF_MAX = 900.0
+# How far a 429 may push the refill rate below the configured one
+MIN_RATE_FRACTION = 1 / 64
+# At most one rate cut per this many seconds, however many 429s arrive
+THROTTLE_WINDOW = 60.0
+# Seconds for an adjusted rate to get halfway back to the configured one
+RECOVERY_HALF_LIFE = 600.0
+
+
+class RateLimited(requests.RequestException):
+    """A call was not sent because its family is throttled for longer than the caller will wait."""
+
+    def __init__(self, family: str, retry_at: float):
+        self.family = family
+        self.retry_at = retry_at
+        super().__init__(f"LinkedIn {family} rate limit: retry after {time.strftime('%H:%M:%S', time.localtime(retry_at))}")
+
+
+def parse_budget(spec: str) -> tuple[float, float] | None:
+    """"150/86400" → (150, 86400); "0" or "off" → None."""
+    spec = spec.strip().lower()
+    if spec in ("", "0", "off", "none"):
+        return None
+    limit, _, window = spec.partition("/")
+    limit, window = float(limit), float(window or 60)
+    if limit <= 0 or window <= 0:
+        return None
+    return limit, window
+
+
+def _budgets_from_env() -> dict[str, tuple[float, float]]:
+    budgets = {}
+    for family, default in DEFAULT_BUDGETS.items():
+        budget = parse_budget(os.getenv(f"RATE_LIMIT_{family.upper()}", default))
+        if budget:
+            budgets[family] = budget
+    return budgets
+
+
+def _header(headers: Mapping[str, str], *names: str) -> str | None:
+    for name in names:
+        value = headers.get(name)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def retry_after_seconds(headers: Mapping[str, str], now: float | None = None) -> float | None:
+    """Retry-After as seconds from now (it may be a number or an HTTP date)."""
+    value = _header(headers, "Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(when - (time.time() if now is None else now), 0.0)
+
+
+def _reset_seconds(value: str, now: float) -> float | None:
+    """X-RateLimit-Reset is seconds until the reset, or (if huge) an epoch time."""
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+    if reset > 1e9:
+        reset -= now
+    return max(reset, 0.0)
+
+
+class _FileLock:
+    """Exclusive lock across processes on an open file, plus across threads in this one."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                self._file = os.fdopen(fd, "r+", encoding="utf-8")
+            self._file.seek(0)
+            if sys.platform == "win32":
+                while True:
+                    try:
+                        msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue  # LK_LOCK gives up after ~10s; keep waiting
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        return self._file
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self._file.flush()
+            if sys.platform == "win32":
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._thread_lock.release()
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        state_file: Path = RATE_LIMIT_STATE_FILE,
+        budgets: dict[str, tuple[float, float]] | None = None,
+        max_wait: float = RATE_LIMIT_MAX_WAIT_SECONDS,
+        headroom: float = RATE_LIMIT_HEADROOM,
+    ):
+        self.budgets = _budgets_from_env() if budgets is None else budgets
+        self.max_wait = max_wait
+        self.headroom = min(max(headroom, 0.0), 0.9)
+        self._lock = _FileLock(state_file)
+
+    @staticmethod
+    def family_for(endpoint: str) -> str | None:
+        return ENDPOINT_FAMILIES.get(endpoint)
+
+    # ── shared state ──────────────────────────
+
+    def _fresh(self, family: str, now: float) -> dict:
+        limit, window = self.budgets.get(family, (0.0, 1.0))
+        return {
+            "budget": [limit, window],
+            "tokens": limit,
+            "rate": limit / window,
+            "updated": now,
+            "blocked_until": 0.0,
+            "strikes": 0,
+            "decreased_at": 0.0,
+            "hold_until": 0.0,
+        }
+
+    def _update(self, family: str, change) -> dict:
+        """Apply `change(bucket, now)` to the family's bucket under the lock; returns a copy."""
+        with self._lock as f:
+            now = time.time()
+            try:
+                state = json.loads(f.read() or "{}")
+            except json.JSONDecodeError:
+                state = {}
+            bucket = state.get(family)
+            budget = self.budgets.get(family)
+            if bucket is None or (budget and bucket.get("budget") != list(budget)):
+                bucket = state[family] = self._fresh(family, now)  # new family, or its budget was changed
+            if budget:
+                limit, window = budget
+                elapsed = max(now - bucket["updated"], 0.0)
+                bucket["tokens"] = min(limit, bucket["tokens"] + elapsed * bucket["rate"])
+                recovering = now - max(bucket["updated"], bucket.get("hold_until", 0.0))
+                if recovering > 0:
+                    base = limit / window
+                    bucket["rate"] = base + (bucket["rate"] - base) * 0.5 ** (recovering / RECOVERY_HALF_LIFE)
+            bucket["updated"] = now
+            change(bucket, now)
+            f.seek(0)
+            f.truncate()
+            f.write(json.dumps(state, indent=1))
+            return dict(bucket)
+
+    # ── before a call ─────────────────────────
+
+    def acquire(self, endpoint: str, max_wait: float | None = None) -> float:
+        """
+        Wait until a call to `endpoint` may go out and take its token. Returns
+        the seconds waited; raises RateLimited if that would exceed `max_wait`.
+        """
+        family = self.family_for(endpoint)
+        if family is None:
+            return 0.0
+        max_wait = self.max_wait if max_wait is None else max_wait
+        limited = family in self.budgets
+        waited = 0.0
+        while True:
+            decision = {}
+
+            def take(bucket: dict, now: float) -> None:
+                if bucket["blocked_until"] > now:
+                    decision["wait"] = bucket["blocked_until"] - now
+                elif not limited or bucket["tokens"] >= 1:
+                    if limited:
+                        bucket["tokens"] -= 1
+                    decision["wait"] = 0.0
+                else:
+                    decision["wait"] = (1 - bucket["tokens"]) / bucket["rate"]
+
+            self._update(family, take)
+            wait = decision["wait"]
+            if wait <= 0:
+                if waited:
+                    logger.debug(f"[RateLimit] {family}: waited {waited:.2f}s")
+                return waited
+            if waited + wait > max_wait:
+                raise RateLimited(family, time.time() + wait)
+            time.sleep(wait)
+            waited += wait
+
+    # ── after a call ──────────────────────────
+
+    def observe(self, endpoint: str, status: int, headers: Mapping[str, str]) -> float | None:
+        """
+        Adjust the family's bucket from a response. Returns the seconds to wait
+        before retrying if the response was a 429, else None.
+        """
+        family = self.family_for(endpoint)
+        if family is None:
+            return None
+        budget = self.budgets.get(family)
+        result = {}
+
+        def adjust(bucket: dict, now: float) -> None:
+            if status == 429:
+                # 429s from calls that were already in flight belong to the same throttle
+                new_throttle = bucket["blocked_until"] <= now
+                retry_after = retry_after_seconds(headers, now)
+                if retry_after is None:
+                    retry_after = min(BACKOFF_INITIAL * 2 ** bucket["strikes"], BACKOFF_MAX)
+                if new_throttle:
+                    bucket["strikes"] += 1
+                bucket["blocked_until"] = max(bucket["blocked_until"], now + retry_after)
+                if budget and new_throttle and now - bucket.get("decreased_at", 0.0) >= THROTTLE_WINDOW:
+                    floor = budget[0] / budget[1] * MIN_RATE_FRACTION
+                    bucket["rate"] = max(bucket["rate"] / 2, floor)
+                    bucket["decreased_at"] = now
+                result["retry_after"] = bucket["blocked_until"] - now
+                return
+
+            bucket["strikes"] = 0
+            remaining = _header(headers, "X-RateLimit-Remaining", "RateLimit-Remaining")
+            reset = _header(headers, "X-RateLimit-Reset", "RateLimit-Reset")
+            try:
+                remaining = float(remaining) if remaining is not None else None
+            except ValueError:
+                remaining = None
+            reset = _reset_seconds(reset, now) if reset is not None else None
+
+            if remaining is not None and reset is not None:
+                if remaining <= 0:
+                    bucket["blocked_until"] = max(bucket["blocked_until"], now + reset)
+                    bucket["tokens"] = 0.0
+                elif budget:
+                    # Spread what is left over the rest of the window, keeping some in reserve
+                    allowed = remaining * (1 - self.headroom)
+                    bucket["rate"] = max(allowed / max(reset, 1.0), budget[0] / budget[1] * MIN_RATE_FRACTION)
+                    bucket["tokens"] = min(bucket["tokens"], allowed)
+                    bucket["hold_until"] = now + reset
+
+        bucket = self._update(family, adjust)
+        if status == 429:
+            logger.warning(
+                f"[RateLimit] {family}: throttled by LinkedIn, pausing {result['retry_after']:.0f}s "
+                f"(rate now {bucket['rate'] * 3600:.1f}/h)"
+            )
+        return result.get("retry_after")
+
+    def snapshot(self) -> dict[str, dict]:
+        """Current state of every family (for logs and the load test)."""
+        return {family: self._update(family, lambda bucket, now: None) for family in DEFAULT_BUDGETS}
+
+
+_limiter: RateLimiter | None = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter() -> RateLimiter:
+    """Process-wide limiter, created on first use."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
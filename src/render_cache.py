@@ -0,0 +1,107 @@
+"""
+Render Cache — reuse a rendered file when the same spec is rendered again.
+
+Keyed by a SHA-256 of the canonical (sorted-key JSON) spec plus a version
+string that callers derive from whatever affects the output — generator code,
+theme, fonts, library version. Any change there produces new keys, so stale
+renders are simply never hit again and age out.
+
+Entries are plain files in one directory (`<key><suffix>`). A hit bumps the
+file's mtime; once the directory grows past `max_bytes`, the least recently
+used files are deleted. Writes go through a temp file + atomic rename, so
+several processes can share the directory.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class RenderCache:
+    def __init__(self, directory: Path, max_bytes: int, suffix: str = ".pdf"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+
+    @staticmethod
+    def key(spec: dict, version: str) -> str:
+        canonical = json.dumps(spec, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(f"{version}\n{canonical}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.suffix}"
+
+    def get(self, key: str, dest: Path) -> bool:
+        """Copy the cached render for `key` to `dest`. False on a miss."""
+        if self.max_bytes <= 0:
+            return False
+        cached = self._path(key)
+        try:
+            os.utime(cached)
+            tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+            shutil.copyfile(cached, tmp)
+            os.replace(tmp, dest)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def put(self, key: str, rendered: Path) -> None:
+        if self.max_bytes <= 0:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = self.directory / f".{key}.{os.getpid()}.tmp"
+            shutil.copyfile(rendered, tmp)
+            os.replace(tmp, self._path(key))
+            self._evict()
+        except OSError as e:
+            logger.warning(f"[RenderCache] Could not cache {rendered.name}: {e}")
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(self.suffix) and not entry.name.startswith("."):
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, Path(entry.path)))
+        return entries
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def size(self) -> int:
+        try:
+            return sum(size for _, size, _ in self._entries())
+        except FileNotFoundError:
+            return 0
+
+    def clear(self) -> int:
+        """Drop every cached render. Returns how many files were removed."""
+        removed = 0
+        try:
+            for _, _, path in self._entries():
+                try:
+                    path.unlink()
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        except FileNotFoundError:
+            pass
+        return removed
@@ -0,0 +1,155 @@
+"""
+Slide Layout — decides font sizes and slide breaks before anything is drawn.
+
+Text is measured with glyph-width tables (1/1000 em per code point, the same
+numbers fpdf2 uses) and word-wrapped the way multi_cell() does, so the layout
+matches the rendered PDF without rendering it. For each slide the largest font
+size from a short ladder that fits the page is chosen; a body that doesn't fit
+even at the smallest size is split into continuation slides at the normal size.
+
+Geometry (mm, 200×200 page) mirrors CarouselPDF in carousel_generator.py; keep
+the two in sync when the slide design changes.
+"""
+
+PT_TO_MM = 25.4 / 72
+CELL_MARGIN = 1.0  # fpdf2's default c_margin for this page size, on each side
+
+# Content slide
+HEADING_TOP, HEADING_WIDTH, HEADING_LINE = 22, 140, 13  # line height at HEADING_SIZES[0]
+HEADING_SIZES = (22, 20, 18, 16)
+HEADING_MAX_LINES = 2
+BODY_GAP = 15  # heading bottom → body top (divider + padding)
+BODY_WIDTH, BODY_LINE = 170, 8
+BODY_SIZES = (13, 12, 11, 10)
+BODY_BOTTOM = 176  # slide number box starts at 178
+
+# Cover slide
+TITLE_TOP, TITLE_WIDTH, TITLE_LINE = 45, 160, 16
+TITLE_SIZES = (28, 26, 24, 22, 20, 18)
+SUBTITLE_GAP = 8
+SUBTITLE_WIDTH, SUBTITLE_LINE = 160, 9
+SUBTITLE_SIZES = (14, 13, 12, 11)
+COVER_BOTTOM = 166  # "Swipe" line sits at 168
+
+CONTINUED = " (cont.)"
+
+
+class GlyphWidths:
+    """Width table for one font face, with a per-word cache."""
+
+    def __init__(self, widths: dict[int, float], missing_width: float):
+        self.widths = widths
+        self.missing_width = missing_width
+        self._words: dict[str, float] = {}
+
+    def units(self, text: str) -> float:
+        """Width of `text` in 1/1000 em."""
+        w = self._words.get(text)
+        if w is None:
+            get, missing = self.widths.get, self.missing_width
+            w = sum(get(ord(c), missing) for c in text)
+            if len(self._words) < 50_000:
+                self._words[text] = w
+        return w
+
+
+def wrap(text: str, font: GlyphWidths, size: float, width: float) -> list[str]:
+    """Lines multi_cell(width, ..., text) would produce at `size` pt."""
+    limit = (width - 2 * CELL_MARGIN) / (size * PT_TO_MM) * 1000
+    space = font.units(" ")
+    lines = []
+    for paragraph in text.split("\n"):
+        line, line_w, started = "", 0.0, False
+        for word in paragraph.split(" "):
+            word_w = font.units(word)
+            if started and line_w + space + word_w > limit:
+                lines.append(line)
+                line, line_w, started = "", 0.0, False
+            if started:
+                line += " " + word
+                line_w += space + word_w
+            elif word_w <= limit:
+                line, line_w, started = word, word_w, True
+            else:
+                # A word wider than the box is broken between characters
+                for ch in word:
+                    ch_w = font.units(ch)
+                    if line and line_w + ch_w > limit:
+                        lines.append(line)
+                        line, line_w = "", 0.0
+                    line += ch
+                    line_w += ch_w
+                started = True
+        lines.append(line)
+    return lines
+
+
+def _scaled(line: float, size: float, base: float) -> float:
+    return line * size / base
+
+
+def fit_cover(title: str, subtitle: str, regular: GlyphWidths, bold: GlyphWidths) -> dict:
+    """{"title_size", "subtitle_size", "fits"} for the cover slide."""
+    best = None
+    for t_size in TITLE_SIZES:
+        title_h = len(wrap(title, bold, t_size, TITLE_WIDTH)) * _scaled(TITLE_LINE, t_size, TITLE_SIZES[0])
+        for s_size in SUBTITLE_SIZES:
+            sub_h = len(wrap(subtitle, regular, s_size, SUBTITLE_WIDTH)) * _scaled(SUBTITLE_LINE, s_size, SUBTITLE_SIZES[0])
+            best = {"title_size": t_size, "subtitle_size": s_size}
+            if TITLE_TOP + title_h + SUBTITLE_GAP + sub_h <= COVER_BOTTOM:
+                return dict(best, fits=True)
+    return dict(best, fits=False)
+
+
+def _heading(heading: str, bold: GlyphWidths) -> tuple[float, float]:
+    """(size, height) — the largest heading size that wraps to HEADING_MAX_LINES or fewer."""
+    for size in HEADING_SIZES:
+        n = len(wrap(heading, bold, size, HEADING_WIDTH))
+        if n <= HEADING_MAX_LINES:
+            break
+    return size, n * _scaled(HEADING_LINE, size, HEADING_SIZES[0])
+
+
+def _body_capacity(heading_h: float, size: float) -> int:
+    space = BODY_BOTTOM - (HEADING_TOP + heading_h + BODY_GAP)
+    return max(int(space // _scaled(BODY_LINE, size, BODY_SIZES[0])), 1)
+
+
+def fit_content(heading: str, body: str, regular: GlyphWidths, bold: GlyphWidths) -> list[dict]:
+    """
+    One or more slide layouts for a heading + body:
+    [{"heading", "body", "heading_size", "body_size", "continued"}]
+    """
+    h_size, h_height = _heading(heading, bold)
+    for b_size in BODY_SIZES:
+        lines = wrap(body, regular, b_size, BODY_WIDTH)
+        if len(lines) <= _body_capacity(h_height, b_size):
+            return [{"heading": heading, "body": body, "heading_size": h_size,
+                     "body_size": b_size, "continued": False}]
+
+    # Too long even at the smallest size: paginate at the normal size
+    b_size = BODY_SIZES[0]
+    lines = wrap(body.strip("\n"), regular, b_size, BODY_WIDTH)
+    cont_heading = heading + CONTINUED
+    cont_size, cont_height = _heading(cont_heading, bold)
+    pages, first = [], True
+    while lines:
+        capacity = _body_capacity(h_height if first else cont_height, b_size)
+        cut = capacity
+        if len(lines) > capacity:
+            # Prefer ending a slide at a paragraph break in its lower half
+            blanks = [i for i in range(max(capacity // 2, 1), capacity) if not lines[i].strip()]
+            if blanks:
+                cut = blanks[-1]
+        chunk, lines = lines[:cut], lines[cut:]
+        while lines and not lines[0].strip():
+            lines = lines[1:]
+        pages.append({
+            "heading": heading if first else cont_heading,
+            "body": "\n".join(chunk).strip("\n"),
+            "heading_size": h_size if first else cont_size,
+            "body_size": b_size,
+            "continued": not first,
+        })
+        first = False
+    return pages
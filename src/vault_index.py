@@ -0,0 +1,237 @@
+"""
+Vault Index — SQLite catalogue of every post file across the workflow folders.
+
+One row per .md file in Pending_Approval, Approved, Published and Needs_Action,
+holding its parsed frontmatter, workflow state, timestamps, content hash and
+(once published) post URN. It is kept current two ways:
+
+- `record_file()` / `forget_file()` from the watcher as it moves files, and
+- `scan()`, which stats each folder and re-parses only files whose
+  mtime or size changed since they were indexed.
+
+Dashboard counts and other lookups become indexed queries instead of
+directory listings plus re-parsing markdown.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+import post_parser
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+VAULT_PATH = Path(os.getenv("VAULT_PATH", "vault"))
+VAULT_INDEX_FILE = VAULT_PATH / ".cache" / "vault_index.db"
+
+FOLDER_STATES = {
+    "Pending_Approval": "pending",
+    "Approved": "approved",
+    "Published": "published",
+    "Needs_Action": "needs_action",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    path         TEXT PRIMARY KEY,
+    folder       TEXT NOT NULL,
+    name         TEXT NOT NULL,
+    state        TEXT NOT NULL,
+    type         TEXT,
+    topic        TEXT,
+    best_time    TEXT,
+    frontmatter  TEXT,
+    post_urn     TEXT NOT NULL DEFAULT '',
+    content_hash TEXT,
+    mtime_ns     INTEGER,
+    size         INTEGER,
+    indexed_at   REAL,
+    published_at REAL
+);
+CREATE INDEX IF NOT EXISTS posts_state ON posts (state, published_at);
+CREATE INDEX IF NOT EXISTS posts_name ON posts (name);
+CREATE INDEX IF NOT EXISTS posts_urn ON posts (post_urn) WHERE post_urn != '';
+"""
+
+
+class VaultIndex:
+    def __init__(self, vault_path: Path = VAULT_PATH, db_path: Path = VAULT_INDEX_FILE):
+        self.vault_path = vault_path
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _key(self, path: Path) -> str:
+        try:
+            return path.resolve().relative_to(self.vault_path.resolve()).as_posix()
+        except ValueError:
+            return path.resolve().as_posix()
+
+    def _row_for(self, doc: dict) -> dict:
+        path = Path(doc["path"])
+        folder = path.parent.name
+        post = doc["post"]
+        return {
+            "path": self._key(path),
+            "folder": folder,
+            "name": path.name,
+            "state": FOLDER_STATES.get(folder, folder.lower()),
+            "type": post["type"],
+            "topic": post["topic"],
+            "best_time": post["best_time"],
+            "frontmatter": json.dumps(doc["frontmatter"], ensure_ascii=False),
+            "content_hash": doc["content_hash"],
+            "mtime_ns": doc["mtime_ns"],
+            "size": doc["size"],
+            "indexed_at": time.time(),
+        }
+
+    # ── incremental updates ──────────────────
+
+    def record_file(self, path: Path, post_urn: str = "", published_at: float | None = None) -> None:
+        """(Re)index one file, e.g. right after the watcher moved it."""
+        try:
+            doc = post_parser.parse_document(path)
+        except FileNotFoundError:
+            self.forget_file(path)
+            return
+        self._upsert(self._row_for(doc), post_urn, published_at)
+
+    def _upsert(self, row: dict, post_urn: str = "", published_at: float | None = None) -> None:
+        conn = self._conn()
+        if row["state"] == "published" and published_at is None:
+            published_at = time.time()
+        conn.execute(
+            """
+            INSERT INTO posts (path, folder, name, state, type, topic, best_time, frontmatter,
+                               post_urn, content_hash, mtime_ns, size, indexed_at, published_at)
+            VALUES (:path, :folder, :name, :state, :type, :topic, :best_time, :frontmatter,
+                    :post_urn, :content_hash, :mtime_ns, :size, :indexed_at, :published_at)
+            ON CONFLICT (path) DO UPDATE SET
+                folder = excluded.folder, name = excluded.name, state = excluded.state,
+                type = excluded.type, topic = excluded.topic, best_time = excluded.best_time,
+                frontmatter = excluded.frontmatter, content_hash = excluded.content_hash,
+                mtime_ns = excluded.mtime_ns, size = excluded.size, indexed_at = excluded.indexed_at,
+                post_urn = CASE WHEN excluded.post_urn != '' THEN excluded.post_urn ELSE posts.post_urn END,
+                published_at = COALESCE(posts.published_at, excluded.published_at)
+            """,
+            {**row, "post_urn": post_urn, "published_at": published_at},
+        )
+
+    def forget_file(self, path: Path) -> None:
+        self._conn().execute("DELETE FROM posts WHERE path = ?", (self._key(path),))
+
+    def scan(self) -> dict:
+        """
+        Bring every workflow folder up to date. Only files whose (mtime, size)
+        differ from the index are read and parsed. Returns counts of changes.
+        """
+        conn = self._conn()
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        conn.execute("BEGIN")
+        try:
+            self._scan_folders(conn, stats)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return stats
+
+    def _scan_folders(self, conn: sqlite3.Connection, stats: dict) -> None:
+        for folder in FOLDER_STATES:
+            directory = self.vault_path / folder
+            known = {
+                r["path"]: (r["mtime_ns"], r["size"])
+                for r in conn.execute("SELECT path, mtime_ns, size FROM posts WHERE folder = ?", (folder,))
+            }
+            seen, changed = set(), []
+            if directory.is_dir():
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if not entry.is_file() or not entry.name.endswith(".md"):
+                            continue
+                        key = f"{folder}/{entry.name}"
+                        seen.add(key)
+                        st = entry.stat()
+                        if known.get(key) == (st.st_mtime_ns, st.st_size):
+                            stats["unchanged"] += 1
+                            continue
+                        stats["updated" if key in known else "added"] += 1
+                        changed.append(Path(entry.path))
+            for doc in post_parser.parse_many(changed).values():
+                published_at = doc["mtime_ns"] / 1e9 if folder == "Published" else None
+                self._upsert(self._row_for(doc), published_at=published_at)
+            gone = [k for k in known if k not in seen]
+            if gone:
+                conn.executemany("DELETE FROM posts WHERE path = ?", [(k,) for k in gone])
+                stats["removed"] += len(gone)
+
+    # ── queries ──────────────────────────────
+
+    def counts_by_state(self) -> dict[str, int]:
+        counts = {state: 0 for state in FOLDER_STATES.values()}
+        for r in self._conn().execute("SELECT state, COUNT(*) AS n FROM posts GROUP BY state"):
+            counts[r["state"]] = r["n"]
+        return counts
+
+    def published_since(self, since: datetime) -> list[dict]:
+        rows = self._conn().execute(
+            "SELECT * FROM posts WHERE state = 'published' AND published_at >= ? ORDER BY published_at",
+            (since.timestamp(),),
+        )
+        return [dict(r) for r in rows]
+
+    def count_published_since(self, since: datetime) -> int:
+        row = self._conn().execute(
+            "SELECT COUNT(*) FROM posts WHERE state = 'published' AND published_at >= ?",
+            (since.timestamp(),),
+        ).fetchone()
+        return row[0]
+
+    def posts_in_state(self, state: str) -> list[dict]:
+        rows = self._conn().execute("SELECT * FROM posts WHERE state = ? ORDER BY name", (state,))
+        return [dict(r) for r in rows]
+
+    def find_by_urn(self, post_urn: str) -> dict | None:
+        row = self._conn().execute("SELECT * FROM posts WHERE post_urn = ?", (post_urn,)).fetchone()
+        return dict(row) if row else None
+
+    def queue_summary(self) -> dict[str, str]:
+        """Values for the Dashboard's Queue section."""
+        counts = self.counts_by_state()
+        week = self.count_published_since(datetime.now() - timedelta(days=7))
+        return {
+            "Pending Approval": f"{counts['pending']} posts",
+            "Approved (ready to post)": f"{counts['approved']} posts",
+            "Published this week": f"{week} posts",
+        }
+
+
+_index: VaultIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> VaultIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = VaultIndex()
+        return _index
@@ -0,0 +1,209 @@
+"""
+Work Queue — bounded, de-duplicating job queue with a worker pool.
+
+The approval watcher used to post on the watchdog observer thread, so one slow
+upload held up event delivery for every other approved file. Now the observer
+only calls `submit()`; a pool of workers does the slow part.
+
+- Backpressure: `submit()` blocks once `max_size` files are waiting.
+- De-duplication: a path already queued or in flight is not queued again, so
+  repeated watchdog events for one file turn into one job.
+- Debounce: before handling a file the worker waits until its size and mtime
+  stop changing, so half-written files are not picked up. Files that have not
+  been touched for a debounce interval already are handled straight away.
+"""
+
+import time
+import queue
+import logging
+import threading
+from pathlib import Path
+from typing import Callable
+import metrics
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WorkQueue:
+    def __init__(
+        self,
+        handler: Callable[[Path], None],
+        workers: int = 2,
+        max_size: int = 100,
+        debounce: float = 0.5,
+        stable_timeout: float = 60.0,
+        name: str = "Worker",
+    ):
+        self.handler = handler
+        self.workers = max(workers, 1)
+        self.debounce = debounce
+        self.stable_timeout = stable_timeout
+        self.name = name
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self._in_flight = 0
+
+        self._stats = {
+            "submitted": 0,
+            "deduplicated": 0,
+            "processed": 0,
+            "failed": 0,
+            "skipped": 0,
+            "rejected": 0,
+            "discarded": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "run_seconds_total": 0.0,
+            "run_seconds_max": 0.0,
+        }
+
+    # ── lifecycle ─────────────────────────────
+
+    def start(self) -> None:
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, daemon=True, name=f"{self.name}-{i + 1}")
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: float | None = None, discard_pending: bool = False) -> bool:
+        """
+        Let workers finish what is already queued, then exit. With
+        `discard_pending`, only jobs already running are finished and queued
+        ones are dropped (the caller finds them again later, e.g. on catch-up).
+        Returns False if they were still busy when `timeout` ran out.
+        """
+        if discard_pending:
+            self._discard_queued()
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for t in self._threads:
+            t.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+        alive = any(t.is_alive() for t in self._threads)
+        self._threads = [t for t in self._threads if t.is_alive()]
+        return not alive
+
+    def _discard_queued(self) -> int:
+        dropped = 0
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return dropped
+            if item is _STOP:
+                continue
+            with self._lock:
+                self._pending.discard(item[0])
+                self._stats["discarded"] += 1
+            dropped += 1
+
+    # ── producer side ─────────────────────────
+
+    def submit(self, path: Path, timeout: float | None = None) -> bool:
+        """
+        Queue a file. Returns False if it is already queued/in flight, or if the
+        queue stayed full for `timeout` seconds.
+        """
+        key = str(path.resolve())
+        with self._lock:
+            if key in self._pending:
+                self._stats["deduplicated"] += 1
+                return False
+            self._pending.add(key)
+        try:
+            self._queue.put((key, path, time.monotonic()), timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self._pending.discard(key)
+                self._stats["rejected"] += 1
+            logger.warning(f"[{self.name}] Queue full, could not queue {path.name}")
+            return False
+        with self._lock:
+            self._stats["submitted"] += 1
+        return True
+
+    def is_pending(self, path: Path) -> bool:
+        """True if `path` is queued or being handled right now."""
+        with self._lock:
+            return str(path.resolve()) in self._pending
+
+    # ── worker side ───────────────────────────
+
+    def _wait_until_stable(self, path: Path) -> bool:
+        """
+        True once size and mtime are unchanged across one debounce interval. A
+        file last modified at least that long ago (caught-up or scheduled posts)
+        passes at once, without holding a worker for the interval.
+        """
+        deadline = time.monotonic() + self.stable_timeout
+        try:
+            last = path.stat()
+        except FileNotFoundError:
+            return False
+        if time.time() - last.st_mtime >= self.debounce:
+            return True
+        while True:
+            time.sleep(self.debounce)
+            try:
+                now = path.stat()
+            except FileNotFoundError:
+                return False
+            if (now.st_size, now.st_mtime_ns) == (last.st_size, last.st_mtime_ns):
+                return True
+            if time.monotonic() >= deadline:
+                logger.warning(f"[{self.name}] {path.name} still changing after {self.stable_timeout:.0f}s")
+                return False
+            last = now
+
+    def _worker(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            key, path, enqueued = item
+            started = time.monotonic()
+            with self._lock:
+                self._in_flight += 1
+                wait = started - enqueued
+                self._stats["wait_seconds_total"] += wait
+                self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], wait)
+            metrics.QUEUE_WAIT.observe(wait, queue=self.name)
+            outcome = "processed"
+            try:
+                if self.debounce <= 0 or self._wait_until_stable(path):
+                    self.handler(path)
+                else:
+                    outcome = "skipped"
+            except Exception as e:
+                outcome = "failed"
+                logger.error(f"[{self.name}] Error processing {path.name}: {e}")
+            finally:
+                run = time.monotonic() - started
+                with self._lock:
+                    self._in_flight -= 1
+                    self._pending.discard(key)
+                    self._stats[outcome] += 1
+                    self._stats["run_seconds_total"] += run
+                    self._stats["run_seconds_max"] = max(self._stats["run_seconds_max"], run)
+
+    # ── metrics ───────────────────────────────
+
+    def metrics(self) -> dict:
+        """Snapshot of queue depth, counters and latencies (seconds)."""
+        with self._lock:
+            stats = dict(self._stats)
+            in_flight = self._in_flight
+        done = stats["processed"] + stats["failed"] + stats["skipped"]
+        return {
+            "depth": self._queue.qsize(),
+            "in_flight": in_flight,
+            "workers": self.workers,
+            **stats,
+            "wait_seconds_avg": stats["wait_seconds_total"] / done if done else 0.0,
+            "run_seconds_avg": stats["run_seconds_total"] / done if done else 0.0,
+        }